@@ -1,14 +1,294 @@
-from typing import Dict, Any, List
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from app.utils import resolve_ref
+from app.ref_resolver import node_identity
 
-def build_positive_assertions(response_schema: Dict[str, Any], spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+
+class SchemaViolation(NamedTuple):
+    path: str      # JSON path of the offending value, e.g. "$.items[0].id"
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
+def json_path(parts: Iterable[Any], root: str = "$") -> str:
+    """
+    Builds a JSON path from object keys and array indices.
+    """
+    path = root
+    for part in parts:
+        if isinstance(part, int):
+            path += f"[{part}]"
+        elif re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", str(part)):
+            path += f".{part}"
+        else:
+            path += "['" + str(part).replace("'", "\\'") + "']"
+    return path
+
+
+def _raw(obj: Any) -> Any:
+    # Lazy spec views (app.ref_resolver) wrap the raw node, $refs in place
+    return getattr(obj, "_node", obj)
+
+
+# (OpenAPI 3.0 validator class, OpenAPI 3.1 validator class), or () without jsonschema
+_validator_classes = None
+
+
+def _load_validator_classes() -> Tuple[Any, ...]:
+    # jsonschema is slow to import, so it is only loaded once the first schema is compiled
+    global _validator_classes
+    if _validator_classes is None:
+        try:
+            import jsonschema  # Full JSON Schema support; a built-in subset is used without it
+        except ImportError:
+            _validator_classes = ()
+        else:
+            draft4_type = jsonschema.Draft4Validator.VALIDATORS["type"]
+
+            def openapi_type(validator, types, instance, schema):
+                # OpenAPI 3.0 "nullable: true" also admits null
+                if instance is None and schema.get("nullable"):
+                    return
+                yield from draft4_type(validator, types, instance, schema)
+
+            # OpenAPI 3.0 schemas are a Draft 4 dialect, 3.1 schemas are Draft 2020-12
+            _validator_classes = (
+                jsonschema.validators.extend(jsonschema.Draft4Validator, {"type": openapi_type}),
+                jsonschema.Draft202012Validator
+            )
+    return _validator_classes
+
+
+class SchemaValidator:
+    """
+    A schema compiled once for validating any number of instances.
+
+    $refs are resolved against the spec the schema came from. With
+    jsonschema installed the full vocabulary is checked; otherwise a
+    built-in subset (types, enum, bounds, lengths, patterns, required and
+    additional properties, array bounds, allOf/oneOf/anyOf).
+    """
+
+    def __init__(self, schema: Dict[str, Any], spec: Dict[str, Any]):
+        self.schema = schema
+        self.spec = spec
+        self._validator = None
+        classes = _load_validator_classes()
+        if classes:
+            raw_spec = _raw(spec) or {}
+            # The schema's $refs point into the spec, so the spec's sections ride along in the root document
+            root = {key: raw_spec[key] for key in ("components", "definitions") if key in raw_spec}
+            root["allOf"] = [_raw(schema)]
+            openapi_30, openapi_31 = classes
+            cls = openapi_31 if str(raw_spec.get("openapi", "")).startswith("3.1") else openapi_30
+            self._validator = cls(root)
+
+    def iter_errors(self, instance: Any, root: str = "$") -> Iterator[SchemaViolation]:
+        if self._validator is None:
+            yield from _iter_basic_errors(instance, self.schema, self.spec, root)
+            return
+        for error in self._validator.iter_errors(instance):
+            yield SchemaViolation(json_path(error.absolute_path, root), error.message)
+
+    def errors(self, instance: Any, limit: Optional[int] = None, root: str = "$") -> List[SchemaViolation]:
+        """
+        The violations of instance, at most limit of them.
+        """
+        violations = []
+        for violation in self.iter_errors(instance, root):
+            violations.append(violation)
+            if limit is not None and len(violations) >= limit:
+                break
+        return violations
+
+    def first_error(self, instance: Any, root: str = "$") -> Optional[SchemaViolation]:
+        return next(self.iter_errors(instance, root), None)
+
+    def is_valid(self, instance: Any) -> bool:
+        if self._validator is not None:
+            return self._validator.is_valid(instance)
+        return self.first_error(instance) is None
+
+    def validate_many(self, instances: Iterable[Any], limit: Optional[int] = None) -> List[List[SchemaViolation]]:
+        """
+        The violations of every instance, in order; valid instances get an
+        empty list without their errors being collected.
+        """
+        return [[] if self.is_valid(instance) else self.errors(instance, limit) for instance in instances]
+
+
+class ValidatorCache:
+    """
+    LRU cache of SchemaValidators keyed by schema and spec identity. Entries
+    keep a reference to both so the identity-based keys stay valid. Safe to
+    share between threads; validators are compiled outside the lock.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[int, int], SchemaValidator]" = OrderedDict()
+        # move_to_end must not interleave with another thread's popitem
+        self._lock = threading.Lock()
+
+    def get(self, schema: Dict[str, Any], spec: Dict[str, Any]) -> SchemaValidator:
+        key = (node_identity(schema), node_identity(spec))
+        with self._lock:
+            validator = self._entries.get(key)
+            if validator is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return validator
+            self.misses += 1
+
+        validator = SchemaValidator(schema, spec)
+        with self._lock:
+            # Another thread may have compiled the same schema meanwhile; keep the first
+            validator = self._entries.setdefault(key, validator)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return validator
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize
+        }
+
+
+validator_cache = ValidatorCache()
+
+# Spec for schemas without $refs into one (a single object, so its identity is stable)
+_NO_SPEC: Dict[str, Any] = {}
+
+
+def get_validator(schema: Dict[str, Any], spec: Optional[Dict[str, Any]] = None) -> SchemaValidator:
+    """
+    The compiled validator for schema, built on first use.
+    """
+    return validator_cache.get(schema, spec if spec is not None else _NO_SPEC)
+
+
+def validate_response(instance: Any, schema: Dict[str, Any], spec: Optional[Dict[str, Any]] = None,
+                      limit: Optional[int] = None) -> List[SchemaViolation]:
+    return get_validator(schema, spec).errors(instance, limit)
+
+
+def validate_responses(responses: Iterable[Tuple[Dict[str, Any], Any]], spec: Optional[Dict[str, Any]] = None,
+                       limit: Optional[int] = None) -> Iterator[List[SchemaViolation]]:
     """
-    Builds positive assertions based on the response schema.
+    Validates (schema, instance) pairs in order, e.g. a whole run's response
+    bodies; each distinct schema is compiled once.
+    """
+    for schema, instance in responses:
+        validator = get_validator(schema, spec)
+        yield [] if validator.is_valid(instance) else validator.errors(instance, limit)
+
+
+def _is_integer(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) or isinstance(value, float) and value.is_integer()
+
+
+TYPE_CHECKS = {
+    "integer": _is_integer,
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+    "null": lambda v: v is None
+}
+
+
+def _iter_basic_errors(value: Any, schema: Dict[str, Any], spec: Dict[str, Any], path: str) -> Iterator[SchemaViolation]:
+    # Built-in subset of JSON Schema used when jsonschema is not installed
+    schema = _raw(schema)
+    if not isinstance(schema, dict):
+        return
+    if "$ref" in schema:
+        schema = resolve_ref(schema["$ref"], _raw(spec))
+
+    for sub_schema in schema.get("allOf", []):
+        yield from _iter_basic_errors(value, sub_schema, spec, path)
+    for keyword in ("oneOf", "anyOf"):
+        if schema.get(keyword):
+            errors = [list(_iter_basic_errors(value, sub_schema, spec, path)) for sub_schema in schema[keyword]]
+            if all(errors):
+                yield SchemaViolation(path, f"does not match any {keyword} alternative")
+
+    schema_type = schema.get("type")
+    check = TYPE_CHECKS.get(schema_type)
+    if check is not None and not check(value):
+        if not (value is None and schema.get("nullable")):
+            yield SchemaViolation(path, f"expected {schema_type}")
+        return
+    if "enum" in schema and value not in schema["enum"]:
+        yield SchemaViolation(path, "not one of the allowed values")
+
+    if isinstance(value, str):
+        if len(value) < schema.get("minLength", 0):
+            yield SchemaViolation(path, f"shorter than {schema['minLength']}")
+        if "maxLength" in schema and len(value) > schema["maxLength"]:
+            yield SchemaViolation(path, f"longer than {schema['maxLength']}")
+        if schema.get("pattern") and not re.search(schema["pattern"], value):
+            yield SchemaViolation(path, f"does not match {schema['pattern']}")
+    elif TYPE_CHECKS["number"](value):
+        if "minimum" in schema and (value < schema["minimum"] or value == schema["minimum"] and schema.get("exclusiveMinimum") is True):
+            yield SchemaViolation(path, f"below minimum {schema['minimum']}")
+        if "maximum" in schema and (value > schema["maximum"] or value == schema["maximum"] and schema.get("exclusiveMaximum") is True):
+            yield SchemaViolation(path, f"above maximum {schema['maximum']}")
+    elif isinstance(value, dict):
+        properties = schema.get("properties", {})
+        for name in schema.get("required", []):
+            if name not in value:
+                yield SchemaViolation(path, f"'{name}' is required")
+        for name, item in value.items():
+            if name in properties:
+                yield from _iter_basic_errors(item, properties[name], spec, json_path([name], path))
+            elif schema.get("additionalProperties") is False:
+                yield SchemaViolation(json_path([name], path), "unexpected property")
+    elif isinstance(value, list):
+        if len(value) < schema.get("minItems", 0):
+            yield SchemaViolation(path, f"fewer than {schema['minItems']} items")
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            yield SchemaViolation(path, f"more than {schema['maxItems']} items")
+        if schema.get("items"):
+            for i, item in enumerate(value):
+                yield from _iter_basic_errors(item, schema["items"], spec, json_path([i], path))
+
+
+def build_positive_assertions(response_schema: Dict[str, Any], spec: Dict[str, Any],
+                              status_code: Union[int, str] = 200) -> List[Dict[str, Any]]:
+    """
+    Builds positive assertions based on the response schema. status_code is
+    the success status the schema was declared for, or "2xx" when it comes
+    from the default response.
     """
     assertions = []
     if response_schema.get("type") == "object":
         assertions.append({
             "type": "status_code",
-            "expected": 200
+            "expected": status_code
+        })
+    if response_schema:
+        # Validated with get_validator(expected, spec) by the test runner
+        assertions.append({
+            "type": "schema",
+            "expected": response_schema
         })
     return assertions
 
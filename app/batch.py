@@ -0,0 +1,309 @@
+# app/batch.py
+
+"""
+Non-interactive batch generation over many specs.
+
+Spec files, globs and directories are expanded into a list of specs, each
+spec is generated and exported in its own task of a process pool, and one
+aggregated report (per-spec timings, totals and per-stage sums) is printed
+at the end:
+
+    python -m app.batch specs/ --format json --format postman --out-dir generated --workers 8
+
+Outputs go to <out-dir>/<spec path relative to its input, without the
+extension>/, so specs with the same file name in different directories do
+not overwrite each other. Exits with status 1 when any spec failed.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from app.swagger_loader import SwaggerLoader
+from app.test_generator import TestGenerator
+from app.negative_test_generator import NegativeTestGenerator
+from app.exporter import write_csv, write_jsonl, write_postman_collection, write_postman_shards
+from app.fingerprint import manifest_path_for
+from app.instrumentation import STAGES, metrics
+from app.test_case import TestCase
+from app import serialization
+
+SPEC_EXTENSIONS = (".json", ".yaml", ".yml")
+
+# --format value -> output file (or directory) name in a spec's output directory
+FORMATS = {
+    "json": "generated_test_cases.json",
+    "jsonl": "generated_test_cases.jsonl",
+    "csv": "generated_test_cases.csv",
+    "postman": "postman_collection.json",
+    "postman-shards": "postman_collections",
+}
+
+# Output name the negative cases' fingerprint manifest is kept under (see fingerprint.manifest_path_for)
+NEGATIVE_MANIFEST_NAME = "negative_test_cases"
+
+# Slowest specs listed in the report
+REPORT_SLOWEST = 10
+
+
+class BatchOptions(NamedTuple):
+    formats: Tuple[str, ...] = ("json",)
+    positive: bool = True
+    negative: bool = False
+    base_url: str = "http://localhost"
+    incremental: bool = False
+
+
+class SpecResult(NamedTuple):
+    spec: str
+    output_dir: str
+    ok: bool
+    operations: int
+    positive: int
+    negative: int
+    seconds: float
+    stages: Dict[str, float]    # stage -> seconds spent in it for this spec
+    files: Tuple[str, ...]
+    error: Optional[str] = None
+
+
+def discover_specs(inputs: List[str]) -> List[Tuple[str, str]]:
+    """
+    Expands spec files, globs and directories (searched recursively for
+    SPEC_EXTENSIONS files) into (spec path, output name) pairs, in input
+    order without duplicates. The output name is the spec's path relative
+    to the directory (or glob prefix) it was found under, without the
+    extension. Raises FileNotFoundError for inputs that match nothing.
+    """
+    found: Dict[str, str] = {}
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            base = pattern
+            matches = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(pattern)
+                for name in names if name.endswith(SPEC_EXTENSIONS)
+            )
+        elif glob.has_magic(pattern):
+            base = _glob_base(pattern)
+            matches = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        elif os.path.isfile(pattern):
+            base = os.path.dirname(pattern)
+            matches = [pattern]
+        else:
+            matches = []
+        if not matches:
+            raise FileNotFoundError(f"No specs found for {pattern!r}")
+        for path in matches:
+            key = os.path.normpath(path)
+            if key not in found:
+                found[key] = os.path.splitext(os.path.relpath(path, base or "."))[0]
+
+    # The same relative name under two inputs would share an output directory
+    names: Dict[str, int] = {}
+    specs = []
+    for path, name in found.items():
+        names[name] = names.get(name, 0) + 1
+        specs.append((path, name if names[name] == 1 else f"{name}-{names[name]}"))
+    return specs
+
+
+def _glob_base(pattern: str) -> str:
+    # Leading directories of pattern without glob characters
+    parts = []
+    for part in pattern.replace(os.sep, "/").split("/")[:-1]:
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return "/".join(parts)
+
+
+def generate_spec(spec: str, output_dir: str, options: BatchOptions) -> SpecResult:
+    """
+    Generates and exports the test cases of one spec into output_dir. Runs in
+    a pool worker; failures are returned as a SpecResult with ok=False
+    rather than raised, so one broken spec does not stop the batch.
+    """
+    metrics.reset()
+    start = time.perf_counter()
+    counts = {"operations": 0, "positive": 0, "negative": 0}
+    files: List[str] = []
+    try:
+        with SwaggerLoader(spec, lazy=True) as loader:
+            index = loader.operation_index()
+            counts["operations"] = len(index)
+
+            test_cases: List[TestCase] = []
+            if options.positive:
+                generator = TestGenerator(loader)
+                if options.incremental:
+                    positive = generator.generate_incremental(manifest_path_for(os.path.join(output_dir, FORMATS["json"])))
+                else:
+                    positive = generator.generate_test_cases()
+                counts["positive"] = len(positive)
+                test_cases.extend(positive)
+            if options.negative:
+                negative_generator = NegativeTestGenerator(loader)
+                if options.incremental:
+                    # A manifest of its own: the negative generator records its own options and cases
+                    negative = negative_generator.generate_incremental(manifest_path_for(os.path.join(output_dir, NEGATIVE_MANIFEST_NAME)))
+                else:
+                    negative = negative_generator.generate_negative_tests()
+                counts["negative"] = len(negative)
+                test_cases.extend(negative)
+
+            os.makedirs(output_dir, exist_ok=True)
+            for fmt in options.formats:
+                dest = os.path.join(output_dir, FORMATS[fmt])
+                if fmt == "json":
+                    with metrics.stage("export"), open(dest, "wb") as f:
+                        serialization.dump(test_cases, f, pretty=True)
+                elif fmt == "jsonl":
+                    write_jsonl(test_cases, dest)
+                elif fmt == "csv":
+                    write_csv(test_cases, dest)
+                elif fmt == "postman":
+                    write_postman_collection(test_cases, dest, options.base_url, index)
+                elif fmt == "postman-shards":
+                    write_postman_shards(test_cases, dest, options.base_url, index)
+                files.append(dest)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    stages = {name: stats["seconds"] for name, stats in metrics.report()["stages"].items()}
+    return SpecResult(spec, output_dir, error is None, counts["operations"], counts["positive"], counts["negative"],
+                      time.perf_counter() - start, stages, tuple(files), error)
+
+
+def iter_batch(specs: List[Tuple[str, str]], out_dir: str, options: BatchOptions,
+               workers: int = 1) -> Iterator[SpecResult]:
+    """
+    Generates every (spec, output name) pair from discover_specs() and yields
+    the results as they finish. With workers > 1 specs are spread over a
+    process pool of that size; each spec is generated serially in its worker.
+    """
+    tasks = [(spec, os.path.join(out_dir, name)) for spec, name in specs]
+    if workers <= 1:
+        for spec, output_dir in tasks:
+            yield generate_spec(spec, output_dir, options)
+        return
+
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(generate_spec, spec, output_dir, options) for spec, output_dir in tasks]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def summarize(results: List[SpecResult], wall_seconds: float, workers: int) -> Dict[str, Any]:
+    """
+    Aggregated batch report: totals, per-stage sums over all specs, the
+    slowest specs and the failures.
+    """
+    ok = [r for r in results if r.ok]
+    stage_names = [s for s in STAGES if any(s in r.stages for r in results)]
+    stage_names += sorted({s for r in results for s in r.stages} - set(stage_names))
+    return {
+        "specs": len(results),
+        "succeeded": len(ok),
+        "failed": len(results) - len(ok),
+        "workers": workers,
+        "wall_seconds": round(wall_seconds, 3),
+        "spec_seconds": round(sum(r.seconds for r in results), 3),
+        "operations": sum(r.operations for r in ok),
+        "positive": sum(r.positive for r in ok),
+        "negative": sum(r.negative for r in ok),
+        "stages": {name: round(sum(r.stages.get(name, 0.0) for r in results), 6) for name in stage_names},
+        "slowest": [
+            {"spec": r.spec, "seconds": round(r.seconds, 3), "operations": r.operations}
+            for r in sorted(results, key=lambda r: r.seconds, reverse=True)[:REPORT_SLOWEST]
+        ],
+        "failures": [{"spec": r.spec, "error": r.error} for r in results if not r.ok],
+        "results": [
+            {"spec": r.spec, "output_dir": r.output_dir, "ok": r.ok, "operations": r.operations,
+             "positive": r.positive, "negative": r.negative, "seconds": round(r.seconds, 3),
+             "files": list(r.files), "error": r.error}
+            for r in results
+        ],
+    }
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """
+    Plain-text rendering of summarize() for terminals.
+    """
+    lines = [
+        f"Specs: {summary['specs']} ({summary['succeeded']} succeeded, {summary['failed']} failed)",
+        f"Test cases: {summary['positive'] + summary['negative']} "
+        f"({summary['positive']} positive, {summary['negative']} negative) for {summary['operations']} operations",
+        f"Wall time: {summary['wall_seconds']:.2f}s with {summary['workers']} worker(s), "
+        f"{summary['spec_seconds']:.2f}s summed over specs",
+        "",
+        f"{'stage':<18}{'seconds':>12}",
+    ]
+    lines += [f"{name:<18}{seconds:>12.4f}" for name, seconds in summary["stages"].items()]
+    lines += ["", f"{'slowest specs':<56}{'seconds':>10}{'operations':>12}"]
+    lines += [f"{r['spec'][-56:]:<56}{r['seconds']:>10.2f}{r['operations']:>12}" for r in summary["slowest"]]
+    if summary["failures"]:
+        lines += ["", "Failures:"]
+        lines += [f"  - {f['spec']}: {f['error']}" for f in summary["failures"]]
+    return "\n".join(lines)
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate and export API test cases for many specs at once.")
+    parser.add_argument("inputs", nargs="+", metavar="SPEC",
+                        help="Spec file, glob (quote it, e.g. 'specs/**/*.json') or directory of specs")
+    parser.add_argument("--out-dir", default="generated", help="Root output directory (default: generated)")
+    parser.add_argument("--format", action="append", dest="formats", choices=sorted(FORMATS),
+                        help="Output format (repeatable; default: json)")
+    parser.add_argument("--base-url", default="http://localhost", help="Base URL for Postman collections")
+    parser.add_argument("--negative", action="store_true", help="Also generate negative test cases")
+    parser.add_argument("--no-positive", action="store_false", dest="positive", help="Skip positive test cases")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only regenerate operations changed since the last run of each spec")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Specs generated at once, one process each (default: CPU count)")
+    parser.add_argument("--report", metavar="FILE", help="Also write the aggregated report as JSON to FILE")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final report")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    try:
+        specs = discover_specs(args.inputs)
+    except FileNotFoundError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 2
+    options = BatchOptions(tuple(dict.fromkeys(args.formats or ["json"])), args.positive, args.negative,
+                           args.base_url, args.incremental)
+    workers = max(1, min(args.workers, len(specs)))
+
+    start = time.perf_counter()
+    results = []
+    for result in iter_batch(specs, args.out_dir, options, workers):
+        results.append(result)
+        if not args.quiet:
+            status = "ok" if result.ok else "FAILED"
+            print(f"[{len(results)}/{len(specs)}] {status:<6} {result.spec} "
+                  f"({result.positive + result.negative} cases, {result.seconds:.2f}s)")
+    summary = summarize(results, time.perf_counter() - start, workers)
+
+    print("\n" + format_summary(summary))
+    if args.report:
+        with open(args.report, "wb") as f:
+            serialization.dump(summary, f, pretty=True)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+# app/chatgpt_engine.py
+
+import asyncio
+import os
+import random
+from typing import Iterable, List, Optional, Tuple
+
+from app.http_client import AsyncHttpClient
+from app.response_cache import DiskCache, cache_key
+from app.instrumentation import Instrumentation, metrics
+
+DEFAULT_API_BASE = "https://api.openai.com/v1"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "smart-api-testcase-generator", "chatgpt")
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ChatGPTEngine:
+    """
+    Asyncio ChatGPT summary engine.
+
+    At most max_concurrency requests are in flight at once, rate-limit and
+    transient server errors are retried with exponential backoff (honouring
+    Retry-After), and successful answers are cached on disk keyed by a hash
+    of model and prompt. api_base can point at any OpenAI-compatible server,
+    e.g. a local stub.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-3.5-turbo",
+                 api_base: Optional[str] = None, max_concurrency: int = 8, max_retries: int = 5,
+                 backoff: float = 1.0, timeout: float = 30.0, cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = 64 * 1024 * 1024, use_cache: bool = True):
+        self.api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY")
+        self.model = model
+        self.api_base = (api_base or os.getenv("OPENAI_API_BASE") or DEFAULT_API_BASE).rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = None
+        if use_cache:
+            self.cache = DiskCache(cache_dir or os.getenv("CHATGPT_CACHE_DIR") or DEFAULT_CACHE_DIR, cache_max_bytes)
+
+    @staticmethod
+    def build_prompt(summary: str, path: str, operation: str) -> str:
+        return f"Generate a user-friendly test summary for this API call:\nMethod: {operation.upper()}\nPath: {path}\nDescription: {summary}\n"
+
+    def summarize(self, summary: str, path: str, operation: str,
+                  instrumentation: Optional[Instrumentation] = None) -> str:
+        return self.summarize_many([(summary, path, operation)], instrumentation)[0]
+
+    def summarize_many(self, items: Iterable[Tuple[str, str, str]],
+                       instrumentation: Optional[Instrumentation] = None) -> List[str]:
+        """
+        Summarizes (summary, path, operation) triples concurrently, in order.
+        Requests and cache hits are counted in instrumentation (default: the
+        process-wide metrics).
+        """
+        return asyncio.run(self.summarize_many_async(items, instrumentation))
+
+    async def summarize_many_async(self, items: Iterable[Tuple[str, str, str]],
+                                   instrumentation: Optional[Instrumentation] = None) -> List[str]:
+        items = list(items)
+        stats = instrumentation or metrics
+        limit = asyncio.Semaphore(self.max_concurrency)
+        async with AsyncHttpClient(max_connections_per_host=self.max_concurrency, timeout=self.timeout) as client:
+            return await asyncio.gather(*(self._summarize_one(client, limit, stats, *item) for item in items))
+
+    async def _summarize_one(self, client: AsyncHttpClient, limit: asyncio.Semaphore, stats: Instrumentation,
+                             summary: str, path: str, operation: str) -> str:
+        prompt = self.build_prompt(summary, path, operation)
+        key = cache_key(self.model, prompt)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                stats.count("chatgpt_cache_hits")
+                return cached
+
+        async with limit:
+            try:
+                content = await self._complete(client, prompt, stats)
+            except Exception:
+                return f"[ChatGPT fallback] {summary}"
+
+        if self.cache is not None:
+            self.cache.set(key, content)
+        return content
+
+    async def _complete(self, client: AsyncHttpClient, prompt: str, stats: Instrumentation) -> str:
+        request = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": 50,
+            "temperature": 0.5
+        }
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+        for attempt in range(self.max_retries + 1):
+            stats.count("chatgpt_requests")
+            response = await client.request("POST", f"{self.api_base}/chat/completions", headers=headers, json_body=request)
+            if response.status == 200:
+                return response.json()["choices"][0]["message"]["content"].strip()
+            if response.status not in RETRY_STATUSES or attempt == self.max_retries:
+                raise RuntimeError(f"ChatGPT request failed with status {response.status}: {response.text[:200]}")
+
+            retry_after = response.headers.get("retry-after")
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = self.backoff * (2 ** attempt) * (1 + random.random() * 0.1)
+            await asyncio.sleep(delay)
+
+
+_default_engine: Optional[ChatGPTEngine] = None
+
+
+def get_chatgpt_engine() -> ChatGPTEngine:
+    """
+    Returns the process-wide engine, created from the environment on first use.
+    """
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = ChatGPTEngine()
+    return _default_engine
+
+
+def set_chatgpt_engine(engine: Optional[ChatGPTEngine]) -> None:
+    """
+    Replaces the process-wide engine (None recreates it from the environment).
+    """
+    global _default_engine
+    _default_engine = engine
+
+
+def generate_summaries_chatgpt(items: Iterable[Tuple[str, str, str]], batch_size: int = 64, n_process: int = 1,
+                               instrumentation: Optional[Instrumentation] = None) -> List[str]:
+    """
+    Summary engine plugin (see app.nlp_summary): the whole batch is sent
+    concurrently, bounded by the engine's max_concurrency, so batch_size and
+    n_process do not apply.
+    """
+    items = list(items)
+    try:
+        return get_chatgpt_engine().summarize_many(items, instrumentation)
+    except Exception:
+        return [f"[ChatGPT fallback] {summary}" for summary, _, _ in items]
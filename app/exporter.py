@@ -1,81 +1,346 @@
-import json
 import csv
+import hashlib
 import io
+import os
+import re
+from contextlib import contextmanager
+from app import serialization
+from app.instrumentation import metrics
+from app.test_case import as_test_case
+
+HTTP_METHODS = ["get", "post", "put", "delete", "patch", "options", "head"]
+
+POSTMAN_INFO = {
+    "name": "Generated API Tests",
+    "schema": "https://schema.getpostman.com/json/collection/v2.1.0/collection.json"
+}
+
+@contextmanager
+def open_output(dest):
+    """
+    Yields a writable text stream for dest, which is either a file path
+    (opened and closed here) or an already open text stream.
+    """
+    if isinstance(dest, (str, os.PathLike)):
+        with open(dest, "w", encoding="utf-8", newline="") as f:
+            yield f
+    else:
+        yield dest
+
+@contextmanager
+def open_binary_output(dest):
+    """
+    Yields a function writing bytes to dest: a file path (opened in binary
+    mode here), a binary stream, or a text stream (the bytes are decoded).
+    """
+    if isinstance(dest, (str, os.PathLike)):
+        with open(dest, "wb") as f:
+            yield f.write
+    elif serialization.is_text_stream(dest):
+        yield lambda data: dest.write(data.decode("utf-8"))
+    else:
+        yield dest.write
 
 # Export to CSV (returns CSV string)
 def generate_csv(test_cases):
     output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Path", "Operation", "Summary", "Assertions"])
-
-    for case in test_cases:
-        path = case.get("path", "")
-        operation = case.get("operation", "")
-        summary = case.get("summary", "")
-        assertions = ", ".join(
-            a.get("type", "") + "=" + str(a.get("expected", ""))
-            for a in case.get("assertions", [])
-        )
-        writer.writerow([path, operation, summary, assertions])
+    write_csv(test_cases, output)
+    return output.getvalue()
+
+# Exporters accept TestCase objects (see app.test_case) and their dict form alike
+def case_method(case):
+    return as_test_case(case).method
 
+def case_assertions(case):
+    # The checks run for the case: positive assertions for positive cases, the error checks for negative ones
+    return as_test_case(case).assertions
+
+def assertion_label(assertion):
+    # Schemas are too large for a CSV cell; status codes and other scalars are shown as is
+    if assertion.get("type") == "schema":
+        return "schema"
+    return assertion.get("type", "") + "=" + str(assertion.get("expected", ""))
+
+# Export to CSV, writing each row as soon as its test case is produced
+def write_csv(test_cases, dest):
+    with metrics.stage("export"), open_output(dest) as output:
+        writer = csv.writer(output)
+        writer.writerow(["Path", "Operation", "Summary", "Assertions"])
+
+        for case in map(as_test_case, test_cases):
+            summary = getattr(case, "summary", "")  # Only negative cases have a summary
+            assertions = ", ".join(assertion_label(a) for a in case.assertions)
+            writer.writerow([case.path, case.method, summary, assertions])
+
+# Export to JSON Lines (returns bytes)
+def generate_jsonl(test_cases):
+    output = io.BytesIO()
+    write_jsonl(test_cases, output)
     return output.getvalue()
 
+# Export to JSON Lines: one compact JSON test case per line, written as it is produced
+def write_jsonl(test_cases, dest):
+    with metrics.stage("export"), open_binary_output(dest) as write:
+        for case in test_cases:
+            write(serialization.dumps(case) + b"\n")
+
 # Export to Postman Collection (returns JSON string)
-def generate_postman_collection(test_cases, base_url="http://localhost"):
-    output = io.StringIO()
+def generate_postman_collection(test_cases, base_url="http://localhost", index=None):
+    return generate_postman_collection_bytes(test_cases, base_url, index).decode("utf-8")
 
-    collection = {
-        "info": {
-            "name": "Generated API Tests",
-            "schema": "https://schema.getpostman.com/json/collection/v2.1.0/collection.json"
+# Export to Postman Collection as UTF-8 bytes (e.g. for downloads, without re-encoding)
+def generate_postman_collection_bytes(test_cases, base_url="http://localhost", index=None):
+    output = io.BytesIO()
+    write_postman_collection(test_cases, output, base_url, index)
+    return output.getvalue()
+
+# Export to Postman Collection, writing each item as soon as its test case is produced.
+# The output is byte-for-byte what serialization.dumps(collection, pretty=True) would give.
+# With the spec's OperationIndex, requests also list their query and header parameters.
+def write_postman_collection(test_cases, dest, base_url="http://localhost", index=None):
+    with metrics.stage("export"), open_binary_output(dest) as write:
+        write(b'{\n  "info": ')
+        write(_indent_json(POSTMAN_INFO, b"  "))
+        write(b',\n  "item": [')
+
+        count = 0
+        for case in test_cases:
+            item = build_postman_item(case, base_url, index)
+            if item is None:
+                continue
+            write(b",\n    " if count else b"\n    ")
+            write(_indent_json(item, b"    "))
+            count += 1
+
+        write(b"\n  ]\n}" if count else b"]\n}")
+
+def _indent_json(obj, prefix):
+    # Nested pretty JSON re-indented to sit at the given depth
+    return serialization.dumps(obj, pretty=True).replace(b"\n", b"\n" + prefix)
+
+def build_postman_item(case, base_url="http://localhost", index=None):
+    """
+    Builds a single Postman collection item for a test case, or None when
+    the case has no valid HTTP method.
+    """
+    case = as_test_case(case)
+    path, operation = case.path, case.method
+
+    # Ensure that 'operation' is a valid HTTP method (GET, POST, etc.)
+    if operation not in HTTP_METHODS:
+        return None  # Skip invalid operation types
+
+    item = {
+        "name": f"{operation.upper()} {path}",
+        "request": {
+            "method": operation.upper(),
+            "header": [],
+            "url": {
+                "raw": f"{base_url}{path}",
+                "host": [base_url.replace("http://", "").replace("https://", "")],
+                "path": path.strip("/").split("/")
+            }
         },
-        "item": []
+        "response": []
     }
 
-    for case in test_cases:
-        path = case.get("path", "")
-        operation = case.get("operation", "").lower()
-        
-        # Ensure that 'operation' is a valid HTTP method (GET, POST, etc.)
-        if operation not in ["get", "post", "put", "delete", "patch", "options", "head"]:
-            continue  # Skip invalid operation types
-
-        item = {
-            "name": f"{operation.upper()} {path}",
-            "request": {
-                "method": operation.upper(),
-                "header": [],
-                "url": {
-                    "raw": f"{base_url}{path}",
-                    "host": [base_url.replace("http://", "").replace("https://", "")],
-                    "path": path.strip("/").split("/")
+    indexed = index.get(path, operation) if index is not None else None
+    if indexed is not None:
+        headers = [{"key": p.get("name"), "value": ""} for p in indexed.params("header")]
+        query = [{"key": p.get("name"), "value": ""} for p in indexed.params("query")]
+        if headers:
+            item["request"]["header"] = headers
+        if query:
+            item["request"]["url"]["query"] = query
+
+    assertions = case.assertions
+    if assertions:
+        tests = []
+        for assertion in assertions:
+            if assertion["type"] == "status_code":
+                expected = assertion["expected"]
+                if isinstance(expected, str) and expected.lower().endswith("xx") and expected[0].isdigit():
+                    # A status class such as "2xx"
+                    low = int(expected[0]) * 100
+                    check = f"pm.expect(pm.response.code).to.be.within({low}, {low + 99});"
+                else:
+                    check = f"pm.response.to.have.status({expected});"
+                tests.append(f'pm.test("Status code is {expected}", function () {{ {check} }});')
+            elif assertion["type"] == "schema":
+                schema = serialization.dumps_text(assertion["expected"])
+                tests.append(
+                    f'pm.test("Response matches schema", function () {{ pm.response.to.have.jsonSchema({schema}); }});'
+                )
+
+        if tests:
+            item["event"] = [{
+                "listen": "test",
+                "script": {
+                    "type": "text/javascript",
+                    "exec": tests
                 }
-            },
-            "response": []
-        }
-
-        if case.get("assertions"):
-            tests = []
-            for assertion in case["assertions"]:
-                if assertion["type"] == "status_code":
-                    tests.append(
-                        f'pm.test("Status code is {assertion["expected"]}", function () {{ pm.response.to.have.status({assertion["expected"]}); }});'
-                    )
-                # Add more assertion types here (e.g., schema validation)
-                # if assertion["type"] == "schema":
-                #     tests.append(f'pm.test("Schema is valid", function () {{ pm.response.to.have.jsonSchema({assertion["expected"]}); }});')
-
-            if tests:
-                item["event"] = [{
-                    "listen": "test",
-                    "script": {
-                        "type": "text/javascript",
-                        "exec": tests
-                    }
-                }]
-        
-        collection["item"].append(item)
-
-    json.dump(collection, output, indent=2)
-    output.seek(0)
-    return output.getvalue()
+            }]
+
+    return item
+
+
+# Tag folder for operations without tags
+UNTAGGED = "untagged"
+
+SHARD_SUFFIX = ".postman_collection.json"
+
+# Record of the shard files written per tag, kept in the shard directory; only files listed here are ever removed
+SHARD_MANIFEST = ".postman_shards.json"
+
+def case_tag(case, index=None):
+    """
+    The tag a test case is filed under: its first tag, else the first tag of
+    its operation in index, else UNTAGGED.
+    """
+    case = as_test_case(case)
+    tags = case.tags
+    if not tags and index is not None:
+        indexed = index.get(case.path, case.method)
+        tags = indexed.tags if indexed is not None else ()
+    return tags[0] if tags else UNTAGGED
+
+def shard_slug(tag):
+    """
+    File name stem for a tag. Tags made only of lowercase letters, digits,
+    "_", "." and "-" are used as is; any other tag is reduced to those
+    characters and gets a "+" and a short hash of the tag, so two tags never
+    share a file (e.g. "user admin" and "user/admin"), even on
+    case-insensitive file systems.
+    """
+    slug = re.sub(r"[^a-z0-9_.-]+", "_", tag.lower()).strip("_")
+    if slug and slug == tag:
+        return slug
+    digest = hashlib.sha1(tag.encode("utf-8")).hexdigest()[:8]
+    return f"{slug or 'tag'}+{digest}"
+
+class _ShardWriter:
+    """
+    One Postman collection file holding a single tag folder, written item by
+    item. The file is byte-for-byte serialization.dumps(collection, pretty=True).
+    """
+
+    # Closing brackets of the item list, the folder, the folder list and the collection
+    FOOTER = b"\n      ]\n    }\n  ]\n}"
+
+    def __init__(self, filename, tag, part):
+        self.filename = filename
+        self.count = 0
+        name = POSTMAN_INFO["name"] + f" - {tag}" + (f" ({part})" if part > 1 else "")
+        self._file = open(filename, "wb")
+        self._write(b'{\n  "info": ')
+        self._write(_indent_json(dict(POSTMAN_INFO, name=name), b"  "))
+        self._write(b',\n  "item": [\n    {\n      "name": ')
+        self._write(serialization.dumps(tag))
+        self._write(b',\n      "item": [')
+
+    def _write(self, data):
+        self._file.write(data)
+        self.size = self._file.tell()
+
+    def fits(self, item_bytes, max_items, max_bytes):
+        # An empty shard always takes the item, however large
+        if self.count == 0:
+            return True
+        if max_items and self.count >= max_items:
+            return False
+        if max_bytes and self.size + len(item_bytes) + 10 + len(self.FOOTER) > max_bytes:
+            return False
+        return True
+
+    def add(self, item_bytes):
+        self._write(b",\n        " if self.count else b"\n        ")
+        self._write(item_bytes)
+        self.count += 1
+
+    def close(self):
+        self._write(self.FOOTER)
+        self._file.close()
+
+def write_postman_shards(test_cases, directory, base_url="http://localhost", index=None,
+                         max_items=None, max_bytes=None, tags=None):
+    """
+    Writes test cases as Postman collections grouped into one folder per tag
+    (see case_tag), one set of files per tag in directory:
+    <slug>.postman_collection.json (see shard_slug), then <slug>~2..., once
+    a file reaches max_items items or max_bytes bytes. Items are written as
+    they are produced. With tags, only those tags' files are rewritten
+    (cases of other tags are skipped), so one tag can be regenerated on its
+    own. Files a rewritten tag had in an earlier export (as recorded in
+    SHARD_MANIFEST) but not in this one are removed; other files in
+    directory are never touched.
+    Returns [{"tag", "file", "items", "bytes"}] for the files written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    only = set(tags) if tags is not None else None
+    open_shards = {}   # tag -> current _ShardWriter
+    parts = {}         # tag -> number of files written so far
+    written = []
+
+    def finish(tag, shard):
+        shard.close()
+        written.append({"tag": tag, "file": shard.filename, "items": shard.count, "bytes": shard.size})
+
+    with metrics.stage("export"):
+        try:
+            for case in test_cases:
+                tag = case_tag(case, index)
+                if only is not None and tag not in only:
+                    continue
+                item = build_postman_item(case, base_url, index)
+                if item is None:
+                    continue
+                item_bytes = _indent_json(item, b"        ")
+
+                shard = open_shards.get(tag)
+                if shard is not None and not shard.fits(item_bytes, max_items, max_bytes):
+                    finish(tag, open_shards.pop(tag))
+                    shard = None
+                if shard is None:
+                    parts[tag] = parts.get(tag, 0) + 1
+                    shard = open_shards[tag] = _ShardWriter(_shard_filename(directory, tag, parts[tag]), tag, parts[tag])
+                shard.add(item_bytes)
+        finally:
+            for tag, shard in open_shards.items():
+                finish(tag, shard)
+
+    _update_shard_manifest(directory, written, only if only is not None else parts)
+    return written
+
+def _shard_filename(directory, tag, part):
+    # "~" never appears in a slug, so a part number cannot be mistaken for part of a tag
+    suffix = f"~{part}" if part > 1 else ""
+    return os.path.join(directory, f"{shard_slug(tag)}{suffix}{SHARD_SUFFIX}")
+
+def _update_shard_manifest(directory, written, rewritten_tags):
+    # Removes the files the rewritten tags had in the previous export but not in this one,
+    # then records this export's files; entries of other tags are kept as they were
+    path = os.path.join(directory, SHARD_MANIFEST)
+    try:
+        with open(path, "rb") as f:
+            recorded = serialization.load(f)
+    except (FileNotFoundError, ValueError):
+        recorded = {}
+    if not isinstance(recorded, dict):
+        recorded = {}
+
+    current = {}
+    for shard in written:
+        current.setdefault(shard["tag"], []).append(os.path.basename(shard["file"]))
+    for tag in rewritten_tags:
+        for name in set(recorded.get(tag, [])) - set(current.get(tag, [])):
+            try:
+                os.remove(os.path.join(directory, os.path.basename(name)))
+            except FileNotFoundError:
+                pass
+        recorded.pop(tag, None)
+    recorded.update(current)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        serialization.dump(recorded, f, pretty=True, sort_keys=True)
+    os.replace(tmp_path, path)
@@ -0,0 +1,157 @@
+# app/fingerprint.py
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Set
+
+from app.ref_resolver import RefResolver
+from app import serialization
+
+# Bumped whenever generated test cases change for the same spec and options
+MANIFEST_VERSION = 2
+
+
+def canonical_json(obj: Any) -> str:
+    """
+    Deterministic JSON text for hashing.
+    """
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def operation_key(path: str, method: str) -> str:
+    return f"{method.upper()} {path}"
+
+
+def manifest_path_for(output_path: str) -> str:
+    """
+    Where the fingerprint manifest for an output file is stored: next to it.
+    """
+    return f"{output_path}.fingerprints.json"
+
+
+def _collect_refs(node: Any, refs: Set[str]) -> None:
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if isinstance(ref, str):
+            refs.add(ref)
+        for value in node.values():
+            _collect_refs(value, refs)
+    elif isinstance(node, list):
+        for value in node:
+            _collect_refs(value, refs)
+
+
+class OperationFingerprinter:
+    """
+    Content fingerprints for operations of a raw (unresolved) spec.
+
+    A fingerprint covers the path, the method, the operation itself, the
+    path-level parameters and every component the operation transitively
+    references. Each component is hashed once per spec.
+    """
+
+    def __init__(self, resolver: RefResolver):
+        self.resolver = resolver
+        self._component_hashes: Dict[str, str] = {}
+        self._direct_refs: Dict[str, Set[str]] = {}
+
+    def _component(self, ref: str) -> None:
+        try:
+            node = self.resolver.lookup(ref)
+        except (KeyError, ValueError):
+            node = None
+        refs = set()
+        _collect_refs(node, refs)
+        self._direct_refs[ref] = refs
+        self._component_hashes[ref] = hashlib.sha256(canonical_json(node).encode("utf-8")).hexdigest()
+
+    def referenced_components(self, node: Any) -> List[str]:
+        """
+        All $ref pointers reachable from node, sorted.
+        """
+        pending = set()
+        _collect_refs(node, pending)
+        seen = set()
+        while pending:
+            ref = pending.pop()
+            if ref in seen:
+                continue
+            seen.add(ref)
+            if ref not in self._direct_refs:
+                self._component(ref)
+            pending |= self._direct_refs[ref] - seen
+        return sorted(seen)
+
+    def fingerprint(self, path: str, method: str, operation: Dict[str, Any],
+                    path_item: Optional[Dict[str, Any]] = None) -> str:
+        path_params = path_item.get("parameters", []) if path_item else []
+        digest = hashlib.sha256()
+        digest.update(canonical_json([path, method.lower(), operation, path_params]).encode("utf-8"))
+        for ref in self.referenced_components([operation, path_params]):
+            digest.update(f"\n{ref}={self._component_hashes[ref]}".encode("utf-8"))
+        return digest.hexdigest()
+
+
+class FingerprintManifest:
+    """
+    Fingerprints and generated test cases of a previous run, keyed by operation.
+
+    Entries are reused only when both the operation fingerprint and the
+    generator options match. Saving keeps only the operations recorded in
+    the current run, so removed operations are dropped.
+    """
+
+    def __init__(self, path: str, options: Dict[str, Any]):
+        self.path = path
+        self.options = options
+        self._previous: Dict[str, Dict[str, Any]] = {}
+        self._current: Dict[str, Dict[str, Any]] = {}
+        self.reused = 0
+        self.regenerated = 0
+
+        try:
+            with open(path, "rb") as f:
+                data = serialization.load(f)
+        except (FileNotFoundError, ValueError):
+            data = {}
+        # Anything but a manifest object (e.g. a JSON list written by hand) starts fresh
+        if not isinstance(data, dict):
+            data = {}
+        operations = data.get("operations")
+        if data.get("version") == MANIFEST_VERSION and data.get("options") == options and isinstance(operations, dict):
+            self._previous = operations
+
+    def reuse(self, key: str, fingerprint: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns the stored test cases for key if its fingerprint is unchanged.
+        """
+        entry = self._previous.get(key)
+        if isinstance(entry, dict) and entry.get("fingerprint") == fingerprint and isinstance(entry.get("test_cases"), list):
+            return entry["test_cases"]
+        return None
+
+    def record(self, key: str, fingerprint: str, test_cases: List[Any], reused: bool) -> None:
+        # Test cases are stored in their dict form (see app.test_case)
+        self._current[key] = {"fingerprint": fingerprint, "test_cases": test_cases}
+        if reused:
+            self.reused += 1
+        else:
+            self.regenerated += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "reused": self.reused,
+            "regenerated": self.regenerated,
+            "removed": len(set(self._previous) - set(self._current))
+        }
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {"version": MANIFEST_VERSION, "options": self.options, "operations": self._current}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            serialization.dump(data, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,150 @@
+# app/generation_job.py
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.swagger_loader import SwaggerLoader
+from app.operation_index import OperationFilter
+from app.test_generator import TestGenerator
+from app.negative_test_generator import NegativeTestGenerator
+from app.instrumentation import Instrumentation
+from app.test_case import TestCase
+
+# Operations whose test cases are published together
+DEFAULT_CHUNK_SIZE = 16
+
+PENDING, RUNNING, DONE, CANCELLED, FAILED = "pending", "running", "done", "cancelled", "failed"
+
+
+class GenerationJob:
+    """
+    Generates positive and/or negative test cases in a background thread.
+
+    Progress is counted per operation (each selected operation once per
+    enabled generator), finished chunks of chunk_size operations can be
+    read with test_cases() while the job runs, and cancel() stops it at the
+    next operation. With workers > 1 the positive cases come from a process
+    pool (see TestGenerator); negative cases are built chunk by chunk, with
+    NLP summaries batched per chunk.
+
+    Timings and counters go to the job's own Instrumentation (the given
+    one, e.g. the loader's, or a new one), so jobs running side by side do
+    not reset or mix each other's report.
+    """
+
+    def __init__(self, loader: SwaggerLoader, positive: bool = True, negative: bool = False,
+                 selection: Optional[OperationFilter] = None, workers: int = 1, nlp_engine: str = "basic",
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, extra_cases: Optional[List[TestCase]] = None,
+                 instrumentation: Optional[Instrumentation] = None):
+        self.loader = loader
+        self.positive = positive
+        self.negative = negative
+        self.selection = selection
+        self.workers = workers
+        self.nlp_engine = nlp_engine
+        self.chunk_size = chunk_size
+        self.metrics = instrumentation or Instrumentation()
+        self.status = PENDING
+        self.error: Optional[str] = None
+        self.report: Dict[str, Any] = {}
+        self.total = 0
+        self.done = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cases: List[TestCase] = list(extra_cases or [])
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "GenerationJob":
+        self.status = RUNNING
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="generation-job", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits for the job to end; returns whether it has.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.finished
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, CANCELLED, FAILED)
+
+    @property
+    def progress(self) -> float:
+        return self.done / self.total if self.total else (1.0 if self.finished else 0.0)
+
+    @property
+    def seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def test_cases(self) -> List[TestCase]:
+        """
+        The test cases of every chunk finished so far, in generation order.
+        """
+        with self._lock:
+            return list(self._cases)
+
+    def _publish(self, cases: List[TestCase]) -> None:
+        with self._lock:
+            self._cases.extend(cases)
+
+    def _run(self) -> None:
+        try:
+            operations = self.loader.operation_index().select(self.selection)
+            self.total = len(operations) * (int(self.positive) + int(self.negative))
+            if self.positive:
+                self._run_positive()
+            if self.negative:
+                self._run_negative(operations)
+            self.status = CANCELLED if self._cancel.is_set() else DONE
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.status = FAILED
+        finally:
+            self.finished_at = time.monotonic()
+            self.report = self.metrics.report()
+
+    def _run_positive(self) -> None:
+        generator = TestGenerator(self.loader, workers=self.workers, selection=self.selection,
+                                  instrumentation=self.metrics)
+        cases = generator.iter_test_cases()  # One test case per operation
+        chunk = []
+        try:
+            for case in cases:
+                if self._cancel.is_set():
+                    break
+                chunk.append(case)
+                self.done += 1
+                if len(chunk) >= self.chunk_size:
+                    self._publish(chunk)
+                    chunk = []
+        finally:
+            cases.close()  # Shuts the process pool down when cancelled early
+        self._publish(chunk)
+
+    def _run_negative(self, operations) -> None:
+        generator = NegativeTestGenerator(self.loader, use_nlp_summary=self.nlp_engine != "basic",
+                                          nlp_engine=self.nlp_engine, summary_batch_size=self.chunk_size,
+                                          selection=self.selection, instrumentation=self.metrics)
+        for start in range(0, len(operations), self.chunk_size):
+            if self._cancel.is_set():
+                return
+            cases = []
+            for op_cases in generator.iter_operation_test_cases(operations[start:start + self.chunk_size]):
+                cases.extend(op_cases)
+                self.done += 1
+                if self._cancel.is_set():
+                    break
+            self._publish(cases)
@@ -0,0 +1,172 @@
+# app/http_client.py
+
+import asyncio
+import ssl
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from app import serialization
+
+_PoolKey = Tuple[str, str, int]
+
+
+class HttpResponse:
+    """
+    A fully read HTTP response.
+    """
+
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return serialization.loads(self.body)
+
+
+class AsyncHttpClient:
+    """
+    Minimal asyncio HTTP/1.1 client with a keep-alive connection pool.
+
+    Idle connections are reused per (scheme, host, port), and at most
+    max_connections_per_host requests to one host are in flight at a time.
+    Only the stdlib is used, so it works wherever the app runs.
+    """
+
+    def __init__(self, max_connections_per_host: int = 10, timeout: float = 30.0,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._idle: Dict[_PoolKey, List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._limits: Dict[_PoolKey, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "AsyncHttpClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                      body: Optional[bytes] = None, json_body: Any = None) -> HttpResponse:
+        """
+        Sends a request and returns the complete response.
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        # Non-ASCII characters and spaces are percent-encoded (as UTF-8); existing escapes are kept
+        target = quote(target, safe="/?&=%:@!$'()*+,;~#[]")
+
+        request_headers = {"Host": parts.netloc, "Connection": "keep-alive"}
+        if json_body is not None:
+            body = serialization.dumps(json_body)
+            request_headers["Content-Type"] = "application/json"
+        request_headers.update(headers or {})
+        if body is not None:
+            request_headers["Content-Length"] = str(len(body))
+
+        head = f"{method.upper()} {target} HTTP/1.1\r\n"
+        head += "".join(f"{k}: {v}\r\n" for k, v in request_headers.items()) + "\r\n"
+        payload = head.encode("latin-1") + (body or b"")
+
+        limit = self._limits.setdefault(key, asyncio.Semaphore(self.max_connections_per_host))
+        async with limit:
+            return await asyncio.wait_for(self._exchange(key, payload, method), self.timeout)
+
+    async def _exchange(self, key: _PoolKey, payload: bytes, method: str) -> HttpResponse:
+        while True:
+            reader, writer, reused = await self._connection(key)
+            try:
+                writer.write(payload)
+                await writer.drain()
+                response, keep_alive = await _read_response(reader, method)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused:
+                    continue  # The server closed an idle connection; retry on a fresh one
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            if keep_alive:
+                self._idle.setdefault(key, []).append((reader, writer))
+            else:
+                writer.close()
+            return response
+
+    async def _connection(self, key: _PoolKey):
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+
+        scheme, host, port = key
+        ssl_arg = None
+        if scheme == "https":
+            ssl_arg = self.ssl_context or ssl.create_default_context()
+        reader, writer = await asyncio.open_connection(host, port, ssl=ssl_arg)
+        return reader, writer, False
+
+    async def close(self) -> None:
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+
+async def _read_response(reader: asyncio.StreamReader, method: str) -> Tuple[HttpResponse, bool]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed before response")
+    version, status = status_line.decode("latin-1").split(" ", 2)[:2]
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    status = int(status)
+    keep_alive = headers.get("connection", "").lower() != "close" and version != "HTTP/1.0"
+
+    if method.upper() == "HEAD" or status in (204, 304) or 100 <= status < 200:
+        body = b""
+    elif headers.get("transfer-encoding", "").lower() == "chunked":
+        body = await _read_chunked(reader)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = await reader.read()
+        keep_alive = False
+
+    return HttpResponse(status, headers, body), keep_alive
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks = []
+    while True:
+        size = int((await reader.readline()).split(b";", 1)[0].strip(), 16)
+        if size == 0:
+            # Skip optional trailers up to the terminating blank line
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            return b"".join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
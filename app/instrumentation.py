@@ -0,0 +1,126 @@
+# app/instrumentation.py
+
+import cProfile
+import io
+import pstats
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+# Pipeline stages in the order they are reported
+STAGES = ("load", "ref_resolution", "payload_build", "summary", "assertion_build", "export", "run")
+
+
+class Instrumentation:
+    """
+    Per-stage timings and counters for the generation pipeline.
+
+    Stage timings are inclusive wall-clock seconds plus call counts; when
+    stages nest (e.g. payload building inside a streamed read) each keeps
+    its own total. Work done in worker processes (TestGenerator workers > 1)
+    is not collected here.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enabled = True
+        self._profiler: Optional[cProfile.Profile] = None
+        self._profile_text: Optional[str] = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.seconds: Dict[str, float] = defaultdict(float)
+            self.calls: Dict[str, int] = defaultdict(int)
+            self.counters: Dict[str, int] = defaultdict(int)
+            self._profile_text = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Times the enclosed block under the given stage name.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.seconds[name] += elapsed
+                self.calls[name] += 1
+
+    def count(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += n
+
+    def start_profile(self) -> None:
+        """
+        Starts capturing a cProfile profile of the current thread.
+        """
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def stop_profile(self, limit: int = 30, sort: str = "cumulative") -> Optional[str]:
+        """
+        Stops the profile and returns (and keeps for report()) the top entries as text.
+        """
+        if self._profiler is None:
+            return None
+        self._profiler.disable()
+        output = io.StringIO()
+        pstats.Stats(self._profiler, stream=output).sort_stats(sort).print_stats(limit)
+        self._profiler = None
+        self._profile_text = output.getvalue()
+        return self._profile_text
+
+    @contextmanager
+    def profiling(self, enabled: bool = True, limit: int = 30) -> Iterator[None]:
+        if not enabled:
+            yield
+            return
+        self.start_profile()
+        try:
+            yield
+        finally:
+            self.stop_profile(limit)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Structured snapshot: stage timings, counters and the captured
+        profile, if any. The payload template cache is shared by the whole
+        process, so its stats are not part of it (see
+        app.payload_builder.template_cache.info()).
+        """
+        with self._lock:
+            names = [s for s in STAGES if s in self.seconds] + sorted(set(self.seconds) - set(STAGES))
+            stages = {
+                name: {"seconds": round(self.seconds[name], 6), "calls": self.calls[name]}
+                for name in names
+            }
+            counters = dict(self.counters)
+        return {"stages": stages, "counters": counters, "profile": self._profile_text}
+
+    def format_report(self) -> str:
+        """
+        Plain-text rendering of report() for terminals.
+        """
+        report = self.report()
+        lines = [f"{'stage':<18}{'seconds':>12}{'calls':>10}"]
+        for name, stats in report["stages"].items():
+            lines.append(f"{name:<18}{stats['seconds']:>12.4f}{stats['calls']:>10}")
+        lines.append("")
+        for name, value in sorted(report["counters"].items()):
+            lines.append(f"{name:<28}{value:>10}")
+        if report["profile"]:
+            lines += ["", report["profile"]]
+        return "\n".join(lines)
+
+
+# Process-wide instance used by the pipeline
+metrics = Instrumentation()
@@ -0,0 +1,364 @@
+# app/mock_server.py
+
+"""
+Spec-driven asyncio mock server.
+
+Every operation of the spec is served from a precompiled path-template
+matcher. Valid requests get the declared success status and a sample
+payload for its response schema (app.payload_builder); requests with
+missing or malformed input get the operation's declared error status.
+Responses are rendered once per operation and reused.
+
+    python -m app.mock_server spec.json --port 8000
+"""
+
+import argparse
+import asyncio
+import threading
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from app import serialization
+from app.assertion_logic import get_validator
+from app.operation_index import Operation
+from app.payload_builder import generate_payload
+from app.swagger_loader import SwaggerLoader
+
+# Largest request head accepted before the connection is dropped
+MAX_HEAD_BYTES = 64 * 1024
+
+
+def _coerce(raw: str, schema: Dict[str, Any]) -> Any:
+    # Parameter values arrive as strings; convert them to the declared type before checking
+    schema_type = schema.get("type")
+    try:
+        if schema_type == "integer":
+            return int(raw)
+        if schema_type == "number":
+            return float(raw)
+    except ValueError:
+        return raw
+    if schema_type == "boolean" and raw in ("true", "false"):
+        return raw == "true"
+    return raw
+
+
+def render_response(status: int, body: Optional[bytes], keep_alive: bool = True) -> bytes:
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = "Unknown"
+    head = f"HTTP/1.1 {status} {reason}\r\n"
+    if body is not None:
+        head += "Content-Type: application/json\r\n"
+    head += f"Content-Length: {len(body or b'')}\r\n"
+    if not keep_alive:
+        head += "Connection: close\r\n"
+    return head.encode("latin-1") + b"\r\n" + (body or b"")
+
+
+def _error_body(message: str) -> bytes:
+    return serialization.dumps({"error": message})
+
+
+class MockRoute:
+    """
+    One operation: its declared success and error statuses, input checks,
+    and the success response, rendered on first use.
+    """
+
+    def __init__(self, op: Operation, spec: Dict[str, Any]):
+        self.op = op
+        self.spec = spec
+        responses = op.operation.get("responses", {})
+        codes = [str(code) for code in responses]
+        success = [c for c in codes if c.startswith("2")]
+        self.success_status = int(success[0]) if success else 200
+        self.success_schema = (
+            responses.get(str(self.success_status), {})
+            .get("content", {})
+            .get("application/json", {})
+            .get("schema")
+        ) if success else None
+
+        # Declared error status for bad input: 400, else the first declared 4xx
+        client_errors = [c for c in codes if c.startswith("4") and c != "404"]
+        self.error_status = 400 if "400" in client_errors or not client_errors else int(client_errors[0])
+
+        request_body = op.operation.get("requestBody") or {}
+        self.body_required = bool(request_body.get("required"))
+        self.body_schema = request_body.get("content", {}).get("application/json", {}).get("schema")
+        # (location, name, lookup key, required, schema) per checked parameter; header lookups are lower case
+        self.params = [
+            (location, p.get("name"), p.get("name").lower() if location == "header" else p.get("name"),
+             bool(p.get("required")), p.get("schema"))
+            for location in ("path", "query", "header")
+            for p in op.params(location)
+        ]
+        self._success: Optional[bytes] = None
+        self._success_close: Optional[bytes] = None
+
+    def success(self, keep_alive: bool) -> bytes:
+        if self._success is None:
+            body = None
+            if self.success_status != 204:
+                payload = generate_payload(self.success_schema, self.spec) if self.success_schema else {}
+                body = serialization.dumps(payload)
+            self._success = render_response(self.success_status, body)
+            self._success_close = render_response(self.success_status, body, keep_alive=False)
+        return self._success if keep_alive else self._success_close
+
+    def input_error(self, path_values: Dict[str, str], query: Dict[str, List[str]],
+                    headers: Dict[str, str], body: bytes) -> Optional[str]:
+        """
+        Why the request input is invalid, or None when it is acceptable.
+        Schemas are checked with the cached validators of app.assertion_logic.
+        """
+        sources = {"path": path_values, "query": query, "header": headers}
+        for location, name, key, required, schema in self.params:
+            values = sources[location]
+            if key not in values:
+                if required and location != "path":
+                    return f"{location}.{name}: required"
+                continue
+            if schema:
+                raw = values[key][0] if location == "query" else values[key]
+                error = get_validator(schema, self.spec).first_error(_coerce(raw, schema), f"{location}.{name}")
+                if error:
+                    return str(error)
+
+        if not body:
+            return "body: required" if self.body_required else None
+        if self.body_schema is None:
+            return None
+        try:
+            value = serialization.loads(body)
+        except ValueError:
+            return "body: invalid JSON"
+        error = get_validator(self.body_schema, self.spec).first_error(value, "body")
+        return str(error) if error else None
+
+
+class PathMatcher:
+    """
+    Path templates compiled into a segment trie: literal segments are dict
+    lookups and "{name}" segments capture any single segment, with literal
+    matches preferred (so /users/me wins over /users/{id}).
+    """
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {"static": {}, "param": None, "value": None}
+
+    def add(self, template: str, value: Any) -> None:
+        node = self._root
+        for segment in template.strip("/").split("/"):
+            if segment.startswith("{") and segment.endswith("}"):
+                if node["param"] is None:
+                    node["param"] = (segment[1:-1], {"static": {}, "param": None, "value": None})
+                node = node["param"][1]
+            else:
+                node = node["static"].setdefault(segment, {"static": {}, "param": None, "value": None})
+        node["value"] = value
+
+    def match(self, path: str) -> Optional[Tuple[Any, Dict[str, str]]]:
+        """
+        (value, path parameter values) for the template matching path, or None.
+        """
+        segments = [unquote(s) for s in path.strip("/").split("/")]
+        return self._match(self._root, segments, 0, {})
+
+    def _match(self, node: Dict[str, Any], segments: List[str], i: int,
+               values: Dict[str, str]) -> Optional[Tuple[Any, Dict[str, str]]]:
+        if i == len(segments):
+            return (node["value"], values) if node["value"] is not None else None
+        child = node["static"].get(segments[i])
+        if child is not None:
+            found = self._match(child, segments, i + 1, values)
+            if found is not None:
+                return found
+        if node["param"] is not None and segments[i]:
+            name, child = node["param"]
+            found = self._match(child, segments, i + 1, dict(values, **{name: segments[i]}))
+            if found is not None:
+                return found
+        return None
+
+
+class MockServer:
+    """
+    Serves every operation of a spec (dict, path, URL or SwaggerLoader) on
+    host:port (0 picks a free port). Use start()/close() inside a running
+    event loop, or start_in_thread()/stop() from synchronous code.
+    """
+
+    def __init__(self, spec_input: Any, host: str = "127.0.0.1", port: int = 0):
+        loader = spec_input if isinstance(spec_input, SwaggerLoader) else SwaggerLoader(spec_input)
+        self.host = host
+        self.port = port
+        self.matcher = PathMatcher()
+        routes: Dict[str, Dict[str, MockRoute]] = {}
+        for op in loader.operation_index():
+            routes.setdefault(op.path, {})[op.method.upper()] = MockRoute(op, loader.spec)
+        for template, methods in routes.items():
+            self.matcher.add(template, methods)
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def handle(self, method: str, target: str, headers: Dict[str, str], body: bytes, keep_alive: bool) -> bytes:
+        """
+        The complete HTTP response for one request.
+        """
+        self.requests += 1
+        parts = urlsplit(target)
+        found = self.matcher.match(parts.path)
+        if found is None:
+            return render_response(404, _error_body(f"No operation for {parts.path}"), keep_alive)
+        methods, path_values = found
+        route = methods.get(method)
+        if route is None:
+            return render_response(405, _error_body(f"{method} not allowed for {parts.path}"), keep_alive)
+
+        error = route.input_error(path_values, parse_qs(parts.query), headers, body)
+        if error:
+            return render_response(route.error_status, _error_body(error), keep_alive)
+        return route.success(keep_alive)
+
+    async def start(self) -> "MockServer":
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_server(lambda: _MockProtocol(self), self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "MockServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    def start_in_thread(self) -> "MockServer":
+        """
+        Starts serving on a background event loop thread; returns once listening.
+        """
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.close())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="mock-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+            self._loop = None
+
+
+class _MockProtocol(asyncio.Protocol):
+    """
+    HTTP/1.1 with keep-alive and pipelining; bodies need a Content-Length.
+    """
+
+    def __init__(self, server: MockServer):
+        self.server = server
+        self.transport = None
+        self.buffer = bytearray()
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def data_received(self, data: bytes) -> None:
+        self.buffer += data
+        while self.transport is not None and not self.transport.is_closing():
+            end = self.buffer.find(b"\r\n\r\n")
+            if end < 0:
+                if len(self.buffer) > MAX_HEAD_BYTES:
+                    self.transport.close()
+                return
+
+            lines = self.buffer[:end].decode("latin-1").split("\r\n")
+            try:
+                method, target, version = lines[0].split(" ", 2)
+            except ValueError:
+                self._reply(render_response(400, _error_body("Malformed request line"), False), close=True)
+                return
+            target = target.encode("latin-1").decode("utf-8", "replace")  # Tolerate unencoded non-ASCII paths
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            if "chunked" in headers.get("transfer-encoding", "").lower():
+                self._reply(render_response(411, _error_body("Content-Length required"), False), close=True)
+                return
+            length = headers.get("content-length") or "0"
+            if not (length.isascii() and length.isdigit()):
+                # Negative, signed or non-numeric; the end of the body cannot be found
+                self._reply(render_response(400, _error_body("Malformed Content-Length"), False), close=True)
+                return
+            length = int(length)
+            if len(self.buffer) < end + 4 + length:
+                return  # Wait for the rest of the body
+            body = bytes(self.buffer[end + 4:end + 4 + length])
+            del self.buffer[:end + 4 + length]
+
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" and (version != "HTTP/1.0" or connection == "keep-alive")
+            self._reply(self.server.handle(method.upper(), target, headers, body, keep_alive), close=not keep_alive)
+
+    def _reply(self, response: bytes, close: bool) -> None:
+        self.transport.write(response)
+        if close:
+            self.transport.close()
+
+    def connection_lost(self, exc) -> None:
+        self.transport = None
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve a mock API generated from a Swagger/OpenAPI spec.")
+    parser.add_argument("spec", help="Spec URL or file path")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = MockServer(args.spec, args.host, args.port)
+
+    async def main():
+        await server.start()
+        print(f"[INFO] Mock server for {args.spec} listening on {server.url}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,345 @@
+# app/mutation_engine.py
+
+import re
+from collections.abc import Mapping
+from itertools import islice
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from app.payload_builder import generate_payload
+from app.utils import resolve_ref, get_type_from_schema
+
+# Values of the wrong JSON type for each declared type
+WRONG_TYPE_VALUES = {
+    "string": 999,
+    "integer": "not_an_integer",
+    "number": "not_a_number",
+    "boolean": "not_a_boolean",
+    "array": "not_an_array",
+    "object": "not_an_object"
+}
+
+# Candidates tried in order until one does not match a string's pattern
+PATTERN_CANDIDATES = ["", "!@#$%^&*()", " ", "0", "a", "A1-_."]
+
+STRATEGIES = ("single", "each", "pairwise")
+
+# Nesting depth below which no further violations are enumerated
+DEFAULT_MAX_DEPTH = 4
+
+
+class Violation(NamedTuple):
+    path: Tuple[Any, ...]
+    kind: str
+    value: Any = None
+    remove: bool = False
+
+    @property
+    def field(self) -> str:
+        return ".".join(str(p) for p in self.path) or "<body>"
+
+    def describe(self) -> Dict[str, str]:
+        return {"field": self.field, "kind": self.kind}
+
+
+def request_schema(operation: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The application/json requestBody schema of an operation ({} when absent).
+    """
+    return (
+        operation.get("requestBody", {})
+        .get("content", {})
+        .get("application/json", {})
+        .get("schema", {})
+    )
+
+
+def _deref(schema: Any, spec: Dict[str, Any]) -> Any:
+    if isinstance(schema, dict) and "$ref" in schema:
+        return resolve_ref(schema["$ref"], spec)
+    return schema
+
+
+def _object_parts(schema: Dict[str, Any], spec: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    # Properties and required names, with allOf members merged in
+    properties = dict(schema.get("properties", {}))
+    required = list(schema.get("required", []))
+    for sub_schema in schema.get("allOf", []):
+        sub_props, sub_required = _object_parts(_deref(sub_schema, spec), spec)
+        properties.update(sub_props)
+        required.extend(sub_required)
+    return properties, required
+
+
+def _schema_type(schema: Dict[str, Any]) -> str:
+    schema_type = get_type_from_schema(schema)
+    if schema_type == "allOf" or (schema_type == "unknown" and "properties" in schema):
+        return "object"
+    return schema_type
+
+
+def iter_violations(schema: Dict[str, Any], spec: Dict[str, Any], path: Tuple[Any, ...] = (),
+                    required: bool = False, depth: int = DEFAULT_MAX_DEPTH) -> Iterator[Violation]:
+    """
+    Lazily enumerates the ways a value at path can violate schema: missing
+    required field, wrong type, enum, min/max, length and pattern violations,
+    and extra properties where additionalProperties is false. Nested
+    properties and array items are descended into up to depth levels.
+    """
+    schema = _deref(schema, spec)
+    if not isinstance(schema, Mapping):
+        return
+    schema_type = _schema_type(schema)
+
+    if required:
+        yield Violation(path, "missing_required", remove=True)
+    if schema_type in WRONG_TYPE_VALUES:
+        yield Violation(path, "wrong_type", WRONG_TYPE_VALUES[schema_type])
+
+    enum = schema.get("enum")
+    if enum:
+        if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in enum):
+            yield Violation(path, "enum", max(enum) + 1)
+        else:
+            yield Violation(path, "enum", "_".join(str(v) for v in enum) + "_invalid")
+
+    if schema_type in ("integer", "number"):
+        step = 1 if schema_type == "integer" else 0.01
+        if "minimum" in schema:
+            exclusive = schema.get("exclusiveMinimum") is True
+            yield Violation(path, "minimum", schema["minimum"] if exclusive else schema["minimum"] - step)
+        elif isinstance(schema.get("exclusiveMinimum"), (int, float)) and not isinstance(schema["exclusiveMinimum"], bool):
+            yield Violation(path, "minimum", schema["exclusiveMinimum"])
+        if "maximum" in schema:
+            exclusive = schema.get("exclusiveMaximum") is True
+            yield Violation(path, "maximum", schema["maximum"] if exclusive else schema["maximum"] + step)
+        elif isinstance(schema.get("exclusiveMaximum"), (int, float)) and not isinstance(schema["exclusiveMaximum"], bool):
+            yield Violation(path, "maximum", schema["exclusiveMaximum"])
+
+    elif schema_type == "string":
+        if schema.get("minLength", 0) > 0:
+            yield Violation(path, "min_length", "x" * (schema["minLength"] - 1))
+        if "maxLength" in schema:
+            yield Violation(path, "max_length", "x" * (schema["maxLength"] + 1))
+        pattern = schema.get("pattern")
+        if pattern:
+            try:
+                compiled = re.compile(pattern)
+            except re.error:
+                compiled = None
+            if compiled is not None:
+                for candidate in PATTERN_CANDIDATES:
+                    if not compiled.search(candidate):
+                        yield Violation(path, "pattern", candidate)
+                        break
+
+    elif schema_type == "array":
+        items_schema = schema.get("items", {})
+        if schema.get("minItems", 0) > 0 or "maxItems" in schema:
+            item = generate_payload(items_schema, spec) if items_schema else None
+            if schema.get("minItems", 0) > 0:
+                yield Violation(path, "min_items", [item] * (schema["minItems"] - 1))
+            if "maxItems" in schema:
+                yield Violation(path, "max_items", [item] * (schema["maxItems"] + 1))
+        if items_schema and depth > 0:
+            yield from iter_violations(items_schema, spec, path + (0,), depth=depth - 1)
+
+    elif schema_type == "object" and depth > 0:
+        properties, required_names = _object_parts(schema, spec)
+        for name, prop_schema in properties.items():
+            yield from iter_violations(prop_schema, spec, path + (name,), name in required_names, depth - 1)
+        if schema.get("additionalProperties") is False:
+            yield Violation(path + ("unexpected_field",), "extra_property", "junk")
+
+
+def violation_factors(schema: Dict[str, Any], spec: Dict[str, Any],
+                      max_depth: int = DEFAULT_MAX_DEPTH) -> List[List[Violation]]:
+    """
+    Groups violations into independent factors: one per top-level property
+    of an object body (covering its whole subtree), or a single factor for
+    any other body. Violations in the same factor are mutually exclusive,
+    violations in different factors can be combined in one payload.
+    """
+    schema = _deref(schema, spec)
+    if not schema:
+        return []
+
+    if _schema_type(schema) != "object":
+        factor = list(iter_violations(schema, spec, depth=max_depth))
+        return [factor] if factor else []
+
+    properties, required_names = _object_parts(schema, spec)
+    factors = []
+    for name, prop_schema in properties.items():
+        factor = list(iter_violations(prop_schema, spec, (name,), name in required_names, max_depth - 1))
+        if factor:
+            factors.append(factor)
+    if schema.get("additionalProperties") is False:
+        factors.append([Violation(("unexpected_field",), "extra_property", "junk")])
+    return factors
+
+
+def covering_rows(levels: List[int], strategy: str = "pairwise") -> Iterator[List[int]]:
+    """
+    Yields rows choosing a level per factor (0 = valid, k = k-th violation).
+
+    "single" isolates each violation in its own row, "each" covers every
+    violation at least once in max(levels) rows, and "pairwise" greedily
+    covers every pair of levels across two factors. Pairwise rows first
+    cover each violation once, so truncating to a budget keeps the widest
+    single-violation coverage; the pairs are only enumerated once those
+    rows are consumed.
+    """
+    n = len(levels)
+    if strategy == "single":
+        for i, count in enumerate(levels):
+            for level in range(1, count + 1):
+                row = [0] * n
+                row[i] = level
+                yield row
+        return
+
+    if strategy == "each" or n < 2:
+        for level in range(1, max(levels, default=0) + 1):
+            yield [level if level <= count else 0 for count in levels]
+        return
+
+    if strategy != "pairwise":
+        raise ValueError(f"Unsupported strategy: {strategy}. Choose from {', '.join(STRATEGIES)}.")
+
+    # Every single violation first, one uncovered level per factor and row; as a
+    # generator, a budget met during this phase never builds the pairs below
+    singles = [list(range(1, count + 1)) for count in levels]
+    emitted = []
+    while any(singles):
+        row = [pending.pop(0) if pending else 0 for pending in singles]
+        emitted.append(row)
+        yield row
+
+    # Then the pairs of levels across two factors not covered yet, lowest first; they are
+    # walked in order rather than collected, so stopping early skips the rest
+    covered = {(k, row[k], m, row[m]) for row in emitted for k in range(n) for m in range(k + 1, n)}
+    for i, a, j, b in _level_pairs(levels):
+        if (i, a, j, b) in covered:
+            continue
+        row: List[Optional[int]] = [None] * n
+        row[i], row[j] = a, b
+
+        for k in range(n):
+            if row[k] is not None:
+                continue
+            best_level, best_gain = 0, -1
+            for level in list(range(1, levels[k] + 1)) + [0]:
+                gain = 0
+                for m in range(n):
+                    if row[m] is None or not (level or row[m]):
+                        continue
+                    pair = (m, row[m], k, level) if m < k else (k, level, m, row[m])
+                    gain += pair not in covered
+                if gain > best_gain:
+                    best_level, best_gain = level, gain
+            row[k] = best_level
+
+        covered.update((k, row[k], m, row[m]) for k in range(n) for m in range(k + 1, n))
+        yield row
+
+
+def _level_pairs(levels: List[int]) -> Iterator[Tuple[int, int, int, int]]:
+    # (i, a, j, b) for factors i < j and levels a, b not both 0, in sorted order
+    n = len(levels)
+    for i in range(n):
+        for j in range(i + 1, n):
+            for a in range(levels[i] + 1):
+                for b in range(levels[j] + 1):
+                    if a or b:
+                        yield i, a, j, b
+
+
+def apply_violations(payload: Any, violations: List[Violation], in_place: bool = True) -> Tuple[Any, List[Violation]]:
+    """
+    Applies violations to a valid payload in place. Returns the payload and
+    the violations that could be applied (a path may not exist in the
+    sample payload, e.g. below a cut-off recursive schema). With
+    in_place=False the payload is left untouched: only the objects and
+    arrays along the violated paths are copied, and the result shares every
+    other part with it.
+    """
+    applied = []
+    copied = set()  # ids of the containers copied so far (in_place=False)
+    for violation in violations:
+        if not violation.path:
+            payload = violation.value
+            applied.append(violation)
+            continue
+
+        try:
+            if in_place:
+                parent = payload
+                for key in violation.path[:-1]:
+                    parent = parent[key]
+            else:
+                payload = _writable(payload, copied)
+                parent = payload
+                for key in violation.path[:-1]:
+                    child = _writable(parent[key], copied)
+                    parent[key] = child
+                    parent = child
+        except (KeyError, IndexError, TypeError):
+            continue
+
+        last = violation.path[-1]
+        if isinstance(parent, dict):
+            if violation.remove:
+                parent.pop(last, None)
+            else:
+                parent[last] = violation.value
+        elif isinstance(parent, list) and isinstance(last, int) and last < len(parent) and not violation.remove:
+            parent[last] = violation.value
+        else:
+            continue
+        applied.append(violation)
+
+    return payload, applied
+
+
+def _writable(node: Any, copied: set) -> Any:
+    # A shallow copy of an object or array not copied yet; anything else as is
+    if isinstance(node, (dict, list)) and id(node) not in copied:
+        node = dict(node) if isinstance(node, dict) else list(node)
+        copied.add(id(node))
+    return node
+
+
+def iter_negative_payloads(schema: Dict[str, Any], spec: Dict[str, Any], strategy: str = "pairwise",
+                           max_cases: Optional[int] = None,
+                           max_depth: int = DEFAULT_MAX_DEPTH) -> Iterator[Tuple[Any, List[Dict[str, str]]]]:
+    """
+    Yields (payload, violations) pairs for a request schema, combining
+    violations according to strategy and stopping after max_cases. An object
+    body first gets one case sending a non-object body, since that would
+    mask every other violation if combined with them.
+    """
+    return islice(_iter_negative_payloads(schema, spec, strategy, max_depth), max_cases)
+
+
+def _iter_negative_payloads(schema: Dict[str, Any], spec: Dict[str, Any], strategy: str,
+                            max_depth: int) -> Iterator[Tuple[Any, List[Dict[str, str]]]]:
+    factors = violation_factors(schema, spec, max_depth)
+    resolved = _deref(schema, spec)
+    if resolved and _schema_type(resolved) == "object":
+        body_violation = Violation((), "wrong_type", WRONG_TYPE_VALUES["object"])
+        yield body_violation.value, [body_violation.describe()]
+
+    if not factors:
+        return
+
+    # One description per applied violation, shared by every payload it is applied to
+    described: Dict[int, Dict[str, str]] = {}
+    for row in covering_rows([len(f) for f in factors], strategy):
+        chosen = [factors[i][level - 1] for i, level in enumerate(row) if level]
+        # Unviolated parts of every payload stay shared with the cached template
+        payload, applied = apply_violations(generate_payload(schema, spec, shared=True), chosen, in_place=False)
+        if applied:
+            for v in applied:
+                if id(v) not in described:
+                    described[id(v)] = v.describe()
+            yield payload, [described[id(v)] for v in applied]
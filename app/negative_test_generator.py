@@ -1,52 +1,184 @@
+import logging
 from app.assertion_logic import build_negative_assertions
-from app.payload_builder import generate_negative_payload
-from app.nlp_summary import generate_test_summary  # Import the correct summary function
+from app.mutation_engine import iter_negative_payloads, request_schema
+from app.nlp_summary import generate_test_summary, generate_test_summaries  # Import the correct summary function
+from app.swagger_loader import SwaggerLoader
+from app.ref_resolver import materialize
+from app.fingerprint import FingerprintManifest, OperationFingerprinter
+from app.operation_index import make_filter, operation_view
+from app.test_case import NegativeTestCase, test_case_from_dict
+
+logger = logging.getLogger(__name__)
 
 class NegativeTestGenerator:
-    def __init__(self, swagger_spec, use_premium_nlp=False, use_nlp_summary=False, nlp_engine="basic"):
+    def __init__(self, swagger_spec, use_premium_nlp=False, use_nlp_summary=False, nlp_engine="basic",
+                 summary_batch_size=64, summary_workers=1, max_cases_per_operation=10, strategy="pairwise",
+                 selection=None, instrumentation=None):
+        # Either a raw spec dict or a SwaggerLoader (e.g. one reading a stream or
+        # shared with a TestGenerator); a dict is wrapped in a lazy loader
         self.swagger_spec = swagger_spec
+        if isinstance(swagger_spec, SwaggerLoader):
+            self.swagger_loader = swagger_spec
+        else:
+            self.swagger_loader = SwaggerLoader(swagger_spec, lazy=True, instrumentation=instrumentation)
+        # Instrumentation the timings and counters go to; by default the loader's (see TestGenerator)
+        self.metrics = instrumentation or self.swagger_loader.metrics
         self.use_premium_nlp = use_premium_nlp
         self.use_nlp_summary = use_nlp_summary
         self.nlp_engine = nlp_engine  # Keep track of which NLP engine to use
+        # NLP summaries are computed for this many operations at a time (one nlp.pipe call for spaCy)
+        self.summary_batch_size = summary_batch_size
+        self.summary_workers = summary_workers
+        # Negative payloads per operation and how violations are combined (see app.mutation_engine)
+        self.max_cases_per_operation = max_cases_per_operation
+        self.strategy = strategy
+        # Optional OperationFilter; unselected operations are skipped before any work
+        self.selection = selection
+
+    def select(self, tags=None, paths=None, methods=None, operation_ids=None, deprecated=None):
+        # Restricts generation to the matching operations (see TestGenerator.select)
+        self.selection = make_filter(tags, paths, methods, operation_ids, deprecated)
+        return self
 
     def generate_negative_tests(self):
-        negative_tests = []
+        return list(self.iter_negative_tests())
+
+    def iter_negative_tests(self):
+        # Yields negative test cases one at a time, in generate_negative_tests() order
+        batch = []
+        for op in self.swagger_loader.iter_operations(self.selection):
+            if not self.use_nlp_summary:
+                yield from self.create_negative_test_cases(op)
+                continue
+            batch.append(op)
+            if len(batch) >= self.summary_batch_size:
+                for cases in self._create_batch(batch):
+                    yield from cases
+                batch = []
+
+        if batch:
+            for cases in self._create_batch(batch):
+                yield from cases
 
-        for path, path_data in self.swagger_spec.get("paths", {}).items():
-            for operation, op_data in path_data.items():
-                if operation.lower() in ["get", "post", "put", "delete"]:
-                    test_case = self.create_negative_test_case(path, operation, op_data)
-                    negative_tests.append(test_case)
+    def generate_incremental(self, manifest_path):
+        # Regenerates only operations whose fingerprint changed since manifest_path
+        # was written (see TestGenerator.generate_incremental); the rest are reused
+        options = {
+            "generator": "negative",
+            "use_nlp_summary": self.use_nlp_summary,
+            "use_premium_nlp": self.use_premium_nlp,
+            "nlp_engine": self.nlp_engine,
+            # The payload budget and combination strategy decide which cases are generated
+            "max_cases_per_operation": self.max_cases_per_operation,
+            "strategy": self.strategy
+        }
+        manifest = FingerprintManifest(manifest_path, options)
+        fingerprinter = OperationFingerprinter(self.swagger_loader.resolver)
+
+        entries = []  # [key, fingerprint, cases or None]
+        changed = []  # operations still to generate
+        for op in self.swagger_loader.iter_operations(self.selection):
+            fingerprint = fingerprinter.fingerprint(op.path, op.method, op.raw, op.raw_path_item)
+            cases = manifest.reuse(op.key, fingerprint)
+            if cases is not None:
+                cases = [test_case_from_dict(case) for case in cases]
+            entries.append([op.key, fingerprint, cases])
+            if cases is None:
+                changed.append(op)
+
+        generated = self.iter_operation_test_cases(changed)
 
+        negative_tests = []
+        for key, fingerprint, cases in entries:
+            reused = cases is not None
+            if not reused:
+                cases = next(generated)
+            manifest.record(key, fingerprint, cases, reused)
+            negative_tests.extend(cases)
+
+        manifest.save()
+        self.incremental_stats = manifest.stats()
         return negative_tests
 
+    def iter_operation_test_cases(self, ops):
+        # Yields the test case list of each indexed operation in ops, in order; NLP summaries are computed in one batch
+        if self.use_nlp_summary:
+            return self._create_batch(ops)
+        return (self.create_negative_test_cases(op) for op in ops)
+
+    def _create_batch(self, batch):
+        # Yields the list of test cases of each operation in batch
+        with self.metrics.stage("summary"):
+            summaries = generate_test_summaries(
+                [(op.operation.get("summary", ""), op.path, op.method) for op in batch],
+                engine=self.nlp_engine,
+                premium=self.use_premium_nlp,
+                batch_size=self.summary_batch_size,
+                n_process=self.summary_workers,
+                instrumentation=self.metrics
+            )
+        for op, summary in zip(batch, summaries):
+            yield self.create_negative_test_cases(op, summary=summary)
+
+    def _resolution_spec(self):
+        # Root spec that $refs in op_data are resolved against
+        return self.swagger_loader.spec
+
     def create_negative_test_case(self, path, operation, op_data):
+        # The first negative test case for a raw (path, method, operation object); kept for
+        # callers predating the operation index (see create_negative_test_cases)
+        if not path or not operation:
+            raise ValueError(f"Missing 'path' or 'operation' for {path} {operation}")
+        return self.create_negative_test_cases(operation_view(path, operation, op_data))[0]
+
+    def create_negative_test_cases(self, op, summary=None):
+        # One test case per negative payload from the mutation engine, up to max_cases_per_operation,
+        # for an indexed operation (see app.operation_index)
+        path, operation, op_data = op.path, op.method, op.operation
         # Validate that path and operation are not empty
         if not path or not operation:
             raise ValueError(f"Missing 'path' or 'operation' for {path} {operation}")
         
-        test_case = {
-            "path": path,
-            "operation": operation,
-            "parameters": op_data.get("parameters", []),
-            "responses": op_data.get("responses", {})
-        }
-
-        # Print test_case for debugging
-        print(f"Creating negative test case for {operation.upper()} {path}")
-        print("Test case data:", test_case)
+        # Shared by all test cases of the operation (see app.test_case)
+        parameters = tuple(materialize(op.parameters))
+        responses = materialize(op_data.get("responses", {}))
 
-        # Generate invalid/missing/malformed payload
-        test_case["request_payload"] = generate_negative_payload(op_data)
+        # Log the operation for debugging (formatting it is costly, so only when enabled)
+        self.metrics.count("negative_operations")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Creating negative test case for %s %s", operation.upper(), path)
+            logger.debug("Parameters: %s, responses: %s", parameters, responses)
 
-        # Handle NLP summary generation
+        # Handle NLP summary generation (unless precomputed, and timed, in a batch)
         base_summary = op_data.get("summary", "")
-        if self.use_nlp_summary:
-            test_case["summary"] = generate_test_summary(base_summary, path, operation, engine=self.nlp_engine, premium=self.use_premium_nlp)
-        else:
-            test_case["summary"] = generate_test_summary(base_summary, path, operation, engine="basic")  # Default basic summary if no NLP summary
+        if summary is None:
+            with self.metrics.stage("summary"):
+                if self.use_nlp_summary:
+                    summary = generate_test_summary(base_summary, path, operation, engine=self.nlp_engine, premium=self.use_premium_nlp,
+                                                    instrumentation=self.metrics)
+                else:
+                    # Default basic summary if no NLP summary
+                    summary = generate_test_summary(base_summary, path, operation, engine="basic", instrumentation=self.metrics)
 
         # Assertions (like status code 400, expected error message, etc.)
-        test_case["assertions"] = build_negative_assertions(op_data)
+        with self.metrics.stage("assertion_build"):
+            assertions = build_negative_assertions(op_data)
+
+        def build_case(payload, violations):
+            return NegativeTestCase(path, operation, summary, parameters, responses, assertions,
+                                    payload, violations, op.tags)
 
-        return test_case
+        # Generate invalid/missing/malformed payloads
+        with self.metrics.stage("payload_build"):
+            payloads = iter_negative_payloads(
+                request_schema(op_data),
+                self._resolution_spec(),
+                strategy=self.strategy,
+                max_cases=self.max_cases_per_operation
+            )
+            test_cases = [build_case(payload, violations) for payload, violations in payloads]
+        if not test_cases:
+            # Nothing in the schema to violate (e.g. no JSON request body)
+            test_cases.append(build_case({"invalid": "payload"}, []))
+        self.metrics.count("negative_cases", len(test_cases))
+        return test_cases
@@ -1,42 +1,62 @@
-import openai
-import spacy
-import os
+import importlib
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from app.instrumentation import Instrumentation, metrics
+
+# Summary engine plugins: name -> "module:function", imported on first use, or the function itself.
+# A plugin summarizes (summary, path, operation) triples: function(items, batch_size=..., n_process=...,
+# instrumentation=...), counting any calls it makes in instrumentation (None: the process-wide metrics),
+# so spaCy, transformers/torch or the ChatGPT client only load once their engine is used.
+_engines: Dict[str, Union[str, Callable[..., List[str]]]] = {
+    "spacy": "app.spacy_engine:generate_summaries_spacy",       # 🆓 Free (spaCy)
+    "chatgpt": "app.chatgpt_engine:generate_summaries_chatgpt", # 🟢 Premium (ChatGPT)
+    "gpt2": "app.model_manager:generate_summaries_gpt2"         # Local GPT-2
+}
+_engines_lock = threading.Lock()
+
+def register_engine(name: str, plugin: Union[str, Callable[..., List[str]]]) -> None:
+    """
+    Adds or replaces a summary engine: a "module:function" path or a function.
+    """
+    if name == "basic":
+        raise ValueError("The basic engine is built in and cannot be replaced.")
+    with _engines_lock:
+        _engines[name] = plugin
+
+def available_engines() -> List[str]:
+    return ["basic"] + sorted(_engines)
+
+def get_engine(name: str) -> Callable[..., List[str]]:
+    """
+    Returns the batch summarizer of a plugin engine, importing its module on first use.
+    """
+    with _engines_lock:
+        plugin = _engines.get(name)
+        if plugin is None:
+            raise ValueError(f"Unsupported engine type '{name}'. Choose from: {', '.join(available_engines())}.")
+        if isinstance(plugin, str):
+            module_name, _, attr = plugin.partition(":")
+            plugin = _engines[name] = getattr(importlib.import_module(module_name), attr)
+    return plugin
 
 # 🟢 Premium (ChatGPT)
 def generate_summary_chatgpt(summary, path, operation):
-    try:
-        # Assumes you set OPENAI_API_KEY as an environment variable
-        openai.api_key = os.getenv("OPENAI_API_KEY")
-
-        prompt = f"Generate a user-friendly test summary for this API call:\nMethod: {operation.upper()}\nPath: {path}\nDescription: {summary}\n"
-
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=50,
-            temperature=0.5
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        return f"[ChatGPT fallback] {summary}"
+    return generate_test_summary(summary, path, operation, engine="chatgpt")
 
 # 🆓 Free (spaCy)
 def generate_summary_spacy(summary, path, operation):
-    try:
-        nlp = spacy.load("en_core_web_sm")
-    except:
-        return f"{operation.upper()} {path} - {summary}"
-
-    doc = nlp(summary)
-    verbs = [token.lemma_ for token in doc if token.pos_ == "VERB"]
-    action = verbs[0] if verbs else "access"
-    return f"Use {operation.upper()} on {path} to {action}."
+    return generate_test_summary(summary, path, operation, engine="spacy")
 
 # 🔑 Basic Summary Engine
-def generate_test_summary(summary, path, operation, engine="basic", premium=False):
+def generate_test_summary(summary, path, operation, engine="basic", premium=False,
+                          instrumentation: Optional[Instrumentation] = None):
     """
     Generate a dynamic test case summary based on the selected engine.
+    Calls are counted in instrumentation (default: the process-wide metrics).
+    premium is kept for existing callers and not passed to engines: the
+    engine name alone selects the premium one ("chatgpt").
     """
+    (instrumentation or metrics).count(f"nlp_calls.{engine}")
     if engine == "basic":
         # Handle the basic test case summary logic
         operation = operation.upper()
@@ -95,13 +115,23 @@ def generate_test_summary(summary, path, operation, engine="basic", premium=Fals
 
         return summary_text
 
-    elif engine == "spacy":
-        # Use spaCy for NLP-based summary
-        return generate_summary_spacy(summary, path, operation)
+    # Plugin engines (spaCy, ChatGPT, GPT-2, ...) summarize a batch of one
+    return get_engine(engine)([(summary, path, operation)], instrumentation=instrumentation)[0]
 
-    elif engine == "chatgpt":
-        # Use ChatGPT for NLP-based summary
-        return generate_summary_chatgpt(summary, path, operation)
-    
-    else:
-        raise ValueError("Unsupported engine type. Choose from 'basic', 'spacy', or 'chatgpt'.")
+def generate_test_summaries(items: Iterable[Tuple[Any, str, str]], engine="basic", premium=False,
+                            batch_size: int = 64, n_process: int = 1,
+                            instrumentation: Optional[Instrumentation] = None) -> List[str]:
+    """
+    Batch counterpart of generate_test_summary for (summary, path, operation) triples.
+    The spaCy engine runs every description through one nlp.pipe call and the
+    ChatGPT engine sends the whole batch concurrently. As there, premium does
+    not reach plugin engines.
+    """
+    if engine == "basic":
+        return [generate_test_summary(summary, path, operation, engine=engine, premium=premium,
+                                      instrumentation=instrumentation)
+                for summary, path, operation in items]
+    summarize = get_engine(engine)
+    items = list(items)
+    (instrumentation or metrics).count(f"nlp_calls.{engine}", len(items))
+    return summarize(items, batch_size=batch_size, n_process=n_process, instrumentation=instrumentation)
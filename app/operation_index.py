@@ -0,0 +1,215 @@
+# app/operation_index.py
+
+from collections import defaultdict
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+# Methods test cases are generated for, in the order they appear in a path item
+HTTP_METHODS = ("get", "post", "put", "patch", "delete")
+
+PARAMETER_LOCATIONS = ("path", "query", "header", "cookie")
+
+
+class Operation(NamedTuple):
+    path: str
+    method: str                    # lower case
+    operation: Mapping[str, Any]   # resolved (or lazily resolved) operation object
+    operation_id: str
+    tags: Tuple[str, ...]
+    parameters: List[Any]          # path-level and operation-level parameters, merged
+    params_by_location: Dict[str, List[Any]]
+    raw: Optional[Dict[str, Any]] = None            # operation with $refs in place
+    raw_path_item: Optional[Dict[str, Any]] = None  # path item with $refs in place
+
+    @property
+    def key(self) -> str:
+        return f"{self.method.upper()} {self.path}"
+
+    def params(self, location: str) -> List[Any]:
+        return self.params_by_location.get(location, [])
+
+
+def merge_parameters(path_params: Iterable[Any], operation_params: Iterable[Any]) -> List[Any]:
+    """
+    Path-level parameters followed by operation-level ones; an operation
+    parameter replaces the path parameter with the same name and location.
+    """
+    merged: Dict[Tuple[Any, Any], Any] = {}
+    for param in list(path_params or []) + list(operation_params or []):
+        merged[(param.get("name"), param.get("in"))] = param
+    return list(merged.values())
+
+
+def operation_view(path: str, method: str, operation: Mapping[str, Any],
+                   path_params: Iterable[Any] = (), raw_path_item: Optional[Dict[str, Any]] = None) -> Operation:
+    """
+    The Operation for one (resolved) operation object of a path; path_params
+    are the parameters declared on the path item.
+    """
+    method = method.lower()
+    parameters = merge_parameters(path_params, operation.get("parameters", []))
+    by_location: Dict[str, List[Any]] = {location: [] for location in PARAMETER_LOCATIONS}
+    for param in parameters:
+        by_location.setdefault(param.get("in"), []).append(param)
+
+    return Operation(
+        path=path,
+        method=method,
+        operation=operation,
+        operation_id=operation.get("operationId") or f"{method}_{path}",
+        tags=tuple(operation.get("tags", [])),
+        parameters=parameters,
+        params_by_location=by_location,
+        raw=raw_path_item.get(method) if raw_path_item is not None else None,
+        raw_path_item=raw_path_item
+    )
+
+
+def iter_path_operations(path: str, path_item: Mapping[str, Any],
+                         raw_path_item: Optional[Dict[str, Any]] = None) -> Iterator[Operation]:
+    """
+    Yields an Operation for every supported method of a (resolved) path item.
+    """
+    path_params = path_item.get("parameters", [])
+    for method, operation in path_item.items():
+        if method.lower() not in HTTP_METHODS:
+            continue  # Skip parameters, summary, servers and unsupported methods
+        yield operation_view(path, method, operation, path_params, raw_path_item)
+
+
+class OperationIndex:
+    """
+    Every supported operation of a spec, built in a single pass and looked
+    up by path, method, tag or operationId. Both generators and the
+    exporters share one index per SwaggerLoader (see
+    SwaggerLoader.operation_index()).
+    """
+
+    def __init__(self, operations: Iterable[Operation]):
+        self.operations: List[Operation] = []
+        self._by_key: Dict[Tuple[str, str], Operation] = {}
+        self._by_path: Dict[str, List[Operation]] = defaultdict(list)
+        self._by_method: Dict[str, List[Operation]] = defaultdict(list)
+        self._by_tag: Dict[str, List[Operation]] = defaultdict(list)
+        self._by_operation_id: Dict[str, Operation] = {}
+
+        for op in operations:
+            self.operations.append(op)
+            self._by_key[(op.path, op.method)] = op
+            self._by_path[op.path].append(op)
+            self._by_method[op.method].append(op)
+            for tag in op.tags:
+                self._by_tag[tag].append(op)
+            self._by_operation_id.setdefault(op.operation_id, op)
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[Tuple[str, Mapping[str, Any], Optional[Dict[str, Any]]]]) -> "OperationIndex":
+        """
+        Builds the index from (path, resolved path item, raw path item) triples.
+        """
+        return cls(
+            op
+            for path, path_item, raw_path_item in paths
+            for op in iter_path_operations(path, path_item, raw_path_item)
+        )
+
+    def __iter__(self) -> Iterator[Operation]:
+        return iter(self.operations)
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def get(self, path: str, method: str) -> Optional[Operation]:
+        return self._by_key.get((path, method.lower()))
+
+    def for_path(self, path: str) -> List[Operation]:
+        return self._by_path.get(path, [])
+
+    def for_method(self, method: str) -> List[Operation]:
+        return self._by_method.get(method.lower(), [])
+
+    def for_tag(self, tag: str) -> List[Operation]:
+        return self._by_tag.get(tag, [])
+
+    def for_operation_id(self, operation_id: str) -> Optional[Operation]:
+        return self._by_operation_id.get(operation_id)
+
+    def select(self, selection: Optional["OperationFilter"]) -> List[Operation]:
+        """
+        The operations matching selection, in spec order (all of them for None).
+        """
+        if selection is None:
+            return self.operations
+        return list(selection.apply(self.operations))
+
+    def paths(self) -> List[str]:
+        return list(self._by_path)
+
+    def tags(self) -> List[str]:
+        return list(self._by_tag)
+
+
+class OperationFilter(NamedTuple):
+    """
+    Operation selection: an operation is selected when it matches every
+    non-empty criterion (any of the listed values within a criterion).
+    """
+    tags: Tuple[str, ...] = ()
+    paths: Tuple[str, ...] = ()          # fnmatch globs, e.g. "/users/*"
+    methods: Tuple[str, ...] = ()        # lower case
+    operation_ids: Tuple[str, ...] = ()
+    deprecated: Optional[bool] = None    # None: either, False: skip deprecated, True: only deprecated
+
+    def matches(self, path: str, method: str, operation: Mapping[str, Any]) -> bool:
+        """
+        Whether an operation (raw or resolved) is selected.
+        """
+        method = method.lower()
+        if self.methods and method not in self.methods:
+            return False
+        if self.paths and not any(fnmatchcase(path, pattern) for pattern in self.paths):
+            return False
+        if self.tags and not set(operation.get("tags", [])) & set(self.tags):
+            return False
+        if self.operation_ids and (operation.get("operationId") or f"{method}_{path}") not in self.operation_ids:
+            return False
+        if self.deprecated is not None and bool(operation.get("deprecated", False)) != self.deprecated:
+            return False
+        return True
+
+    def matches_operation(self, op: Operation) -> bool:
+        return self.matches(op.path, op.method, op.operation)
+
+    def matches_path_item(self, path: str, path_item: Mapping[str, Any]) -> bool:
+        """
+        Whether any operation of a path item is selected, checked before the
+        item is resolved.
+        """
+        if "$ref" in path_item:
+            return True  # Only known once resolved
+        return any(
+            self.matches(path, method, operation)
+            for method, operation in path_item.items()
+            if method.lower() in HTTP_METHODS and isinstance(operation, Mapping)
+        )
+
+    def apply(self, operations: Iterable[Operation]) -> Iterator[Operation]:
+        return (op for op in operations if self.matches_operation(op))
+
+
+def make_filter(tags: Optional[Iterable[str]] = None, paths: Optional[Iterable[str]] = None,
+                methods: Optional[Iterable[str]] = None, operation_ids: Optional[Iterable[str]] = None,
+                deprecated: Optional[bool] = None) -> Optional[OperationFilter]:
+    """
+    Builds an OperationFilter, or None when no criterion is given (select everything).
+    """
+    selection = OperationFilter(
+        tags=tuple(tags or ()),
+        paths=tuple(paths or ()),
+        methods=tuple(m.lower() for m in methods or ()),
+        operation_ids=tuple(operation_ids or ()),
+        deprecated=deprecated
+    )
+    if selection == OperationFilter():
+        return None
+    return selection
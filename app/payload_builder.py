@@ -1,77 +1,389 @@
-from typing import Any, Dict
+import math
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 from app.utils import resolve_ref, get_type_from_schema
+from app.ref_resolver import materialize, node_identity
 
-def generate_payload(schema: Dict[str, Any], spec: Dict[str, Any]) -> Any:
+# The regex parser is private to the re module; without it, patterned strings get the plain sample
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    try:
+        import sre_parse
+    except ImportError:
+        sre_parse = None
+
+# Maximum nesting of objects/arrays expanded for a single payload
+DEFAULT_MAX_DEPTH = 8
+
+_MISSING = object()
+
+# Sample values for string formats, used when a string schema has no pattern
+FORMAT_SAMPLES = {
+    "date": "2024-01-01",
+    "date-time": "2024-01-01T00:00:00Z",
+    "time": "00:00:00Z",
+    "email": "user@example.com",
+    "uuid": "123e4567-e89b-12d3-a456-426614174000",
+    "uri": "https://example.com/resource",
+    "url": "https://example.com/resource",
+    "hostname": "example.com",
+    "ipv4": "192.0.2.1",
+    "ipv6": "2001:db8::1",
+    "byte": "c3RyaW5nX3ZhbHVl",
+}
+
+# Keywords giving a value to use as is, by precedence
+_VALUE_KEYS_ORDER = ("const", "enum", "example", "examples", "default")
+_VALUE_KEYS = frozenset(_VALUE_KEYS_ORDER)
+
+# Keywords that can rule out the default sample number
+_NUMBER_KEYS = frozenset(("minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum", "multipleOf"))
+
+# Keywords that can rule out the default sample string
+_STRING_KEYS = frozenset(("pattern", "format", "minLength", "maxLength"))
+
+# Longest run generated for an unbounded regex repeat (e.g. "+" or "*")
+PATTERN_REPEAT = 3
+
+# Regex character categories (\d, \s, \w and their negations) by sre_parse name
+_CATEGORY_CLASSES = {
+    "CATEGORY_DIGIT": r"\d", "CATEGORY_NOT_DIGIT": r"\D",
+    "CATEGORY_SPACE": r"\s", "CATEGORY_NOT_SPACE": r"\S",
+    "CATEGORY_WORD": r"\w", "CATEGORY_NOT_WORD": r"\W",
+}
+
+
+class PayloadTemplateCache:
+    """
+    LRU cache of compiled payload templates.
+
+    A template is the sample payload for one schema, built once; callers get
+    a structural copy of it. Entries keep a reference to the schema and spec
+    they were compiled from so the identity-based keys stay valid. Safe to
+    share between threads (e.g. concurrent generation jobs).
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, Tuple[Any, Any, Any]]" = OrderedDict()
+        # move_to_end must not interleave with another thread's popitem
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple, template: Any, schema: Any, spec: Any) -> None:
+        with self._lock:
+            self._entries[key] = (template, schema, spec)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize
+            }
+
+
+template_cache = PayloadTemplateCache()
+
+
+def generate_payload(schema: Dict[str, Any], spec: Dict[str, Any], max_depth: int = DEFAULT_MAX_DEPTH,
+                     shared: bool = False) -> Any:
     """
-    Generates a valid sample payload based on the schema.
+    Generates a valid sample payload based on the schema: a value's const,
+    first enum value, example or default when declared, otherwise a sample
+    honouring its format, pattern, length, numeric and item count bounds.
+    The schema is compiled into a cached template on first use; recursive
+    schemas are cut off (an empty object or array, or None) where they would
+    re-enter themselves, and past max_depth only required properties and
+    minItems items are filled in. With shared=True the template itself is
+    returned instead of a copy, so test cases of the same schema share one payload;
+    it must then not be modified.
     """
+    if "$ref" in schema:
+        key = ("ref", schema["$ref"], id(spec), max_depth)
+    else:
+        key = ("schema", node_identity(schema), id(spec), max_depth)
+
+    template = template_cache.get(key)
+    if template is _MISSING:
+        template = _compile_template(schema, spec, max_depth, ())
+        template_cache.put(key, template, schema, spec)
+    return template if shared else _copy_template(template)
+
+
+def _compile_template(schema: Dict[str, Any], spec: Dict[str, Any], depth: int, stack: Tuple[int, ...]) -> Any:
     if "$ref" in schema:
         schema = resolve_ref(schema["$ref"], spec)
 
+    if not _VALUE_KEYS.isdisjoint(schema):
+        value = _declared_value(schema)
+        if value is not _MISSING:
+            return value
+
     schema_type = get_type_from_schema(schema)
+    identity = node_identity(schema)
+    if identity in stack:
+        # Recursive schema cut off where it re-enters itself
+        return {} if schema_type == "object" else [] if schema_type == "array" else None
+    stack = stack + (identity,)
+    # Past max_depth only what the schema requires is filled in (required properties, minItems items)
+    minimal = depth < 0
 
     if schema_type == "object":
         props = schema.get("properties", {})
+        required = schema.get("required", ()) if minimal else props
         return {
-            k: generate_payload(v, spec)
-            for k, v in props.items()
+            k: _compile_template(v, spec, depth - 1, stack)
+            for k, v in props.items() if k in required
         }
 
     elif schema_type == "array":
         items_schema = schema.get("items", {})
-        return [generate_payload(items_schema, spec)]
+        count = schema.get("minItems", 0) if minimal else max(schema.get("minItems", 1), 1)
+        if "maxItems" in schema:
+            count = min(count, schema["maxItems"])
+        if count <= 0:
+            return []
+        item = _compile_template(items_schema, spec, depth - 1, stack)
+        return [item] + [_copy_template(item) for _ in range(count - 1)]
 
     elif schema_type == "string":
-        return "string_value"
+        return _string_sample(schema) if _STRING_KEYS.intersection(schema) else "string_value"
     elif schema_type == "integer":
-        return 123
+        return _number_sample(schema, 123, integer=True) if _NUMBER_KEYS.intersection(schema) else 123
     elif schema_type == "number":
-        return 12.34
+        return _number_sample(schema, 12.34, integer=False) if _NUMBER_KEYS.intersection(schema) else 12.34
     elif schema_type == "boolean":
         return True
     elif schema_type == "oneOf":
-        return generate_payload(schema["oneOf"][0], spec)
+        return _compile_template(schema["oneOf"][0], spec, depth, stack)
     elif schema_type == "anyOf":
-        return generate_payload(schema["anyOf"][0], spec)
+        return _compile_template(schema["anyOf"][0], spec, depth, stack)
     elif schema_type == "allOf":
         merged = {}
         for sub_schema in schema["allOf"]:
-            merged.update(generate_payload(sub_schema, spec))
+            part = _compile_template(sub_schema, spec, depth, stack)
+            if isinstance(part, dict):
+                merged.update(part)
         return merged
     else:
         return None
 
-def generate_negative_payload(operation: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Generates an invalid/malformed payload based on requestBody schema.
-    Simulates missing required fields, wrong data types, etc.
-    """
-    spec = operation  # Swagger root spec if needed for $ref resolution
-    request_body = operation.get("requestBody", {})
-    content = request_body.get("content", {})
-    json_schema = content.get("application/json", {}).get("schema", {})
 
-    if "$ref" in json_schema:
-        json_schema = resolve_ref(json_schema["$ref"], spec)
+def _declared_value(schema: Dict[str, Any]) -> Any:
+    # The schema's const, first enum value, example or default, in that order
+    for key in _VALUE_KEYS_ORDER:
+        value = schema.get(key, _MISSING)
+        if value is _MISSING:
+            continue
+        if key in ("enum", "examples"):
+            # Lists of values; the first one is used
+            if not isinstance(value, Sequence) or isinstance(value, str) or not value:
+                continue
+            value = value[0]
+        return _copy_template(materialize(value))
+    return _MISSING
+
+
+def _string_sample(schema: Dict[str, Any]) -> str:
+    # A string matching the pattern, else the format's sample, sized to the length bounds
+    min_length = schema.get("minLength", 0)
+    max_length = schema.get("maxLength")
+    pattern = schema.get("pattern")
+    if pattern and isinstance(pattern, str):
+        value = _pattern_sample(pattern, min_length)
+        if value is not None:
+            return value
+    value = FORMAT_SAMPLES.get(schema.get("format"), "string_value")
+    if len(value) < min_length:
+        value += "x" * (min_length - len(value))
+    if max_length is not None and len(value) > max_length:
+        value = value[:max_length]
+    return value
+
+
+@lru_cache(maxsize=1024)
+def _pattern_sample(pattern: str, min_length: int = 0) -> Optional[str]:
+    # A string the pattern matches (with re.search, as JSON Schema does), or None
+    if sre_parse is None:
+        return None
+    try:
+        compiled = re.compile(pattern)
+        parsed = sre_parse.parse(pattern)
+    except (re.error, RecursionError):
+        return None
+    for repeat in (0, PATTERN_REPEAT, max(min_length, 1)):
+        try:
+            value = "".join(_regex_sample(parsed, repeat))
+        except (ValueError, IndexError, TypeError, AttributeError):
+            # Unsupported syntax, or a parser whose private token format has changed
+            return None
+        if len(value) >= min_length and compiled.search(value):
+            return value
+    return None
+
+
+def _regex_sample(tokens: Any, repeat: int) -> List[str]:
+    # Shortest-ish text for parsed regex tokens; unbounded repeats run at least repeat times
+    out = []
+    for op, arg in tokens:
+        name = str(op)
+        if name == "LITERAL":
+            out.append(chr(arg))
+        elif name == "NOT_LITERAL":
+            out.append("a" if arg != ord("a") else "b")
+        elif name == "ANY":
+            out.append("a")
+        elif name == "IN":
+            out.append(_class_sample(arg))
+        elif name == "BRANCH":
+            out.extend(_regex_sample(arg[1][0], repeat))
+        elif name == "SUBPATTERN":
+            out.extend(_regex_sample(arg[-1], repeat))
+        elif name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT"):
+            low, high, body = arg
+            count = max(low, repeat)
+            if high != sre_parse.MAXREPEAT:
+                count = min(count, high)
+            for _ in range(count):
+                out.extend(_regex_sample(body, repeat))
+        elif name == "ATOMIC_GROUP":
+            out.extend(_regex_sample(arg, repeat))
+        elif name in ("AT", "ASSERT", "ASSERT_NOT"):
+            continue
+        else:
+            raise ValueError(name)
+    return out
+
+
+def _class_sample(items: Any) -> str:
+    # A character of a [...] class; for a negated class, one of a few candidates outside it
+    if items and str(items[0][0]) == "NEGATE":
+        for candidate in "axZ0_- ":
+            if not any(_in_class_item(candidate, item) for item in items[1:]):
+                return candidate
+        raise ValueError("NEGATE")
+    op, arg = items[0]
+    name = str(op)
+    if name == "LITERAL":
+        return chr(arg)
+    if name == "RANGE":
+        return chr(arg[0])
+    if name == "CATEGORY":
+        for candidate in "a0 -":
+            if _in_class_item(candidate, items[0]):
+                return candidate
+    raise ValueError(name)
 
-    schema_type = get_type_from_schema(json_schema)
-    if schema_type != "object":
-        return {"invalid": "payload"}  # fallback for non-object schemas
 
-    props = json_schema.get("properties", {})
-    required = json_schema.get("required", [])
+def _in_class_item(char: str, item: Any) -> bool:
+    op, arg = item
+    name = str(op)
+    if name == "LITERAL":
+        return char == chr(arg)
+    if name == "RANGE":
+        return arg[0] <= ord(char) <= arg[1]
+    if name == "CATEGORY":
+        return re.match(_CATEGORY_CLASSES[str(arg)], char) is not None
+    raise ValueError(name)
 
-    # Simulate 3 common errors: 
-    # 1. missing required field
-    # 2. invalid data type
-    # 3. unexpected extra field
-    broken_payload = {}
 
-    # Include all required fields but introduce wrong types
-    for k in required:
-        broken_payload[k] = 999 if props[k].get("type") == "string" else "oops"
+def _number_sample(schema: Dict[str, Any], default: float, integer: bool) -> float:
+    # default if allowed, otherwise the first allowed value next to a bound
+    low, high = schema.get("minimum"), schema.get("maximum")
+    low_exclusive = schema.get("exclusiveMinimum") is True
+    high_exclusive = schema.get("exclusiveMaximum") is True
+    # OpenAPI 3.1 / JSON Schema: exclusive bounds are numbers of their own
+    bound = schema.get("exclusiveMinimum")
+    if isinstance(bound, (int, float)) and not isinstance(bound, bool) and (low is None or bound >= low):
+        low, low_exclusive = bound, True
+    bound = schema.get("exclusiveMaximum")
+    if isinstance(bound, (int, float)) and not isinstance(bound, bool) and (high is None or bound <= high):
+        high, high_exclusive = bound, True
+    step = schema.get("multipleOf")
 
-    # Add extra unexpected field
-    broken_payload["unexpected_field"] = "junk"
+    def allowed(value):
+        return ((low is None or value > low or (value == low and not low_exclusive))
+                and (high is None or value < high or (value == high and not high_exclusive))
+                and (not step or abs(value / step - round(value / step)) < 1e-9))
+
+    candidates = [default]
+    if low is not None:
+        start = math.ceil(low / step) * step if step else (math.ceil(low) if integer else low)
+        candidates += [start, start + (step or 1)]
+    if high is not None:
+        start = math.floor(high / step) * step if step else (math.floor(high) if integer else high)
+        candidates += [start, start - (step or 1)]
+    if low is not None and high is not None and not integer:
+        candidates.append((low + high) / 2)
+    for value in candidates:
+        if allowed(value):
+            return int(value) if integer else value
+    return default
+
+
+def copy_payload(payload: Any) -> Any:
+    """
+    Structural copy of a generated payload (e.g. a shared one, see
+    generate_payload), safe to modify.
+    """
+    return _copy_template(payload)
+
+
+def _copy_template(template: Any) -> Any:
+    # Templates only hold dicts, lists and immutable scalars
+    if isinstance(template, dict):
+        return {k: _copy_template(v) for k, v in template.items()}
+    elif isinstance(template, list):
+        return [_copy_template(i) for i in template]
+    else:
+        return template
+
+
+def generate_negative_payload(operation: Dict[str, Any], spec: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Generates an invalid/malformed payload based on requestBody schema.
+    Simulates missing required fields, wrong data types, etc. (the first
+    case of app.mutation_engine; use iter_negative_payloads for all of them).
+    spec is the root spec used for $ref resolution.
+    """
+    from app.mutation_engine import iter_negative_payloads, request_schema
 
-    return broken_payload
+    if spec is None:
+        spec = operation  # Legacy callers passed only the operation
+    for payload, _ in iter_negative_payloads(request_schema(operation), spec, strategy="each"):
+        if isinstance(payload, dict):
+            return payload
+    return {"invalid": "payload"}  # fallback for schemas without violations
@@ -1,5 +1,5 @@
-import json
 from typing import Any, Dict
+from app import serialization
 
 class ProjectConfig:
     def __init__(self, config_file="project_config.json"):
@@ -14,8 +14,8 @@ class ProjectConfig:
         Loads the configuration from the config file. If the file doesn't exist, returns default settings.
         """
         try:
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
+            with open(self.config_file, 'rb') as f:
+                return serialization.load(f)
         except FileNotFoundError:
             return self.get_default_config()
 
@@ -34,8 +34,8 @@ class ProjectConfig:
         """
         Saves the current configuration to the config file.
         """
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        with open(self.config_file, 'wb') as f:
+            serialization.dump(self.config, f, pretty=True)
 
     def set_config(self, key: str, value: Any) -> None:
         """
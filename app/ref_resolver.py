@@ -0,0 +1,214 @@
+# app/ref_resolver.py
+
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, List, Set
+
+# Top-level sections whose direct children are the usual $ref targets.
+# OpenAPI 3 keeps them under "components", Swagger 2 at the root.
+INDEXED_SECTIONS = ("definitions", "parameters", "responses", "securityDefinitions")
+
+
+def split_pointer(ref: str) -> List[str]:
+    """
+    Splits a local JSON pointer ("#/a/b") into unescaped tokens.
+    """
+    if not ref.startswith("#/"):
+        raise ValueError(f"Unsupported ref format: {ref}")
+    return [part.replace("~1", "/").replace("~0", "~") for part in ref[2:].split("/")]
+
+
+def build_pointer(parts: List[str]) -> str:
+    """
+    Builds a local JSON pointer from unescaped tokens.
+    """
+    return "#/" + "/".join(str(p).replace("~", "~0").replace("/", "~1") for p in parts)
+
+
+class RefResolver:
+    """
+    Resolves local $ref pointers against a single spec.
+
+    Pointer targets are looked up through an index built once from the spec,
+    every target is resolved at most once and the resolved object is shared by
+    all of its use sites. A $ref that points back into a target that is still
+    being resolved is a cycle; it is left in place as the original
+    {"$ref": ...} node so the resolved tree stays finite.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self._index: Dict[str, Any] = {}
+        self._pointers: Dict[int, str] = {}
+        self._resolved: Dict[str, Any] = {}
+        self._in_progress: Set[str] = set()
+        self.cycles: Set[str] = set()
+        self._build_index()
+
+    def _build_index(self) -> None:
+        sections = [(["components", name], group) for name, group in self.spec.get("components", {}).items()]
+        sections += [([name], self.spec[name]) for name in INDEXED_SECTIONS if name in self.spec]
+
+        for prefix, group in sections:
+            if not isinstance(group, dict):
+                continue
+            for name, node in group.items():
+                pointer = build_pointer(prefix + [name])
+                self._index[pointer] = node
+                if isinstance(node, dict):
+                    self._pointers[id(node)] = pointer
+
+    def lookup(self, ref: str) -> Any:
+        """
+        Returns the raw (unresolved) node a pointer refers to.
+        """
+        node = self._index.get(ref)
+        if node is not None:
+            return node
+
+        node = self.spec
+        for part in split_pointer(ref):
+            if isinstance(node, list) and part.isdigit() and int(part) < len(node):
+                node = node[int(part)]
+            elif isinstance(node, dict) and part in node:
+                node = node[part]
+            else:
+                raise KeyError(f"Unable to resolve reference: {ref}")
+
+        self._index[ref] = node
+        return node
+
+    def resolve_ref(self, ref: str) -> Any:
+        """
+        Returns the fully resolved target of a pointer, shared between callers.
+        """
+        if ref in self._resolved:
+            return self._resolved[ref]
+        if ref in self._in_progress:
+            self.cycles.add(ref)
+            return {"$ref": ref}
+
+        self._in_progress.add(ref)
+        try:
+            resolved = self._copy(self.lookup(ref))
+        finally:
+            self._in_progress.discard(ref)
+
+        self._resolved[ref] = resolved
+        return resolved
+
+    def resolve(self, obj: Any) -> Any:
+        """
+        Returns a copy of obj with every $ref replaced by its shared resolved target.
+        """
+        if isinstance(obj, dict) and id(obj) in self._pointers:
+            # An indexed component reached directly (e.g. under components/schemas)
+            return self.resolve_ref(self._pointers[id(obj)])
+        return self._copy(obj)
+
+    def _copy(self, obj: Any) -> Any:
+        if isinstance(obj, dict):
+            if "$ref" in obj and isinstance(obj["$ref"], str):
+                return self.resolve_ref(obj["$ref"])
+            return {k: self.resolve(v) for k, v in obj.items()}
+        elif isinstance(obj, list):
+            return [self.resolve(i) for i in obj]
+        else:
+            return obj
+
+    def target(self, node: Any) -> Any:
+        """
+        Follows a chain of $ref nodes to the raw node it finally points at.
+        """
+        seen = set()
+        while isinstance(node, dict) and isinstance(node.get("$ref"), str):
+            ref = node["$ref"]
+            if ref in seen:
+                raise ValueError(f"Circular reference: {ref}")
+            seen.add(ref)
+            node = self.lookup(ref)
+        return node
+
+    def view(self, node: Any) -> Any:
+        """
+        Wraps a raw node in a read-only view that resolves $refs on access.
+        Scalars are returned unchanged.
+        """
+        node = self.target(node)
+        if isinstance(node, dict):
+            return LazyMapping(node, self)
+        elif isinstance(node, list):
+            return LazySequence(node, self)
+        else:
+            return node
+
+
+class LazyMapping(Mapping):
+    """
+    Read-only mapping over a raw spec node. Values are resolved through the
+    resolver only when they are accessed, so untouched parts of the spec are
+    never copied.
+    """
+
+    __slots__ = ("_node", "_resolver")
+
+    def __init__(self, node: Dict[str, Any], resolver: RefResolver):
+        self._node = node
+        self._resolver = resolver
+
+    def __getitem__(self, key: str) -> Any:
+        return self._resolver.view(self._node[key])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._node)
+
+    def __len__(self) -> int:
+        return len(self._node)
+
+    def __repr__(self) -> str:
+        return f"LazyMapping({list(self._node)!r})"
+
+
+class LazySequence(Sequence):
+    """
+    Read-only sequence counterpart of LazyMapping.
+    """
+
+    __slots__ = ("_node", "_resolver")
+
+    def __init__(self, node: List[Any], resolver: RefResolver):
+        self._node = node
+        self._resolver = resolver
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._resolver.view(i) for i in self._node[index]]
+        return self._resolver.view(self._node[index])
+
+    def __len__(self) -> int:
+        return len(self._node)
+
+    def __repr__(self) -> str:
+        return f"LazySequence(len={len(self._node)})"
+
+
+def node_identity(obj: Any) -> int:
+    """
+    Returns an identity for a schema object that is stable across lazy views:
+    every view of the same raw node shares it.
+    """
+    if isinstance(obj, (LazyMapping, LazySequence)):
+        return id(obj._node)
+    return id(obj)
+
+
+def materialize(obj: Any) -> Any:
+    """
+    Converts lazy views (and lists of them) into plain resolved dicts/lists,
+    e.g. before a test case leaves the generator. Plain objects are returned as is.
+    """
+    if isinstance(obj, (LazyMapping, LazySequence)):
+        return obj._resolver.resolve(obj._node)
+    elif isinstance(obj, list):
+        return [materialize(i) for i in obj]
+    else:
+        return obj
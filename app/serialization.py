@@ -0,0 +1,179 @@
+# app/serialization.py
+
+import io
+import json
+import re
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict, Optional, Union
+
+try:
+    import orjson  # Fastest backend, used when installed
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Output follows the stdlib with ensure_ascii=False: pretty is
+# json.dumps(obj, indent=2), compact uses separators=(",", ":"). Floats may
+# be spelled differently by the faster backends (orjson writes 1e16 where the
+# stdlib writes 1e+16), which parses back to the same value. Parsing gives the
+# same values as json.loads: input those backends would reject or turn into
+# floats (integers wider than 64 bits, out-of-range numbers) goes to json.loads.
+
+# Digit runs long enough to be an integer wider than 64 bits
+_WIDE_DIGITS = re.compile(r"[0-9]{20,}")
+_WIDE_DIGITS_BYTES = re.compile(rb"[0-9]{20,}")
+
+
+def _default(obj: Any) -> Any:
+    # Test cases (app.test_case) and other objects with a dict form
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is not None:
+        return to_dict()
+    # Lazy spec views (app.ref_resolver) and other mapping/sequence types
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, Sequence) and not isinstance(obj, (str, bytes)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_dumps(obj: Any, pretty: bool, sort_keys: bool) -> bytes:
+    if pretty:
+        text = json.dumps(obj, indent=2, ensure_ascii=False, sort_keys=sort_keys, default=_default)
+    else:
+        text = json.dumps(obj, separators=(",", ":"), ensure_ascii=False, sort_keys=sort_keys, default=_default)
+    return text.encode("utf-8")
+
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    return json.loads(data)
+
+
+def _orjson_dumps(obj: Any, pretty: bool, sort_keys: bool) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    try:
+        return orjson.dumps(obj, default=_default, option=option)
+    except TypeError:
+        # e.g. integers wider than 64 bits, which only the stdlib handles
+        return _json_dumps(obj, pretty, sort_keys)
+
+
+def _has_wide_digits(data: Union[str, bytes, bytearray]) -> bool:
+    # May also match digits inside strings or fractions; those just take the stdlib path
+    pattern = _WIDE_DIGITS if isinstance(data, str) else _WIDE_DIGITS_BYTES
+    return pattern.search(data) is not None
+
+
+def _orjson_loads(data: Union[str, bytes]) -> Any:
+    if _has_wide_digits(data):
+        return _json_loads(data)
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return _json_loads(data)  # e.g. 1e400, which the stdlib reads as inf; raises ValueError if invalid
+
+
+_msgspec_encoders: Dict[bool, Any] = {}
+
+
+def _msgspec_dumps(obj: Any, pretty: bool, sort_keys: bool) -> bytes:
+    encoder = _msgspec_encoders.get(sort_keys)
+    if encoder is None:
+        encoder = msgspec.json.Encoder(enc_hook=_default, order="sorted" if sort_keys else None)
+        _msgspec_encoders[sort_keys] = encoder
+    try:
+        data = encoder.encode(obj)
+    except (TypeError, OverflowError, msgspec.EncodeError):
+        return _json_dumps(obj, pretty, sort_keys)
+    return msgspec.json.format(data, indent=2) if pretty else data
+
+
+def _msgspec_loads(data: Union[str, bytes]) -> Any:
+    if _has_wide_digits(data):
+        return _json_loads(data)
+    try:
+        return msgspec.json.decode(data)
+    except msgspec.DecodeError:
+        return _json_loads(data)
+
+
+_BACKENDS: Dict[str, Any] = {"json": (_json_dumps, _json_loads)}
+if msgspec is not None:
+    _BACKENDS["msgspec"] = (_msgspec_dumps, _msgspec_loads)
+if orjson is not None:
+    _BACKENDS["orjson"] = (_orjson_dumps, _orjson_loads)
+
+backend: str = ""
+_dumps: Callable[[Any, bool, bool], bytes] = _json_dumps
+_loads: Callable[[Union[str, bytes]], Any] = _json_loads
+
+
+def use_backend(name: Optional[str] = None) -> str:
+    """
+    Selects the backend by name ("orjson", "msgspec" or "json"), or the
+    fastest installed one for None. Returns the name of the selected backend.
+    """
+    global backend, _dumps, _loads
+    if name is None:
+        name = next(n for n in ("orjson", "msgspec", "json") if n in _BACKENDS)
+    if name not in _BACKENDS:
+        raise ValueError(f"Serialization backend '{name}' is not available. Installed: {', '.join(sorted(_BACKENDS))}.")
+    backend = name
+    _dumps, _loads = _BACKENDS[name]
+    return name
+
+
+use_backend()
+
+
+def dumps(obj: Any, pretty: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    Serializes obj to UTF-8 JSON bytes, indented by two spaces when pretty.
+    """
+    return _dumps(obj, pretty, sort_keys)
+
+
+def dumps_text(obj: Any, pretty: bool = False, sort_keys: bool = False) -> str:
+    return _dumps(obj, pretty, sort_keys).decode("utf-8")
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """
+    Parses JSON from text or UTF-8 bytes. Raises ValueError on invalid input.
+    """
+    return _loads(data)
+
+
+def dump(obj: Any, fp: Any, pretty: bool = False, sort_keys: bool = False) -> None:
+    """
+    Writes obj to a binary file as is, or decoded to a text file.
+    """
+    data = _dumps(obj, pretty, sort_keys)
+    if is_text_stream(fp):
+        fp.write(data.decode("utf-8"))
+    else:
+        fp.write(data)
+
+
+def load(fp: Any) -> Any:
+    """
+    Parses JSON from a text or binary file.
+    """
+    return _loads(fp.read())
+
+
+def is_text_stream(fp: Any) -> bool:
+    # Binary streams (files opened with "b", BytesIO, uploads) have no encoding
+    if isinstance(fp, io.TextIOBase):
+        return True
+    if isinstance(fp, (io.RawIOBase, io.BufferedIOBase)):
+        return False
+    return hasattr(fp, "encoding")
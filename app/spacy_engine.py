@@ -0,0 +1,71 @@
+# app/spacy_engine.py
+
+import threading
+from typing import Iterable, List, Tuple
+
+try:
+    import spacy
+except ImportError:
+    spacy = None
+
+# Summaries only need lemmas and POS tags, so the parser and NER are never loaded
+SPACY_SUMMARY_EXCLUDE = ("parser", "ner", "senter", "entity_ruler", "entity_linker", "textcat")
+
+# Process-wide spaCy pipelines keyed by (name, excluded components)
+_spacy_models = {}
+_spacy_lock = threading.Lock()
+
+
+def get_spacy_model(name="en_core_web_sm", exclude=SPACY_SUMMARY_EXCLUDE):
+    """
+    Returns the process-wide spaCy pipeline for name, loading it on first use
+    without the excluded components ("blank:<lang>" gives spacy.blank(lang)).
+    A failed load is remembered and re-raised instead of being retried on
+    every call.
+    """
+    key = (name, tuple(exclude))
+    with _spacy_lock:
+        if key not in _spacy_models:
+            try:
+                if spacy is None:
+                    raise ImportError("spaCy is not installed. Install it with: pip install spacy")
+                if name.startswith("blank:"):
+                    _spacy_models[key] = spacy.blank(name.split(":", 1)[1])
+                else:
+                    _spacy_models[key] = spacy.load(name, exclude=list(exclude))
+            except Exception as e:
+                _spacy_models[key] = e
+        nlp = _spacy_models[key]
+
+    if isinstance(nlp, Exception):
+        raise nlp
+    return nlp
+
+
+def register_spacy_model(nlp, name="en_core_web_sm", exclude=SPACY_SUMMARY_EXCLUDE):
+    """
+    Installs an already built pipeline (e.g. spacy.blank plus a tagger) in the registry.
+    """
+    with _spacy_lock:
+        _spacy_models[(name, tuple(exclude))] = nlp
+
+
+def generate_summaries_spacy(items: Iterable[Tuple[str, str, str]], batch_size: int = 64, n_process: int = 1,
+                             model: str = "en_core_web_sm", instrumentation=None) -> List[str]:
+    """
+    Summarizes many (summary, path, operation) triples with a single nlp.pipe
+    call. Nothing is counted, so instrumentation is unused.
+    """
+    items = list(items)
+    try:
+        nlp = get_spacy_model(model)
+    except Exception:
+        return [f"{operation.upper()} {path} - {summary}" for summary, path, operation in items]
+
+    docs = nlp.pipe((summary or "" for summary, _, _ in items), batch_size=batch_size, n_process=n_process)
+    summaries = []
+    for doc, (_, path, operation) in zip(docs, items):
+        verbs = [token.lemma_ for token in doc if token.pos_ == "VERB"]
+        action = verbs[0] if verbs else "access"
+        summaries.append(f"Use {operation.upper()} on {path} to {action}.")
+    return summaries
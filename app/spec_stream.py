@@ -0,0 +1,195 @@
+# app/spec_stream.py
+
+import codecs
+import json
+import os
+import re
+import tempfile
+from typing import Any, Dict, Iterator, Tuple
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL = re.compile(r"[-+.eE0-9]*\Z")
+
+
+class _JsonBuffer:
+    """
+    Sliding text window over a file-like object. Values are decoded with the
+    stdlib decoder as soon as the window holds all of their text, and the
+    consumed prefix is dropped on the next refill.
+    """
+
+    def __init__(self, fp, chunk_size: int):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+
+    def fill(self, min_size: int = 0) -> bool:
+        if self.eof:
+            return False
+        if self.pos:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+
+        while True:
+            raw = self.fp.read(max(self.chunk_size, min_size))
+            chunk = self._decoder.decode(raw, final=not raw) if isinstance(raw, bytes) else raw
+            # A chunk can end inside a multi-byte character and decode to nothing.
+            if chunk or not raw:
+                break
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.text += chunk
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self.text, self.pos)
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill(len(self.text) - self.pos):
+                    raise
+                continue
+            # A number followed only by number characters up to the window edge may be
+            # truncated (the window can end right after "1", "0." or "1e").
+            if (isinstance(obj, (int, float)) and not isinstance(obj, bool)
+                    and _NUMBER_TAIL.match(self.text, end) and self.fill()):
+                continue
+            self.pos = end
+            return obj
+
+    def members(self) -> Iterator[str]:
+        """
+        Yields the keys of the object at the current position. The caller
+        must consume each member's value before asking for the next key.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Expecting property name", self.text, self.pos)
+            self.expect(":")
+            yield key
+
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", self.text, self.pos - 1)
+
+
+class StreamingSpecReader:
+    """
+    Incremental reader for JSON OpenAPI/Swagger documents.
+
+    read_head() returns every top-level section except "paths" (info,
+    components, definitions, ...), skipping path items one at a time.
+    iter_paths() then re-reads the source and yields the path items one by
+    one, so only one path item is held in memory at a time. Sources that
+    cannot seek are spooled to a temporary file first.
+    """
+
+    def __init__(self, source: Any, chunk_size: int = 1 << 16):
+        self.chunk_size = chunk_size
+        self._owns_file = False
+
+        if isinstance(source, (str, os.PathLike)):
+            self._fp = open(source, "rb")
+            self._owns_file = True
+        elif _is_seekable(source):
+            self._fp = source
+        else:
+            self._fp = tempfile.TemporaryFile()
+            self._owns_file = True
+            _spool(source, self._fp)
+            self._fp.seek(0)
+
+        self._start = self._fp.tell()
+
+    @staticmethod
+    def supports(source: Any) -> bool:
+        """
+        Whether source can be streamed: a JSON file path or a readable file-like object.
+        """
+        if isinstance(source, os.PathLike):
+            source = os.fspath(source)
+        if isinstance(source, str):
+            return not source.startswith(("http://", "https://")) and not source.endswith((".yaml", ".yml"))
+        name = getattr(source, "name", None)
+        if isinstance(name, str) and name.endswith((".yaml", ".yml")):
+            return False
+        return hasattr(source, "read")
+
+    def _buffer(self) -> _JsonBuffer:
+        self._fp.seek(self._start)
+        return _JsonBuffer(self._fp, self.chunk_size)
+
+    def read_head(self) -> Dict[str, Any]:
+        """
+        Reads all top-level sections except "paths".
+        """
+        buf = self._buffer()
+        head = {}
+        for key in buf.members():
+            if key == "paths":
+                for _ in buf.members():
+                    buf.value()
+            else:
+                head[key] = buf.value()
+        return head
+
+    def iter_paths(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yields (path, raw path item) pairs in document order.
+        """
+        buf = self._buffer()
+        for key in buf.members():
+            if key != "paths":
+                buf.value()
+                continue
+            for path in buf.members():
+                yield path, buf.value()
+            return
+
+    def close(self) -> None:
+        if self._owns_file:
+            self._fp.close()
+
+
+def _is_seekable(fp: Any) -> bool:
+    try:
+        return fp.seekable()
+    except (AttributeError, ValueError):
+        return False
+
+
+def _spool(source: Any, target) -> None:
+    while True:
+        chunk = source.read(1 << 16)
+        if not chunk:
+            return
+        target.write(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
@@ -1,7 +1,9 @@
-import json
-import requests
-from typing import Any, Dict, Union
-from app.utils import resolve_ref
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple, Union
+from app.ref_resolver import RefResolver
+from app.spec_stream import StreamingSpecReader
+from app.operation_index import Operation, OperationFilter, OperationIndex, iter_path_operations
+from app.instrumentation import Instrumentation, metrics
+from app import serialization
 
 try:
     import yaml  # For YAML support
@@ -10,38 +12,159 @@ except ImportError:
 
 
 class SwaggerLoader:
-    def __init__(self, source: Union[str, Dict[str, Any]]):
-        self.spec = self.load_spec(source)
-        self.spec = self.resolve_all_refs_in_spec()  # Optionally expand $ref
+    def __init__(self, source: Union[str, Dict[str, Any], Any], lazy: bool = False, stream: bool = False,
+                 instrumentation: Optional[Instrumentation] = None):
+        """
+        With lazy=True the raw spec is kept as loaded and self.spec is a
+        read-only view that resolves $refs only when a key is accessed.
+
+        With stream=True a JSON file path or file-like source is read
+        incrementally: everything except "paths" is loaded up front and
+        iter_paths() reads the path items one at a time. $refs pointing into
+        "paths" cannot be resolved in this mode. YAML and URL sources are
+        loaded in full as usual.
+
+        Stage timings go to instrumentation, or to the process-wide metrics
+        when none is given. A streaming loader holds its source file open
+        until close() (or the end of a with block).
+        """
+        self.metrics = instrumentation or metrics
+        self.lazy = lazy
+        self.stream = None
+        self._operation_index = None
+        with self.metrics.stage("load"):
+            if stream and StreamingSpecReader.supports(source):
+                self.stream = StreamingSpecReader(source)
+                try:
+                    self.raw_spec = self.stream.read_head()
+                except Exception:
+                    self.stream.close()
+                    raise
+            else:
+                self.raw_spec = self.load_spec(source)
+
+        with self.metrics.stage("ref_resolution"):
+            self.resolver = RefResolver(self.raw_spec)
+            if lazy:
+                self.spec = self.resolver.view(self.raw_spec)
+            else:
+                self.spec = self.resolve_all_refs_in_spec()  # Optionally expand $ref
+
+    def close(self) -> None:
+        """
+        Closes the file a streaming loader reads its path items from.
+        """
+        if self.stream is not None:
+            self.stream.close()
+
+    def __enter__(self) -> "SwaggerLoader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def load_spec(self, source: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
         """
-        Loads OpenAPI/Swagger spec from a URL, file path, or raw dict.
+        Loads OpenAPI/Swagger spec from a URL, file path, file-like object or raw dict.
         """
         if isinstance(source, dict):
             return source
 
         elif isinstance(source, str):
             if source.startswith("http://") or source.startswith("https://"):
+                import requests  # Only needed for URLs, and slow to import
+
                 response = requests.get(source)
                 response.raise_for_status()
-                return response.json()
-            else:
+                return serialization.loads(response.content)
+            elif source.endswith((".yaml", ".yml")) and yaml:
                 with open(source, "r", encoding="utf-8") as f:
-                    if source.endswith((".yaml", ".yml")) and yaml:
-                        return yaml.safe_load(f)
-                    else:
-                        return json.load(f)
+                    return yaml.safe_load(f)
+            else:
+                with open(source, "rb") as f:
+                    return serialization.load(f)
+        elif hasattr(source, "read"):
+            name = getattr(source, "name", None) or ""
+            if isinstance(name, str) and name.endswith((".yaml", ".yml")) and yaml:
+                return yaml.safe_load(source)
+            return serialization.load(source)
         else:
             raise TypeError(f"Unsupported spec input type: {type(source)}")
 
-    def get_paths(self) -> Dict[str, Any]:
+    def get_paths(self) -> Mapping[str, Any]:
         """
         Returns the 'paths' section of the OpenAPI spec (with resolved $refs).
         """
         return self.spec.get("paths", {})
 
-    def get_components(self) -> Dict[str, Any]:
+    def iter_paths(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Yields (path, path item) pairs with resolved $refs. In streaming mode
+        each path item is read from the source only when it is reached.
+        """
+        if self.stream is None:
+            yield from self.get_paths().items()
+            return
+
+        for path, path_item in self.stream.iter_paths():
+            yield path, self.resolve_path_item(path_item)
+
+    def iter_raw_paths(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yields (path, raw path item) pairs with $refs left in place.
+        """
+        if self.stream is None:
+            yield from self.raw_spec.get("paths", {}).items()
+        else:
+            yield from self.stream.iter_paths()
+
+    def resolve_path_item(self, path_item: Dict[str, Any]) -> Any:
+        """
+        Resolves a raw path item read outside self.spec (e.g. from a stream),
+        honouring the lazy setting.
+        """
+        with self.metrics.stage("ref_resolution"):
+            if self.lazy:
+                return self.resolver.view(path_item)
+            return self.resolver.resolve(path_item)
+
+    def operation_index(self) -> OperationIndex:
+        """
+        The OperationIndex of this spec, built on first use and shared by
+        everything holding this loader. In streaming mode building it reads
+        (and keeps) every path item.
+        """
+        if self._operation_index is None:
+            self._operation_index = OperationIndex.from_paths(self._iter_path_items())
+        return self._operation_index
+
+    def iter_operations(self, selection: Optional[OperationFilter] = None) -> Iterator[Operation]:
+        """
+        Yields the spec's operations in order, only those matching selection
+        if given: from the index when there is one, otherwise (streaming)
+        straight from the source without keeping them. Streamed path items
+        without a selected operation are skipped before being resolved.
+        """
+        if self._operation_index is not None or self.stream is None:
+            yield from self.operation_index().select(selection)
+            return
+        for path, raw_item in self.stream.iter_paths():
+            if selection is not None and not selection.matches_path_item(path, raw_item):
+                continue
+            operations = iter_path_operations(path, self.resolve_path_item(raw_item), raw_item)
+            yield from selection.apply(operations) if selection is not None else operations
+
+    def _iter_path_items(self) -> Iterator[Tuple[str, Any, Dict[str, Any]]]:
+        # (path, resolved path item, raw path item)
+        if self.stream is None:
+            paths = self.get_paths()
+            for path, raw_item in self.raw_spec.get("paths", {}).items():
+                yield path, paths[path], raw_item
+        else:
+            for path, raw_item in self.stream.iter_paths():
+                yield path, self.resolve_path_item(raw_item), raw_item
+
+    def get_components(self) -> Mapping[str, Any]:
         """
         Returns the 'components' section of the OpenAPI spec (with resolved $refs).
         """
@@ -50,15 +173,7 @@ class SwaggerLoader:
     def resolve_all_refs_in_spec(self) -> Dict[str, Any]:
         """
         Recursively resolves all $ref references in the OpenAPI spec.
+        Each referenced component is resolved once and shared by all of its
+        use sites; self-referencing components keep their cyclic $ref.
         """
-        def _resolve(obj: Any) -> Any:
-            if isinstance(obj, dict):
-                if "$ref" in obj:
-                    return resolve_ref(obj["$ref"], self.spec)
-                return {k: _resolve(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [_resolve(i) for i in obj]
-            else:
-                return obj
-
-        return _resolve(self.spec)
+        return self.resolver.resolve(self.resolver.spec)
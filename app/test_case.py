@@ -0,0 +1,198 @@
+# app/test_case.py
+
+import sys
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from app.payload_builder import copy_payload
+
+# Status-code-only assertion lists, keyed by their expected codes, shared by every test case that has them
+_status_assertions: Dict[Tuple[Any, ...], Tuple[Dict[str, Any], ...]] = {}
+
+
+def shared_assertions(assertions: Iterable[Dict[str, Any]]) -> Tuple[Dict[str, Any], ...]:
+    """
+    Assertions as a tuple. Lists made only of status code checks (e.g. the
+    400 of almost every negative case) are the same tuple for all test
+    cases instead of a copy per operation.
+    """
+    assertions = tuple(assertions)
+    if not all(a.keys() == {"type", "expected"} and a["type"] == "status_code"
+               and isinstance(a["expected"], (int, str)) for a in assertions):
+        return assertions
+    key = tuple(a["expected"] for a in assertions)
+    return _status_assertions.setdefault(key, assertions)
+
+
+class TestCase(ABC):
+    """
+    Compact generated test case: attributes in __slots__, path and method
+    interned, and parameter, schema and assertion objects shared with the
+    operation (and the other test cases built from it) rather than copied.
+    Shared objects must not be modified. Test cases become plain dicts only
+    at the export boundary, through to_dict() (serialization does this on
+    its own); exporters and the test runner read the attributes directly.
+    to_dict() copies the payload, which may be the cached payload template
+    shared with other test cases; parameter, response and assertion objects
+    are those of the spec, as they always were in the dict form.
+    """
+
+    __slots__ = ("path", "method", "assertions", "tags")
+    kind = ""
+
+    def __init__(self, path: str, method: str, assertions: Iterable[Dict[str, Any]] = (),
+                 tags: Iterable[str] = ()):
+        self.path = sys.intern(path)
+        self.method = sys.intern(method.lower())  # lowercase, e.g. "get"
+        self.assertions = shared_assertions(assertions)
+        self.tags = tags if isinstance(tags, tuple) else tuple(tags)
+
+    @property
+    def label(self) -> str:
+        return f"{self.method.upper()} {self.path}"
+
+    @property
+    def executable(self) -> bool:
+        # Whether running the test case against a conforming server can pass (see NegativeTestCase)
+        return True
+
+    @abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def _values(self) -> Tuple[Any, ...]:
+        # Constructor arguments, in order
+        ...
+
+    def __reduce__(self):
+        # Rebuilt through __init__, so strings are interned again after pickling (e.g. from worker processes)
+        return type(self), self._values()
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, TestCase):
+            return type(self) is type(other) and self._values() == other._values()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.method.upper()} {self.path})"
+
+
+class PositiveTestCase(TestCase):
+    """
+    A TestGenerator test case; assertions are the positive ones.
+    """
+
+    __slots__ = ("name", "description", "params", "payload", "negative_assertions")
+    kind = "positive"
+
+    def __init__(self, path: str, method: str, name: str, description: str,
+                 params: Iterable[Dict[str, Any]] = (), payload: Any = None,
+                 assertions: Iterable[Dict[str, Any]] = (), negative_assertions: Iterable[Dict[str, Any]] = (),
+                 tags: Iterable[str] = ()):
+        super().__init__(path, method, assertions, tags)
+        self.name = name
+        self.description = description
+        self.params = tuple(params)  # query parameters
+        self.payload = payload if payload is not None else {}
+        self.negative_assertions = shared_assertions(negative_assertions)
+
+    @property
+    def label(self) -> str:
+        return self.name or super().label
+
+    def _values(self) -> Tuple[Any, ...]:
+        return (self.path, self.method, self.name, self.description, self.params, self.payload,
+                self.assertions, self.negative_assertions, self.tags)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "method": self.method.upper(),
+            "path": self.path,
+            "params": list(self.params),
+            "payload": copy_payload(self.payload),
+            "positive_assertions": list(self.assertions),
+            "negative_assertions": list(self.negative_assertions),
+            "tags": list(self.tags)
+        }
+
+
+class NegativeTestCase(TestCase):
+    """
+    A NegativeTestGenerator test case. The test cases of one operation share
+    its summary, parameters, responses and assertions; payload and
+    violations are their own. Hand-written cases may leave both None.
+    """
+
+    __slots__ = ("summary", "parameters", "responses", "payload", "violations")
+    kind = "negative"
+
+    def __init__(self, path: str, method: str, summary: str = "", parameters: Iterable[Dict[str, Any]] = (),
+                 responses: Optional[Dict[str, Any]] = None, assertions: Iterable[Dict[str, Any]] = (),
+                 payload: Any = None, violations: Optional[list] = None, tags: Iterable[str] = ()):
+        super().__init__(path, method, assertions, tags)
+        self.summary = summary
+        self.parameters = parameters if isinstance(parameters, tuple) else tuple(parameters)  # all parameters
+        self.responses = responses if responses is not None else {}
+        self.payload = payload
+        self.violations = violations
+
+    @property
+    def label(self) -> str:
+        return self.summary or super().label
+
+    @property
+    def executable(self) -> bool:
+        # Generated cases with no violations (nothing in the request to violate) carry a valid request
+        return self.violations != []
+
+    def _values(self) -> Tuple[Any, ...]:
+        return (self.path, self.method, self.summary, self.parameters, self.responses, self.assertions,
+                self.payload, self.violations, self.tags)
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Tags are not part of the dict form of negative cases; exporters read the attribute
+        data = {
+            "path": self.path,
+            "operation": self.method,
+            "parameters": list(self.parameters),
+            "responses": self.responses,
+            "summary": self.summary,
+            "assertions": list(self.assertions)
+        }
+        if self.payload is not None or self.violations is not None:
+            data["request_payload"] = copy_payload(self.payload)
+            data["violations"] = copy_payload(self.violations)  # Descriptions are shared between cases
+        return data
+
+
+def test_case_from_dict(data: Dict[str, Any]) -> TestCase:
+    """
+    Builds the test case of a to_dict() result, e.g. one read back from a
+    JSON export or fingerprint manifest. Keys outside the dict form of
+    either kind are dropped.
+    """
+    if "positive_assertions" in data:
+        return PositiveTestCase(
+            data.get("path", ""), data.get("method", "get"), data.get("name", ""), data.get("description", ""),
+            data.get("params") or (), data.get("payload"), data.get("positive_assertions") or (),
+            data.get("negative_assertions") or (), data.get("tags") or ()
+        )
+    return NegativeTestCase(
+        data.get("path", ""), data.get("operation") or data.get("method") or "get", data.get("summary", ""),
+        data.get("parameters") or (), data.get("responses"), data.get("assertions") or (),
+        data.get("request_payload"), data.get("violations"), data.get("tags") or ()
+    )
+
+
+def as_test_case(case: Union[TestCase, Dict[str, Any]]) -> TestCase:
+    """
+    The case itself, or the TestCase of a test case dict.
+    """
+    return case if isinstance(case, TestCase) else test_case_from_dict(case)
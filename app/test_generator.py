@@ -1,84 +1,236 @@
-from typing import List, Dict, Any
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from app.swagger_loader import SwaggerLoader
 from app.payload_builder import generate_payload
-from app.param_extractor import get_query_params
 from app.assertion_logic import build_positive_assertions, build_negative_assertions
 from app.utils import sanitize_test_case_name
+from app.ref_resolver import materialize
 from app.nlp_summary import generate_test_summary
+from app.fingerprint import FingerprintManifest, OperationFingerprinter
+from app.operation_index import Operation, OperationFilter, iter_path_operations, make_filter
+from app.instrumentation import Instrumentation
+from app.test_case import PositiveTestCase, TestCase, test_case_from_dict
+
+# Path items handed to a worker process per task
+PARALLEL_CHUNK_SIZE = 32
 
 class TestGenerator:
-    def __init__(self, spec_input: Any, use_nlp_summary: bool = False, use_premium_nlp: bool = False):
+    def __init__(self, spec_input: Any, use_nlp_summary: bool = False, use_premium_nlp: bool = False,
+                 lazy: bool = False, stream: bool = False, workers: int = 1,
+                 selection: Optional[OperationFilter] = None, instrumentation: Optional[Instrumentation] = None):
         """
         Initializes the TestGenerator with the provided OpenAPI spec input.
-        Accepts dict, URL, or file path.
+        Accepts dict, URL, file path, file-like object or a SwaggerLoader.
+        With lazy=True, $refs are resolved on demand and only for the
+        operations that are generated; with stream=True, path items are read
+        from the source one at a time (see SwaggerLoader). With workers > 1,
+        operations are generated in a process pool of that size. Only
+        operations matching selection (see select()) are generated. Timings
+        and counters go to instrumentation, by default the loader's (the
+        process-wide metrics unless the loader was given its own).
         """
-        self.swagger_loader = SwaggerLoader(spec_input)
+        if isinstance(spec_input, SwaggerLoader):
+            self.swagger_loader = spec_input
+        else:
+            self.swagger_loader = SwaggerLoader(spec_input, lazy=lazy, stream=stream, instrumentation=instrumentation)
+        self.metrics = instrumentation or self.swagger_loader.metrics
         self.spec = self.swagger_loader.spec
         self.paths = self.swagger_loader.get_paths()
         self.use_nlp_summary = use_nlp_summary
         self.use_premium_nlp = use_premium_nlp
+        self.workers = workers
+        self.selection = selection
+
+    def select(self, tags=None, paths=None, methods=None, operation_ids=None, deprecated=None) -> "TestGenerator":
+        """
+        Restricts generation to the matching operations (see
+        app.operation_index.OperationFilter); no criteria selects everything.
+        Unselected operations are skipped before any payload, assertion or
+        NLP work.
+        """
+        self.selection = make_filter(tags, paths, methods, operation_ids, deprecated)
+        return self
+
+    def generate_test_cases(self) -> List[TestCase]:
+        return list(self.iter_test_cases())
+
+    def iter_test_cases(self) -> Iterator[TestCase]:
+        """
+        Yields test cases one at a time, in the same order as generate_test_cases().
+        """
+        if self.workers > 1:
+            yield from self._iter_test_cases_parallel()
+            return
 
-    def generate_test_cases(self) -> List[Dict[str, Any]]:
+        for op in self.swagger_loader.iter_operations(self.selection):
+            yield self.build_test_case(op)
+
+    def generate_incremental(self, manifest_path: str) -> List[TestCase]:
+        """
+        Like generate_test_cases(), but reuses the test cases stored in the
+        fingerprint manifest at manifest_path for every operation whose
+        fingerprint (the operation plus all components it references) is
+        unchanged. Only changed or new operations are generated; removed ones
+        are dropped. The manifest is rewritten and the counts are left in
+        self.incremental_stats.
+        """
+        options = {
+            "generator": "positive",
+            "use_nlp_summary": self.use_nlp_summary,
+            "use_premium_nlp": self.use_premium_nlp
+        }
+        manifest = FingerprintManifest(manifest_path, options)
+        fingerprinter = OperationFingerprinter(self.swagger_loader.resolver)
         test_cases = []
 
-        for path, methods in self.paths.items():
-            for method, operation in methods.items():
-                if method.lower() not in ["get", "post", "put", "delete", "patch"]:
-                    continue  # Skip unsupported methods
+        for op in self.swagger_loader.iter_operations(self.selection):
+            fingerprint = fingerprinter.fingerprint(op.path, op.method, op.raw, op.raw_path_item)
+            cases = manifest.reuse(op.key, fingerprint)
+            reused = cases is not None
+            if reused:
+                cases = [test_case_from_dict(case) for case in cases]
+            else:
+                cases = [self.build_test_case(op)]
 
-                operation_id = operation.get("operationId", f"{method}_{path}")
-                summary = operation.get("summary", f"{method.upper()} {path}")
+            manifest.record(op.key, fingerprint, cases, reused)
+            test_cases.extend(cases)
 
-                # Request payload schema
-                request_body_schema = (
-                    operation.get("requestBody", {})
-                    .get("content", {})
-                    .get("application/json", {})
-                    .get("schema", {})
-                )
-                request_payload = generate_payload(request_body_schema, self.spec) if request_body_schema else {}
-
-                # Extract query/path parameters
-                params = get_query_params(operation)
-
-                # Success response schema (200, 201, or default)
-                responses = operation.get("responses", {})
-                success_response = responses.get("200") or responses.get("201") or responses.get("default")
-                response_schema = (
-                    success_response.get("content", {})
-                    .get("application/json", {})
-                    .get("schema", {})
-                    if success_response else {}
+        manifest.save()
+        self.incremental_stats = manifest.stats()
+        return test_cases
+
+    def build_test_case(self, op: Operation) -> PositiveTestCase:
+        """
+        Builds the test case for a single indexed operation.
+        """
+        self.metrics.count("positive_cases")
+        path, method, operation = op.path, op.method, op.operation
+        operation_id = operation.get("operationId", f"{method}_{path}")
+        summary = operation.get("summary", f"{method.upper()} {path}")
+
+        # Request payload schema
+        request_body_schema = (
+            operation.get("requestBody", {})
+            .get("content", {})
+            .get("application/json", {})
+            .get("schema", {})
+        )
+        with self.metrics.stage("payload_build"):
+            request_payload = generate_payload(request_body_schema, self.spec, shared=True) if request_body_schema else {}
+
+        # Query parameters (path-level ones included)
+        params = materialize(op.params("query"))
+
+        # Success response schema (200, 201, another 2xx, or default) and the status it is expected with
+        responses = {str(code): response for code, response in operation.get("responses", {}).items()}
+        success_code = next(
+            (code for code in ["200", "201", *responses] if code.startswith("2") and responses.get(code)),
+            "default"
+        )
+        success_response = responses.get(success_code)
+        expected_status = int(success_code) if success_code.isdigit() else "2xx"
+        response_schema = (
+            success_response.get("content", {})
+            .get("application/json", {})
+            .get("schema", {})
+            if success_response else {}
+        )
+
+        # Generate assertions
+        with self.metrics.stage("assertion_build"):
+            positive_asserts = build_positive_assertions(materialize(response_schema), self.spec, expected_status)
+            negative_asserts = build_negative_assertions(operation)
+
+        # NLP-based test case summary (if enabled)
+        if self.use_nlp_summary:
+            with self.metrics.stage("summary"):
+                test_name = generate_test_summary(
+                    summary=operation.get("summary", f"{method.upper()} {path}"),
+                    path=path,
+                    operation=method,
+                    premium=self.use_premium_nlp,
+                    instrumentation=self.metrics
                 )
+        else:
+            test_name = f"{method.upper()} {path}"
 
-                # Generate assertions
-                positive_asserts = build_positive_assertions(response_schema, self.spec)
-                negative_asserts = build_negative_assertions(operation)
-
-                # NLP-based test case summary (if enabled)
-                if self.use_nlp_summary:
-                    test_name = generate_test_summary(
-                        summary=operation.get("summary", f"{method.upper()} {path}"),
-                        path=path,
-                        operation=method,
-                        premium=self.use_premium_nlp
-                    )
-                else:
-                    test_name = f"{method.upper()} {path}"
-
-                # Final structured test case
-                test_case = {
-                    "name": sanitize_test_case_name(test_name),
-                    "description": test_name,
-                    "method": method.upper(),
-                    "path": path,
-                    "params": params,
-                    "payload": request_payload,
-                    "positive_assertions": positive_asserts,
-                    "negative_assertions": negative_asserts,
-                    "tags": operation.get("tags", [])
-                }
-
-                test_cases.append(test_case)
+        # Final structured test case; the payload and schemas are shared, not copied (see app.test_case)
+        return PositiveTestCase(
+            path, method,
+            name=sanitize_test_case_name(test_name),
+            description=test_name,
+            params=params,
+            payload=request_payload,
+            assertions=positive_asserts,
+            negative_assertions=negative_asserts,
+            tags=op.tags
+        )
 
-        return test_cases
+    def _iter_test_cases_parallel(self) -> Iterator[TestCase]:
+        """
+        Shards path items across a process pool and yields the results in
+        serial order. Each worker receives the raw spec once, through the pool
+        initializer, and builds its own resolver from it; tasks only carry
+        path names (or, when streaming, the raw path items being read).
+        """
+        loader = self.swagger_loader
+        options = {
+            "use_nlp_summary": self.use_nlp_summary,
+            "use_premium_nlp": self.use_premium_nlp,
+            "lazy": loader.lazy,
+            "selection": self.selection
+        }
+
+        if loader.stream is not None:
+            items = loader.stream.iter_paths()
+            if self.selection is not None:
+                items = ((path, item) for path, item in items if self.selection.matches_path_item(path, item))
+        else:
+            # Only paths with a selected operation are sent to the workers
+            paths = dict.fromkeys(op.path for op in loader.iter_operations(self.selection))
+            items = ((path, None) for path in paths)
+
+        pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(loader.raw_spec, options))
+        try:
+            # Keep a bounded window of tasks in flight so streamed specs stay streamed
+            pending = deque()
+            for chunk in _chunked(items, PARALLEL_CHUNK_SIZE):
+                pending.append(pool.submit(_generate_chunk, chunk))
+                if len(pending) >= self.workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+
+# Per-process generator built once by the pool initializer
+_worker_generator: Optional[TestGenerator] = None
+
+def _init_worker(raw_spec: Dict[str, Any], options: Dict[str, Any]) -> None:
+    global _worker_generator
+    _worker_generator = TestGenerator(raw_spec, **options)
+
+def _generate_chunk(chunk: List[Tuple[str, Optional[Dict[str, Any]]]]) -> List[TestCase]:
+    generator = _worker_generator
+    loader = generator.swagger_loader
+    test_cases = []
+    for path, path_item in chunk:
+        if path_item is None:
+            operations = loader.operation_index().for_path(path)
+        else:
+            operations = iter_path_operations(path, loader.resolve_path_item(path_item), path_item)
+        if generator.selection is not None:
+            operations = generator.selection.apply(operations)
+        test_cases.extend(generator.build_test_case(op) for op in operations)
+    return test_cases
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
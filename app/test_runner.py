@@ -0,0 +1,306 @@
+# app/test_runner.py
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+from urllib.parse import quote, urlencode
+
+from app.assertion_logic import get_validator
+from app.http_client import AsyncHttpClient, HttpResponse
+from app.instrumentation import metrics
+from app.operation_index import OperationIndex
+from app.payload_builder import generate_payload
+from app.test_case import TestCase, as_test_case
+
+# Methods whose test cases send their payload as a JSON body
+BODY_METHODS = ("post", "put", "patch")
+
+# Schema violations reported per failing response
+MAX_SCHEMA_ERRORS = 3
+
+
+class CaseResult(NamedTuple):
+    index: int                 # position of the test case in the input
+    name: str
+    kind: str                  # "positive" or "negative"
+    method: str
+    url: str
+    status: Optional[int]
+    seconds: float
+    passed: bool
+    failures: List[str]
+    error: Optional[str] = None
+    skipped: bool = False      # not run, see TestCase.executable
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class PreparedRequest(NamedTuple):
+    method: str
+    url: str
+    headers: Dict[str, str]
+    json_body: Any
+    assertions: List[Dict[str, Any]]
+    kind: str
+    name: str
+
+
+def _sample_value(param: Dict[str, Any], spec: Optional[Dict[str, Any]] = None) -> Any:
+    # The parameter's example, else a valid sample of its schema (see payload_builder.generate_payload)
+    if "example" in param:
+        return param["example"]
+    schema = param.get("schema") or {}
+    if not schema or ("$ref" in schema and spec is None):
+        return "test"
+    value = generate_payload(schema, spec or {}, shared=True)
+    return "test" if value is None else value
+
+
+def _format_value(value: Any) -> str:
+    # Parameter values as sent in paths, query strings and headers (booleans as JSON spells them)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple)):
+        return ",".join(_format_value(v) for v in value)
+    return str(value)
+
+
+def _fill_path(path: str, params: Iterable[Dict[str, Any]], spec: Optional[Dict[str, Any]] = None) -> str:
+    values = {p.get("name"): _sample_value(p, spec) for p in params if p.get("in") == "path"}
+    for name, value in values.items():
+        path = path.replace("{" + str(name) + "}", quote(_format_value(value), safe=""))
+    # Undeclared template segments still need a value
+    while "{" in path and "}" in path[path.index("{"):]:
+        start = path.index("{")
+        path = path[:start] + "test" + path[path.index("}", start) + 1:]
+    return path
+
+
+def prepare_request(case: Union[TestCase, Dict[str, Any]], base_url: str,
+                    headers: Optional[Dict[str, str]] = None, index: Optional[OperationIndex] = None,
+                    spec: Optional[Dict[str, Any]] = None) -> PreparedRequest:
+    """
+    Turns a TestGenerator or NegativeTestGenerator test case (or its dict
+    form) into a request. Path parameters and required query/header
+    parameters get sample values of their schema ($refs resolved against
+    spec). Positive test cases only carry their query parameters, so their
+    path and header parameters come from the case's operation in index.
+    """
+    case = as_test_case(case)
+    method = case.method
+    if case.kind == "positive":
+        indexed = index.get(case.path, method) if index is not None else None
+        params = indexed.parameters if indexed is not None else case.params
+        body = (case.payload or None) if method in BODY_METHODS else None
+    else:
+        params = case.parameters
+        body = case.payload
+        if method not in BODY_METHODS and not case.violations:
+            body = None  # Only the placeholder payload; nothing to send
+
+    path = _fill_path(case.path, params, spec)
+    query = [
+        (p.get("name"), _format_value(_sample_value(p, spec)))
+        for p in params if p.get("in") == "query" and p.get("required")
+    ]
+    url = base_url.rstrip("/") + path + ("?" + urlencode(query) if query else "")
+
+    request_headers = {
+        p.get("name"): _format_value(_sample_value(p, spec))
+        for p in params if p.get("in") == "header" and p.get("required")
+    }
+    request_headers.update(headers or {})
+    return PreparedRequest(method.upper(), url, request_headers, body, list(case.assertions), case.kind, case.label)
+
+
+def _check_status_code(assertion: Dict[str, Any], response: HttpResponse, spec: Optional[Dict[str, Any]]) -> Optional[str]:
+    expected = assertion.get("expected")
+    if isinstance(expected, str) and expected.lower().endswith("xx"):
+        # A status class such as "2xx"
+        matches = str(response.status // 100) == expected[0]
+    else:
+        matches = str(response.status) == str(expected)
+    if not matches:
+        return f"status_code: expected {expected}, got {response.status}"
+    return None
+
+
+def _check_schema(assertion: Dict[str, Any], response: HttpResponse, spec: Optional[Dict[str, Any]]) -> Optional[str]:
+    if response.status // 100 != 2:
+        return None  # The schema describes the success response; the status check reports the rest
+    try:
+        body = response.json()
+    except ValueError:
+        return "schema: response body is not JSON"
+    # Compiled once per schema and reused for every response (see assertion_logic.validator_cache)
+    violations = get_validator(assertion.get("expected"), spec).errors(body, MAX_SCHEMA_ERRORS)
+    if violations:
+        return "schema: " + "; ".join(str(v) for v in violations)
+    return None
+
+
+# Assertion type -> check returning a failure message or None; unknown types are skipped
+ASSERTION_CHECKS: Dict[str, Callable[[Dict[str, Any], HttpResponse, Optional[Dict[str, Any]]], Optional[str]]] = {
+    "status_code": _check_status_code,
+    "schema": _check_schema
+}
+
+
+def evaluate_assertions(assertions: List[Dict[str, Any]], response: HttpResponse, kind: str,
+                        spec: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    Failure messages for the assertions that do not hold. Without any
+    assertion, a positive case expects a 2xx and a negative case a 4xx status.
+    Schema $refs are resolved against spec.
+    """
+    if not assertions:
+        expected = 2 if kind == "positive" else 4
+        if response.status // 100 != expected:
+            return [f"status_code: expected {expected}xx, got {response.status}"]
+        return []
+
+    failures = []
+    for assertion in assertions:
+        check = ASSERTION_CHECKS.get(assertion.get("type"))
+        if check is not None:
+            failure = check(assertion, response, spec)
+            if failure:
+                failures.append(failure)
+    return failures
+
+
+def _error_message(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+
+
+class _RateLimiter:
+    """
+    Spaces request starts at least 1/rate seconds apart.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.interval
+
+
+class TestRunner:
+    """
+    Executes generated test cases against a base URL with asyncio.
+
+    At most concurrency requests are in flight, at most
+    max_connections_per_host of them to one host over pooled keep-alive
+    connections, and with rate_limit set, no more than that many requests
+    start per second. Results are yielded as requests complete. spec is
+    the spec the test cases were generated from, used to resolve $refs
+    left in schema assertions (cyclic schemas) and parameter schemas;
+    index is its OperationIndex, which supplies the path and header
+    parameters of positive test cases (see prepare_request).
+    """
+
+    def __init__(self, base_url: str, concurrency: int = 32, rate_limit: Optional[float] = None,
+                 max_connections_per_host: int = 16, timeout: float = 30.0,
+                 headers: Optional[Dict[str, str]] = None, spec: Optional[Dict[str, Any]] = None,
+                 index: Optional[OperationIndex] = None):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.spec = spec
+        self.index = index
+
+    async def iter_results_async(self, test_cases: Iterable[TestCase]) -> AsyncIterator[CaseResult]:
+        """
+        Yields a CaseResult per test case in completion order (see
+        CaseResult.index). Test cases are read lazily, so generator output
+        can be run while it is still being produced. Test cases that are
+        not executable (negative cases with nothing to violate) are not
+        sent and come back skipped.
+        """
+        limiter = _RateLimiter(self.rate_limit) if self.rate_limit else None
+        async with AsyncHttpClient(max_connections_per_host=self.max_connections_per_host,
+                                   timeout=self.timeout) as client:
+            pending = set()
+            for index, case in enumerate(test_cases):
+                if len(pending) >= self.concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+                pending.add(asyncio.ensure_future(self._run_case(client, limiter, index, case)))
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+
+    async def _run_case(self, client: AsyncHttpClient, limiter: Optional[_RateLimiter],
+                        index: int, case: Union[TestCase, Dict[str, Any]]) -> CaseResult:
+        try:
+            case = as_test_case(case)
+            if not case.executable:
+                return CaseResult(index, case.label, case.kind, case.method.upper(), "",
+                                  None, 0.0, False, [], skipped=True)
+            request = prepare_request(case, self.base_url, self.headers, self.index, self.spec)
+        except Exception as e:
+            if isinstance(case, TestCase):
+                return CaseResult(index, case.label, case.kind, case.method.upper(), "",
+                                  None, 0.0, False, [], _error_message(e))
+            return CaseResult(index, "", "", "", "", None, 0.0, False, [], _error_message(e))
+
+        if limiter is not None:
+            await limiter.acquire()
+
+        start = time.perf_counter()
+        try:
+            response = await client.request(request.method, request.url, headers=request.headers,
+                                            json_body=request.json_body)
+        except Exception as e:
+            elapsed = time.perf_counter() - start
+            return CaseResult(index, request.name, request.kind, request.method, request.url,
+                              None, elapsed, False, [], _error_message(e))
+
+        elapsed = time.perf_counter() - start
+        failures = evaluate_assertions(request.assertions, response, request.kind, self.spec)
+        return CaseResult(index, request.name, request.kind, request.method, request.url,
+                          response.status, elapsed, not failures, failures)
+
+    async def run_async(self, test_cases: Iterable[TestCase],
+                        sink: Optional[Callable[[CaseResult], None]] = None) -> Dict[str, Any]:
+        summary = {"total": 0, "passed": 0, "failed": 0, "errors": 0, "skipped": 0}
+        start = time.perf_counter()
+        with metrics.stage("run"):
+            async for result in self.iter_results_async(test_cases):
+                summary["total"] += 1
+                if result.skipped:
+                    summary["skipped"] += 1
+                elif result.error is not None:
+                    summary["errors"] += 1
+                elif result.passed:
+                    summary["passed"] += 1
+                else:
+                    summary["failed"] += 1
+                if sink is not None:
+                    sink(result)
+        seconds = time.perf_counter() - start
+        summary["seconds"] = round(seconds, 3)
+        summary["requests_per_second"] = round(summary["total"] / seconds, 1) if seconds else 0.0
+        return summary
+
+    def run(self, test_cases: Iterable[TestCase],
+            sink: Optional[Callable[[CaseResult], None]] = None) -> Dict[str, Any]:
+        """
+        Runs every test case, passing each result to sink as it completes
+        (e.g. to write JSON Lines), and returns the pass/fail summary.
+        """
+        return asyncio.run(self.run_async(test_cases, sink))
@@ -1,25 +1,27 @@
 # app/utils.py
 
 import re
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set
+from app.ref_resolver import split_pointer
 
-def resolve_ref(ref: str, spec: Dict[str, Any]) -> Dict[str, Any]:
+def resolve_ref(ref: str, spec: Dict[str, Any], _seen: Optional[Set[str]] = None) -> Dict[str, Any]:
     """
     Recursively resolve a $ref in the OpenAPI spec.
     """
-    if not ref.startswith("#/"):
-        raise ValueError(f"Unsupported ref format: {ref}")
-    
-    parts = ref.strip("#/").split("/")
+    parts = split_pointer(ref)
     result = spec
     for part in parts:
         result = result.get(part)
         if result is None:
             raise KeyError(f"Unable to resolve reference: {ref}")
-    
+
     if "$ref" in result:
-        return resolve_ref(result["$ref"], spec)
-    
+        seen = _seen if _seen is not None else set()
+        if ref in seen:
+            raise ValueError(f"Circular reference: {ref}")
+        seen.add(ref)
+        return resolve_ref(result["$ref"], spec, seen)
+
     return result
 
 
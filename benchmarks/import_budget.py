@@ -0,0 +1,105 @@
+# benchmarks/import_budget.py
+
+"""
+Import-time budget check for the basic CLI path.
+
+Each entry point is imported in a fresh interpreter (best of --repeat
+runs, measured with -X importtime) and must stay within --budget-ms without
+loading any optional heavy dependency: NLP engines, jsonschema and
+requests are only imported once they are actually used. The cold start of
+`python run.py --help` must stay within --startup-budget-ms. Exits with
+status 1 when any check fails.
+
+    python benchmarks/import_budget.py
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import List, NamedTuple, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+# Modules the basic path imports
+ENTRY_POINTS = ("app.test_generator", "app.negative_test_generator", "app.exporter", "app.test_runner", "app.batch", "run")
+
+# Optional dependencies that must only load once their feature is used
+HEAVY_MODULES = ("spacy", "transformers", "torch", "openai", "jsonschema", "requests", "streamlit", "pandas")
+
+
+class ImportResult(NamedTuple):
+    module: str
+    milliseconds: float
+    heavy: Tuple[str, ...]      # heavy modules loaded by the import
+
+
+def measure_import(module: str, repeat: int) -> ImportResult:
+    probe = (
+        f"import sys; import {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    best = float("inf")
+    heavy: Tuple[str, ...] = ()
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True)
+        # Lines are "import time: self [us] | cumulative | imported package"; the module's own line is the last match
+        cumulative = [
+            int(line.split("|")[1])
+            for line in proc.stderr.splitlines()
+            if line.startswith("import time:") and line.split("|")[-1].strip() == module
+        ]
+        best = min(best, cumulative[-1] / 1000 if cumulative else 0.0)
+        heavy = tuple(name for name in proc.stdout.strip().split(",") if name)
+    return ImportResult(module, best, heavy)
+
+
+def measure_startup(repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "run.py", "--help"], cwd=ROOT_DIR, capture_output=True, check=True)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check import and startup time of the basic CLI path.")
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="Import budget per entry point (default: 300)")
+    parser.add_argument("--startup-budget-ms", type=float, default=1000.0,
+                        help="Budget for `python run.py --help`, interpreter start included (default: 1000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is kept (default: 3)")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    failures = []
+
+    print(f"{'entry point':<32}{'import ms':>10}  heavy modules")
+    for result in (measure_import(module, args.repeat) for module in ENTRY_POINTS):
+        print(f"{result.module:<32}{result.milliseconds:>10.1f}  {', '.join(result.heavy) or '-'}")
+        if result.milliseconds > args.budget_ms:
+            failures.append(f"{result.module}: {result.milliseconds:.1f} ms > budget {args.budget_ms:.0f} ms")
+        if result.heavy:
+            failures.append(f"{result.module}: imports {', '.join(result.heavy)} eagerly")
+
+    startup = measure_startup(args.repeat)
+    print(f"{'python run.py --help':<32}{startup:>10.1f}")
+    if startup > args.startup_budget_ms:
+        failures.append(f"run.py --help: {startup:.1f} ms > budget {args.startup_budget_ms:.0f} ms")
+
+    if failures:
+        print("\n[FAIL] Import budget exceeded:")
+        for message in failures:
+            print(f"  - {message}")
+        return 1
+    print("\n[OK] Within the import budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
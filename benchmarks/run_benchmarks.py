@@ -0,0 +1,264 @@
+# benchmarks/run_benchmarks.py
+
+"""
+Benchmark suite over synthetic specs.
+
+Each benchmark reports throughput (items per second, best of --repeat runs)
+and peak traced memory (one extra run under tracemalloc), and is compared
+with benchmarks/baselines.json. Benchmarks more than --tolerance slower or
+larger than their baseline are reported; with an explicit --baseline file
+the script then exits with status 1.
+runner_loopback runs the generated cases with TestRunner against a local
+MockServer (app.mock_server) for the same spec.
+
+    python benchmarks/run_benchmarks.py --shape medium
+    python benchmarks/run_benchmarks.py --shape medium --update-baseline
+
+Baselines are machine specific, so the committed file only warns: record
+one on the machine that runs the comparison and gate on it with
+--baseline.
+
+    python benchmarks/run_benchmarks.py --baseline local_baselines.json --update-baseline
+    python benchmarks/run_benchmarks.py --baseline local_baselines.json
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+for _dir in (ROOT_DIR, BENCH_DIR):
+    if _dir not in sys.path:
+        sys.path.insert(0, _dir)
+
+from synthetic_spec import SHAPES, count_operations, generate_spec, write_spec
+from app.swagger_loader import SwaggerLoader
+from app.utils import resolve_ref
+from app.payload_builder import generate_payload, template_cache
+from app.nlp_summary import generate_test_summary
+from app.test_generator import TestGenerator
+from app.negative_test_generator import NegativeTestGenerator
+from app.exporter import write_csv, write_postman_collection
+from app.mock_server import MockServer
+from app.test_runner import TestRunner
+from app.instrumentation import metrics
+
+DEFAULT_BASELINES = os.path.join(BENCH_DIR, "baselines.json")
+
+# Minimum timed duration of one repetition
+MIN_SECONDS = 0.2
+
+
+class Benchmark(NamedTuple):
+    name: str
+    unit: str
+    setup: Callable[[], Any]        # runs untimed before every repetition
+    run: Callable[[Any], int]       # returns the number of items processed
+
+
+class Result(NamedTuple):
+    name: str
+    unit: str
+    items: int
+    seconds: float
+    throughput: float
+    peak_kib: float
+
+
+def build_benchmarks(spec_file: str, server: MockServer) -> List[Benchmark]:
+    loader = SwaggerLoader(spec_file)
+    raw = loader.raw_spec
+    refs = [f"#/components/schemas/{name}" for name in raw.get("components", {}).get("schemas", {})]
+    operations = [
+        (path, method, op)
+        for path, item in loader.get_paths().items()
+        for method, op in item.items()
+        if method != "parameters"
+    ]
+    request_schemas = [
+        op["requestBody"]["content"]["application/json"]["schema"]
+        for _, _, op in operations if "requestBody" in op
+    ]
+    positive_cases = TestGenerator(loader).generate_test_cases()
+    negative_cases = NegativeTestGenerator(loader).generate_negative_tests()
+
+    def load(_):
+        SwaggerLoader(spec_file)
+        return len(operations)
+
+    def resolve_all(_):
+        for ref in refs:
+            resolve_ref(ref, raw)
+        return len(refs)
+
+    def build_payloads(_):
+        for schema in request_schemas:
+            generate_payload(schema, loader.spec)
+        return len(request_schemas)
+
+    def summarize(_):
+        for path, method, op in operations:
+            generate_test_summary(op.get("summary", ""), path, method, engine="basic")
+        return len(operations)
+
+    def export(writer, cases):
+        def run(_):
+            writer(cases, io.StringIO())
+            return len(cases)
+        return run
+
+    def run_loopback(_):
+        # Positive and negative cases against the mock server of the same spec
+        cases = positive_cases + negative_cases
+        TestRunner(server.url, concurrency=64, spec=loader.spec, index=loader.operation_index()).run(cases)
+        return len(cases)
+
+    return [
+        Benchmark("load_spec", "ops", lambda: None, load),
+        Benchmark("resolve_ref", "refs", lambda: None, resolve_all),
+        Benchmark("generate_payload_cold", "payloads", template_cache.clear, build_payloads),
+        Benchmark("generate_payload_warm", "payloads", lambda: None, build_payloads),
+        Benchmark("summary_basic", "ops", lambda: None, summarize),
+        Benchmark("positive_generator", "cases", template_cache.clear,
+                  lambda _: len(TestGenerator(loader).generate_test_cases())),
+        Benchmark("negative_generator", "cases", template_cache.clear,
+                  lambda _: len(NegativeTestGenerator(loader).generate_negative_tests())),
+        Benchmark("export_csv", "cases", lambda: None, export(write_csv, negative_cases)),
+        Benchmark("export_postman", "cases", lambda: None, export(write_postman_collection, positive_cases + negative_cases)),
+        Benchmark("runner_loopback", "reqs", lambda: None, run_loopback)
+    ]
+
+
+def measure(benchmark: Benchmark, repeat: int) -> Result:
+    best = float("inf")
+    items = 0
+    for _ in range(repeat):
+        # Fast benchmarks are looped until MIN_SECONDS so the timer noise stays small
+        elapsed, loops = 0.0, 0
+        while elapsed < MIN_SECONDS:
+            state = benchmark.setup()
+            start = time.perf_counter()
+            items = benchmark.run(state)
+            elapsed += time.perf_counter() - start
+            loops += 1
+        best = min(best, elapsed / loops)
+
+    # Memory is traced in a separate run since tracing skews the timings
+    state = benchmark.setup()
+    tracemalloc.start()
+    try:
+        benchmark.run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(benchmark.name, benchmark.unit, items, best, items / best if best else 0.0, peak / 1024)
+
+
+def compare(results: List[Result], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """
+    Returns a message for every result that regressed beyond tolerance.
+    """
+    regressions = []
+    for result in results:
+        expected = baseline.get(result.name)
+        if not expected:
+            continue
+        if result.throughput < expected["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: throughput {result.throughput:.1f} {result.unit}/s "
+                f"< baseline {expected['throughput']:.1f} {result.unit}/s"
+            )
+        if result.peak_kib > expected["peak_kib"] * (1 + tolerance):
+            regressions.append(
+                f"{result.name}: peak memory {result.peak_kib:.0f} KiB > baseline {expected['peak_kib']:.0f} KiB"
+            )
+    return regressions
+
+
+def load_baselines(filename: str) -> Dict[str, Any]:
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baselines(filename: str, baselines: Dict[str, Any]) -> None:
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def run_suite(shape_name: str, fmt: str, repeat: int) -> Tuple[int, List[Result]]:
+    spec = generate_spec(SHAPES[shape_name])
+    with tempfile.TemporaryDirectory() as tmp:
+        spec_file = os.path.join(tmp, f"spec.{fmt}")
+        write_spec(spec, spec_file)
+        metrics.enabled = False  # Measure the pipeline, not the bookkeeping
+        server = MockServer(spec_file).start_in_thread()
+        try:
+            results = [measure(b, repeat) for b in build_benchmarks(spec_file, server)]
+        finally:
+            server.stop()
+            metrics.enabled = True
+    return count_operations(spec), results
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the test case pipeline on synthetic specs.")
+    parser.add_argument("--shape", choices=sorted(SHAPES), default="small", help="Spec shape (default: small)")
+    parser.add_argument("--format", choices=("json", "yaml"), default="json", help="Spec file format (default: json)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark; the best is kept (default: 3)")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="Allowed relative regression before failing (default: 0.3)")
+    parser.add_argument("--baseline",
+                        help="Baseline file; regressions against it fail the run "
+                             "(default: only warn against benchmarks/baselines.json)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    operations, results = run_suite(args.shape, args.format, args.repeat)
+    key = f"{args.shape}-{args.format}"
+
+    print(f"Shape {key}: {operations} operations")
+    print(f"{'benchmark':<24}{'items':>8}{'seconds':>10}{'throughput':>16}{'peak KiB':>12}")
+    for r in results:
+        print(f"{r.name:<24}{r.items:>8}{r.seconds:>10.4f}{r.throughput:>12.1f} {r.unit:<3}/s{r.peak_kib:>10.0f}")
+
+    baseline_file = args.baseline or DEFAULT_BASELINES
+    baselines = load_baselines(baseline_file)
+    if args.update_baseline:
+        baselines[key] = {r.name: {"throughput": round(r.throughput, 1), "peak_kib": round(r.peak_kib, 1)} for r in results}
+        save_baselines(baseline_file, baselines)
+        print(f"\n[INFO] Baseline {key} written to {baseline_file}")
+        return 0
+
+    if key not in baselines:
+        print(f"\n[WARN] No baseline for {key}; run with --update-baseline to record one.")
+        return 0
+
+    regressions = compare(results, baselines[key], args.tolerance)
+    if regressions:
+        # The default baselines were recorded on another machine, so they cannot fail the run
+        print(f"\n[{'FAIL' if args.baseline else 'WARN'}] Regressions against baseline:")
+        for message in regressions:
+            print(f"  - {message}")
+        if not args.baseline:
+            print("  (pass --baseline with a baseline recorded on this machine to fail on regressions)")
+        return 1 if args.baseline else 0
+    print(f"\n[OK] Within {args.tolerance:.0%} of baseline {key}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+# benchmarks/synthetic_spec.py
+
+"""
+Deterministic synthetic OpenAPI 3 specs for benchmarking.
+
+The same SpecShape and seed always produce the same spec, so timings taken
+on different commits are comparable. Run directly to write one to disk:
+
+    python benchmarks/synthetic_spec.py out.yaml --paths 500 --depth 4 --cycles 3
+"""
+
+import argparse
+import json
+import random
+from typing import Any, Dict, List, NamedTuple
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+METHODS = ("get", "post", "put", "patch", "delete")
+
+# Leaf property schemas, picked in rotation by the seeded generator
+LEAF_SCHEMAS = (
+    {"type": "string"},
+    {"type": "string", "minLength": 1, "maxLength": 64},
+    {"type": "string", "pattern": "^[a-z0-9-]+$"},
+    {"type": "string", "format": "date-time"},
+    {"type": "integer", "minimum": 0, "maximum": 1000},
+    {"type": "number"},
+    {"type": "boolean"},
+    {"type": "string", "enum": ["alpha", "beta", "gamma"]}
+)
+
+
+class SpecShape(NamedTuple):
+    paths: int = 50
+    methods: int = 3          # methods per path, taken from METHODS in order
+    schemas: int = 20         # components.schemas entries
+    depth: int = 3            # nesting of inline objects inside a schema
+    breadth: int = 6          # properties per object
+    ref_fanout: int = 2       # $ref properties per schema pointing at other schemas
+    cycles: int = 1           # schemas that reference themselves or an earlier schema
+    tags: int = 5
+    seed: int = 42
+
+
+# Named shapes used by the benchmark suite
+SHAPES = {
+    "small": SpecShape(),
+    "medium": SpecShape(paths=250, schemas=60, depth=4, breadth=8, ref_fanout=3, cycles=3),
+    "large": SpecShape(paths=1000, methods=4, schemas=200, depth=4, breadth=10, ref_fanout=4, cycles=10)
+}
+
+
+def _schema_ref(index: int) -> Dict[str, str]:
+    return {"$ref": f"#/components/schemas/Model{index}"}
+
+
+def _object_schema(rng: random.Random, shape: SpecShape, depth: int) -> Dict[str, Any]:
+    properties = {}
+    for i in range(shape.breadth):
+        if depth > 1 and i == 0:
+            properties[f"nested{depth}"] = _object_schema(rng, shape, depth - 1)
+        elif depth > 1 and i == 1:
+            properties[f"items{depth}"] = {"type": "array", "items": _object_schema(rng, shape, depth - 1), "maxItems": 10}
+        else:
+            properties[f"field{i}"] = dict(rng.choice(LEAF_SCHEMAS))
+    required = sorted(rng.sample(list(properties), k=min(2, len(properties))))
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def _component_schemas(rng: random.Random, shape: SpecShape) -> Dict[str, Any]:
+    schemas = {}
+    cyclic = set(rng.sample(range(shape.schemas), k=min(shape.cycles, shape.schemas)))
+    for index in range(shape.schemas):
+        schema = _object_schema(rng, shape, shape.depth)
+        # Forward references only, so the $ref graph is acyclic unless asked otherwise
+        later = list(range(index + 1, shape.schemas))
+        for j in rng.sample(later, k=min(shape.ref_fanout, len(later))):
+            schema["properties"][f"model{j}"] = _schema_ref(j)
+        if index in cyclic:
+            target = rng.randint(0, index)
+            schema["properties"]["parent"] = _schema_ref(target)
+        schemas[f"Model{index}"] = schema
+    return schemas
+
+
+def _operation(rng: random.Random, shape: SpecShape, path_index: int, method: str) -> Dict[str, Any]:
+    model = _schema_ref(rng.randrange(shape.schemas))
+    operation = {
+        "operationId": f"{method}Resource{path_index}",
+        "summary": f"{method.upper()} resource {path_index}",
+        "tags": [f"tag{path_index % shape.tags}"],
+        "parameters": [
+            {"name": "limit", "in": "query", "required": False, "schema": {"type": "integer", "minimum": 1, "maximum": 100}},
+            {"name": "X-Request-Id", "in": "header", "required": False, "schema": {"type": "string"}}
+        ],
+        "responses": {
+            "200": {"description": "OK", "content": {"application/json": {"schema": model}}},
+            "400": {"description": "Bad request"},
+            "404": {"description": "Not found"}
+        }
+    }
+    if method in ("post", "put", "patch"):
+        operation["requestBody"] = {
+            "required": True,
+            "content": {"application/json": {"schema": _schema_ref(rng.randrange(shape.schemas))}}
+        }
+    if method == "delete":
+        operation["responses"] = {"204": {"description": "Deleted"}, "404": {"description": "Not found"}}
+    return operation
+
+
+def generate_spec(shape: SpecShape = SpecShape()) -> Dict[str, Any]:
+    """
+    Builds an OpenAPI 3.0 spec of the given shape. Output depends only on shape.
+    """
+    rng = random.Random(shape.seed)
+    methods = METHODS[:max(1, min(shape.methods, len(METHODS)))]
+    schemas = _component_schemas(rng, shape)
+
+    paths = {}
+    for index in range(shape.paths):
+        path_item: Dict[str, Any] = {
+            "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}]
+        }
+        for method in methods:
+            path_item[method] = _operation(rng, shape, index, method)
+        paths[f"/resource{index}/{{id}}"] = path_item
+
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Synthetic API", "version": "1.0.0"},
+        "tags": [{"name": f"tag{i}"} for i in range(shape.tags)],
+        "paths": paths,
+        "components": {"schemas": schemas}
+    }
+
+
+def write_spec(spec: Dict[str, Any], filename: str) -> None:
+    """
+    Writes spec as YAML (for .yaml/.yml names, requires PyYAML) or JSON.
+    """
+    with open(filename, "w", encoding="utf-8") as f:
+        if filename.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise RuntimeError("PyYAML is required to write YAML specs")
+            yaml.safe_dump(spec, f, sort_keys=False)
+        else:
+            json.dump(spec, f, indent=2)
+
+
+def count_operations(spec: Dict[str, Any]) -> int:
+    return sum(1 for item in spec.get("paths", {}).values() for key in item if key in METHODS)
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    defaults = SpecShape()
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic OpenAPI spec.")
+    parser.add_argument("output", help="Output file (.json, .yaml or .yml)")
+    parser.add_argument("--shape", choices=sorted(SHAPES), help="Start from a named shape")
+    for field in SpecShape._fields:
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, dest=field,
+                            help=f"(default: {getattr(defaults, field)})")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    shape = SHAPES[args.shape] if args.shape else SpecShape()
+    shape = shape._replace(**{f: getattr(args, f) for f in SpecShape._fields if getattr(args, f) is not None})
+    spec = generate_spec(shape)
+    write_spec(spec, args.output)
+    print(f"[INFO] Wrote {count_operations(spec)} operations and {shape.schemas} schemas to {args.output}")
@@ -1,7 +1,12 @@
-from app.swagger_loader import load_swagger_from_url
-from app.test_generator import generate_test_cases
-from app.exporter import export_to_json, export_to_csv, export_to_postman
-import json
+import argparse
+import logging
+from app.test_generator import TestGenerator
+from app.exporter import write_csv, write_jsonl, write_postman_collection, write_postman_shards
+from app.fingerprint import manifest_path_for
+from app.instrumentation import metrics
+from app.test_runner import TestRunner
+from app.mock_server import MockServer
+from app import serialization
 
 def get_export_choice():
     print("\nChoose export format:")
@@ -9,21 +14,81 @@ def get_export_choice():
     print("2. CSV")
     print("3. Postman Collection")
     print("4. All")
-    choice = input("Enter your choice (1/2/3/4): ").strip()
+    print("5. JSON Lines")
+    print("6. Postman Collections (one folder and file set per tag)")
+    choice = input("Enter your choice (1/2/3/4/5/6): ").strip()
     return choice
 
 def get_base_url():
     return input("Enter the base URL for the Postman collection (e.g., https://petstore.swagger.io/v2): ").strip()
 
+def get_shard_limit():
+    value = input("Max items per collection file (leave blank for no limit): ").strip()
+    return int(value) if value else None
+
+def export_to_json(test_cases, filename):
+    with open(filename, "wb") as f:
+        serialization.dump(test_cases, f, pretty=True)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate API test cases from a Swagger/OpenAPI spec.",
+                                     epilog="For non-interactive runs over many specs, see: python -m app.batch --help")
+    parser.add_argument("spec", nargs="?", help="Spec URL or file path (prompted for when omitted)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for test generation (default: 1)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only regenerate operations changed since the last run (fingerprints are kept next to the JSON output)")
+    selection = parser.add_argument_group("operation selection", "Only operations matching every given filter are generated")
+    selection.add_argument("--tag", action="append", dest="tags", metavar="TAG", help="Operation tag (repeatable)")
+    selection.add_argument("--path", action="append", dest="paths", metavar="GLOB", help="Path glob, e.g. '/users/*' (repeatable)")
+    selection.add_argument("--method", action="append", dest="methods", metavar="METHOD", help="HTTP method (repeatable)")
+    selection.add_argument("--operation-id", action="append", dest="operation_ids", metavar="ID", help="operationId (repeatable)")
+    deprecated = selection.add_mutually_exclusive_group()
+    deprecated.add_argument("--skip-deprecated", action="store_const", const=False, dest="deprecated",
+                            help="Leave out deprecated operations")
+    deprecated.add_argument("--only-deprecated", action="store_const", const=True, dest="deprecated",
+                            help="Only deprecated operations")
+    runner = parser.add_argument_group("running", "Execute the generated test cases instead of exporting them")
+    runner.add_argument("--run", metavar="BASE_URL", help="Run the test cases against this base URL")
+    runner.add_argument("--mock", action="store_true",
+                        help="Run the test cases against a local mock server generated from the spec")
+    runner.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once (default: 32)")
+    runner.add_argument("--rate-limit", type=float, help="Maximum requests started per second")
+    runner.add_argument("--results", default="test_results.jsonl", help="JSON Lines results file (default: test_results.jsonl)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile generation and print per-stage timings, counters and the top cProfile entries")
+    parser.add_argument("--log-level", default="WARNING", help="Logging level, e.g. DEBUG or INFO (default: WARNING)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    swagger_url = input("Enter Swagger/OpenAPI JSON URL: ").strip()
-    swagger_data = load_swagger_from_url(swagger_url)
+    args = parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="[%(levelname)s] %(name)s: %(message)s")
+    swagger_url = args.spec or input("Enter Swagger/OpenAPI JSON URL: ").strip()
 
-    if swagger_data:
-        test_cases = generate_test_cases(swagger_data)
+    with metrics.profiling(args.profile):
+        generator = TestGenerator(swagger_url, workers=args.workers)
+        generator.select(args.tags, args.paths, args.methods, args.operation_ids, args.deprecated)
+        if args.incremental:
+            test_cases = generator.generate_incremental(manifest_path_for("generated_test_cases.json"))
+            print(f"[INFO] Incremental run: {generator.incremental_stats}")
+        else:
+            test_cases = generator.generate_test_cases()
 
+    if args.run or args.mock:
+        mock = MockServer(generator.swagger_loader).start_in_thread() if args.mock else None
+        base_url = mock.url if mock else args.run
+        with open(args.results, "wb") as results:
+            def write_result(result):
+                results.write(serialization.dumps(result.to_dict()) + b"\n")
+
+            runner = TestRunner(base_url, concurrency=args.concurrency, rate_limit=args.rate_limit,
+                                spec=generator.swagger_loader.spec, index=generator.swagger_loader.operation_index())
+            summary = runner.run(test_cases, sink=write_result)
+        if mock:
+            mock.stop()
+        print(f"[INFO] Run finished: {summary} (results in {args.results})")
+    else:
         for tc in test_cases:
-            print(json.dumps(tc, indent=2))
+            print(serialization.dumps_text(tc, pretty=True))
             print("-" * 60)
 
         choice = get_export_choice()
@@ -31,14 +96,25 @@ if __name__ == "__main__":
         if choice == "1":
             export_to_json(test_cases, "generated_test_cases.json")
         elif choice == "2":
-            export_to_csv(test_cases, "generated_test_cases.csv")
+            write_csv(test_cases, "generated_test_cases.csv")
         elif choice == "3":
             base_url = get_base_url()
-            export_to_postman(test_cases, "postman_collection.json", base_url)
+            write_postman_collection(test_cases, "postman_collection.json", base_url, generator.swagger_loader.operation_index())
         elif choice == "4":
             export_to_json(test_cases, "generated_test_cases.json")
-            export_to_csv(test_cases, "generated_test_cases.csv")
+            write_csv(test_cases, "generated_test_cases.csv")
+            base_url = get_base_url()
+            write_postman_collection(test_cases, "postman_collection.json", base_url, generator.swagger_loader.operation_index())
+        elif choice == "5":
+            write_jsonl(test_cases, "generated_test_cases.jsonl")
+        elif choice == "6":
             base_url = get_base_url()
-            export_to_postman(test_cases, "postman_collection.json", base_url)
+            # With --tag, only those tags' collection files are rewritten
+            shards = write_postman_shards(test_cases, "postman_collections", base_url, generator.swagger_loader.operation_index(),
+                                          max_items=get_shard_limit(), tags=args.tags)
+            print(f"[INFO] Wrote {len(shards)} collection files to postman_collections/")
         else:
             print("[WARN] Invalid choice. No export performed.")
+
+    if args.profile:
+        print("\n" + metrics.format_report())
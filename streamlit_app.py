@@ -1,7 +1,11 @@
 import sys
 import os
+import hashlib
+import io
+import math
+import threading
+import time
 import streamlit as st
-import json
 import requests
 
 # Add the app/ directory to the Python path
@@ -9,32 +13,40 @@ APP_DIR = os.path.join(os.path.dirname(__file__), "app")
 if APP_DIR not in sys.path:
     sys.path.append(APP_DIR)
 
-from test_generator import TestGenerator
-from app.negative_test_generator import NegativeTestGenerator
-from exporter import generate_csv, generate_postman_collection
+from app.swagger_loader import SwaggerLoader
+from app.operation_index import make_filter
+from app.spacy_engine import get_spacy_model
+from app.model_manager import get_model_manager
+from app.instrumentation import Instrumentation
+from app.generation_job import GenerationJob, CANCELLED, FAILED
+from app.nlp_summary import available_engines
+from app.test_case import NegativeTestCase
+from exporter import generate_csv, generate_jsonl, generate_postman_collection_bytes, assertion_label
+from app import serialization
 
-# Load spaCy model (Free mode)
+# Generation results kept per session across reruns; the least recently used beyond this are evicted
+MAX_CACHED_RESULTS = 8
+MAX_CACHED_SPECS = 4
+PAGE_SIZES = (25, 50, 100, 250)
+# Seconds between refreshes while a generation job runs
+POLL_SECONDS = 1.0
+
+# Load spaCy model (Free mode); NER is needed here, so nothing is excluded.
+# The registry keeps it loaded across reruns and clicks.
 def load_spacy_model():
     try:
-        import spacy
-        return spacy.load("en_core_web_sm")
+        return get_spacy_model("en_core_web_sm", exclude=())
     except:
         st.warning("spaCy model not found. Using blank model (NER disabled).")
         try:
-            return spacy.blank("en")
+            return get_spacy_model("blank:en", exclude=())
         except:
             return None
 
-# Premium mode using GPT2
+# Premium mode using GPT2; the model stays loaded between clicks (see ModelManager)
 def generate_test_case_gpt(description):
     try:
-        from transformers import GPT2LMHeadModel, GPT2Tokenizer
-        import torch
-        model = GPT2LMHeadModel.from_pretrained("gpt2")
-        tokenizer = GPT2Tokenizer.from_pretrained("gpt2")
-        inputs = tokenizer.encode(description, return_tensors="pt")
-        outputs = model.generate(inputs, max_length=100, num_return_sequences=1)
-        return tokenizer.decode(outputs[0], skip_special_tokens=True)
+        return get_model_manager().generate([description])[0]
     except Exception as e:
         return f"[GPT Error] {str(e)}"
 
@@ -64,6 +76,193 @@ def parse_project_description(text):
             project_config["user_roles"].append({"role": role, "permissions": []})
     return project_config
 
+def spec_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+@st.cache_data(ttl=300, max_entries=16, show_spinner="Fetching spec...")
+def fetch_spec(url):
+    response = requests.get(url)
+    response.raise_for_status()
+    return response.content
+
+# Loaded once per spec content; only its operation index is used across reruns
+@st.cache_resource(max_entries=MAX_CACHED_SPECS, show_spinner="Loading spec...")
+def load_spec(digest, _data):
+    # Loaded in full: the operation index behind the selection widgets needs every path item
+    # at once, so streaming them would only read the spec twice
+    loader = SwaggerLoader(io.BytesIO(_data))
+    loader.operation_index()
+    return loader
+
+class GeneratedResults:
+    """
+    The test cases of one generation run, with their table rows and export
+    payloads, each built once on first use and reused by every rerun.
+    """
+
+    def __init__(self, test_cases, index, report):
+        self.test_cases = test_cases
+        self.index = index
+        self.report = report
+        self._rows = None
+        self._exports = None
+        self._lock = threading.Lock()
+
+    def rows(self):
+        if self._rows is None:
+            self._rows = [case_row(i, case) for i, case in enumerate(self.test_cases)]
+        return self._rows
+
+    def exports(self):
+        with self._lock:
+            if self._exports is None:
+                self._exports = {
+                    "json": serialization.dumps(self.test_cases, pretty=True),
+                    "jsonl": generate_jsonl(self.test_cases),
+                    "csv": generate_csv(self.test_cases).encode("utf-8"),
+                    "postman": generate_postman_collection_bytes(self.test_cases, index=self.index)
+                }
+        return self._exports
+
+def case_row(position, case):
+    # Table row for a test case; hand-written negative cases have no violations
+    kind = "custom" if case.kind == "negative" and case.violations is None else case.kind
+    return {
+        "#": position,
+        "kind": kind,
+        "method": case.method.upper(),
+        "path": case.path,
+        "name": case.label,
+        "tags": ", ".join(case.tags),
+        "assertions": ", ".join(assertion_label(a) for a in case.assertions)
+    }
+
+class GenerationSlot:
+    """
+    The background job for one spec digest and set of options, and its
+    results once it has finished.
+    """
+
+    def __init__(self):
+        self.job = None
+        self.results = None
+        self.lock = threading.Lock()
+
+def generation_slot(digest, options_key):
+    # Kept in the session by spec digest and options (a canonical JSON string), so reruns
+    # follow the same job while one session's Cancel never stops another session's job
+    slots = st.session_state.setdefault("generation_slots", {})
+    key = (digest, options_key)
+    slot = slots.pop(key, None) or GenerationSlot()
+    slots[key] = slot  # most recently used last
+    while len(slots) > MAX_CACHED_RESULTS:
+        evicted = slots.pop(next(iter(slots)))
+        if evicted.job is not None:
+            evicted.job.cancel()
+    return slot
+
+def start_generation(slot, data, options_key, workers):
+    """
+    Starts the slot's job unless one is running or has finished; a cancelled
+    or failed job is started again. The worker count only affects speed.
+    """
+    with slot.lock:
+        if slot.job is not None and slot.job.status not in (CANCELLED, FAILED):
+            return slot.job
+        options = serialization.loads(options_key)
+        extra_cases = []
+        if options["nl_description"]:
+            extra_cases.append(NegativeTestCase(
+                "/nlp/generated", "post",
+                summary=options["nl_description"],
+                assertions=[{"type": "status_code", "expected": 200}],
+                responses={"200": {"description": "OK"}}
+            ))
+        # A loader and instrumentation of its own, so the job never shares a stream or
+        # a report with another session's job
+        instrumentation = Instrumentation()
+        loader = SwaggerLoader(io.BytesIO(data), instrumentation=instrumentation)
+        loader.operation_index()  # Shared by both generators and the Postman export
+        slot.results = None
+        slot.job = GenerationJob(loader, positive=options["positive"], negative=options["negative"],
+                                 selection=make_filter(**options["selection"]), workers=workers,
+                                 nlp_engine=options["nlp_engine"], extra_cases=extra_cases,
+                                 instrumentation=instrumentation).start()
+        return slot.job
+
+def finished_results(slot):
+    # Built once when the job has ended, then reused by every rerun
+    with slot.lock:
+        if slot.results is None:
+            job = slot.job
+            slot.results = GeneratedResults(job.test_cases(), job.loader.operation_index(), job.report)
+        return slot.results
+
+def render_job(slot):
+    job = slot.job
+    if not job.finished:
+        # Progress and the chunks finished so far; the page polls until the job ends
+        st.progress(job.progress, text=f"Generating… {job.done} of {job.total} operations · {job.seconds:.1f}s")
+        if st.button("Cancel generation"):
+            job.cancel()
+        partial = GeneratedResults(job.test_cases(), job.loader.operation_index(), {})
+        if partial.test_cases:
+            render_results(partial)
+        time.sleep(POLL_SECONDS)
+        st.rerun()
+
+    if job.status == CANCELLED:
+        st.warning(f"Generation cancelled after {job.done} of {job.total} operations; showing the finished part.")
+    elif job.status == FAILED:
+        st.error(f"Generation failed: {job.error}")
+
+    results = finished_results(slot)
+    if results.test_cases:
+        st.caption(f"Generated {len(results.test_cases)} test cases in {job.seconds:.1f}s")
+        render_results(results)
+
+        st.subheader("📥 Export Test Cases")
+        exports = results.exports()
+        st.download_button("Download JSON", exports["json"], "test_cases.json", mime="application/json")
+        st.download_button("Download JSON Lines", exports["jsonl"], "test_cases.jsonl", mime="application/jsonl")
+        st.download_button("Download CSV", exports["csv"], "test_cases.csv", mime="text/csv")
+        st.download_button("Download Postman", exports["postman"], "postman_collection.json", mime="application/json")
+    else:
+        st.info("No test cases generated.")
+
+    with st.expander("⏱ Performance report"):
+        st.json(results.report)
+
+def render_results(results):
+    rows = results.rows()
+    st.markdown("### 📋 Test Cases")
+    kind_col, method_col, search_col = st.columns(3)
+    kinds = kind_col.multiselect("Kind", sorted({row["kind"] for row in rows}))
+    methods = method_col.multiselect("Method", sorted({row["method"] for row in rows}))
+    search = search_col.text_input("Search path, name or tags").strip().lower()
+    filtered = [
+        row for row in rows
+        if (not kinds or row["kind"] in kinds)
+        and (not methods or row["method"] in methods)
+        and (not search or search in row["path"].lower() or search in row["name"].lower() or search in row["tags"].lower())
+    ]
+
+    size_col, page_col = st.columns(2)
+    page_size = size_col.selectbox("Rows per page", PAGE_SIZES)
+    pages = max(1, math.ceil(len(filtered) / page_size))
+    # Keyed by the filters so changing them starts again at page 1
+    page = page_col.number_input("Page", min_value=1, max_value=pages, value=1, key=f"page-{kinds}-{methods}-{search}-{page_size}")
+    page_rows = filtered[(page - 1) * page_size:page * page_size]
+    st.caption(f"{len(filtered)} of {len(rows)} test cases · page {page} of {pages}")
+    # Only the current page reaches the browser
+    st.dataframe(page_rows, use_container_width=True, hide_index=True)
+
+    if page_rows:
+        position = st.selectbox("Show test case", [row["#"] for row in page_rows],
+                                format_func=lambda i: f"#{i} {rows[i]['method']} {rows[i]['path']} · {rows[i]['name']}")
+        st.json(results.test_cases[position].to_dict())
+
+
 # Streamlit App
 def main():
     st.title("Smart API Test Case Generator")
@@ -81,58 +280,80 @@ def main():
         st.sidebar.json(config)
 
         if st.sidebar.button("Download Config JSON"):
-            st.download_button("Download JSON", json.dumps(config, indent=2), "project_config.json", mime="application/json")
+            st.download_button("Download JSON", serialization.dumps(config, pretty=True), "project_config.json", mime="application/json")
 
     load_config_file = st.sidebar.file_uploader("Or Upload Existing Project Config", type=["json"])
     if load_config_file:
         try:
-            config = json.load(load_config_file)
+            config = serialization.load(load_config_file)
             st.sidebar.success("Configuration loaded!")
             st.sidebar.json(config)
         except Exception as e:
             st.sidebar.error(f"Invalid JSON file: {e}")
 
     input_method = st.radio("Swagger/OpenAPI input via:", ("Upload JSON File", "Enter URL"))
-    swagger_data = None
+    spec_data = None
 
     if input_method == "Upload JSON File":
         uploaded_file = st.file_uploader("Upload Swagger/OpenAPI JSON", type=["json"])
         if uploaded_file:
-            try:
-                swagger_data = json.load(uploaded_file)
-            except Exception as e:
-                st.error(f"Invalid JSON: {e}")
-                return
+            spec_data = uploaded_file.getvalue()
 
     elif input_method == "Enter URL":
         swagger_url = st.text_input("Swagger/OpenAPI URL:")
         if swagger_url:
             try:
-                response = requests.get(swagger_url)
-                response.raise_for_status()
-                swagger_data = response.json()
+                spec_data = fetch_spec(swagger_url)
             except Exception as e:
                 st.error(f"Fetch failed: {e}")
                 return
 
-    if swagger_data:
+    if spec_data:
+        digest = spec_digest(spec_data)
         try:
-            generator = TestGenerator(swagger_data)
-            negative_generator = NegativeTestGenerator(swagger_data)
+            index = load_spec(digest, spec_data).operation_index()
             st.success("Swagger loaded successfully!")
         except Exception as e:
-            st.error(f"Failed to initialize generator: {e}")
+            st.error(f"Invalid spec: {e}")
             return
 
         generate_positive = st.checkbox("Generate Positive Test Cases", value=True)
         generate_negative = st.checkbox("Generate Negative Test Cases")
+        workers = st.number_input("Worker processes", min_value=1, max_value=os.cpu_count() or 1, value=1)
+
+        st.markdown("### 🎯 Operation Selection")
+        st.caption("Leave a filter empty to include everything.")
+        selected_tags = st.multiselect("Tags", index.tags())
+        selected_methods = st.multiselect("Methods", sorted({op.method.upper() for op in index}))
+        selected_ids = st.multiselect("Operation IDs", [op.operation_id for op in index])
+        path_globs = st.text_input("Path globs (comma separated, e.g. /users/*)")
+        deprecated_choice = st.radio("Deprecated operations", ["Include", "Skip", "Only"], horizontal=True)
+        selection = dict(
+            tags=selected_tags,
+            paths=[p.strip() for p in path_globs.split(",") if p.strip()],
+            methods=selected_methods,
+            operation_ids=selected_ids,
+            deprecated={"Include": None, "Skip": False, "Only": True}[deprecated_choice]
+        )
+        st.caption(f"{len(index.select(make_filter(**selection)))} of {len(index)} operations selected")
 
         st.markdown("### 🧠 NLP-based Test Case Summary")
         nl_description = st.text_area("Describe a test case (optional)")
         nlp_mode = st.radio("Choose NLP Engine", ["Free (spaCy)", "Premium (ChatGPT/GPT-2)"])
+        summary_engine = st.selectbox("Negative test case summaries", available_engines())
 
         if st.button("Generate"):
-            test_cases = []
+            options = {
+                "positive": generate_positive,
+                "negative": generate_negative,
+                "selection": selection,
+                "nl_description": nl_description,
+                "nlp_engine": summary_engine
+            }
+            options_key = serialization.dumps_text(options, sort_keys=True)
+            start_generation(generation_slot(digest, options_key), spec_data, options_key, workers)
+            # Remembered per session so reruns (paging, filtering, polling) follow the same job
+            st.session_state["generation"] = (digest, options_key)
 
             if nl_description:
                 st.markdown("#### ✨ NLP Summary")
@@ -142,34 +363,14 @@ def main():
                     else generate_test_case_spacy(nl_description)
                 )
                 st.code(result)
-                test_cases.append({
-                    "path": "/nlp/generated",
-                    "operation": "post",
-                    "summary": nl_description,
-                    "parameters": [],
-                    "assertions": [{"type": "status_code", "expected": 200}],
-                    "responses": {"200": {"description": "OK"}}
-                })
-
-            if generate_positive:
-                pos = generator.generate_test_cases()
-                st.markdown("### ✅ Positive Test Cases")
-                st.json(pos)
-                test_cases.extend(pos)
-
-            if generate_negative:
-                neg = negative_generator.generate_negative_tests()
-                st.markdown("### ❌ Negative Test Cases")
-                st.json(neg)
-                test_cases.extend(neg)
-
-            if test_cases:
-                st.subheader("📥 Export Test Cases")
-                st.download_button("Download JSON", json.dumps(test_cases, indent=2), "test_cases.json", mime="application/json")
-                st.download_button("Download CSV", generate_csv(test_cases), "test_cases.csv", mime="text/csv")
-                st.download_button("Download Postman", generate_postman_collection(test_cases), "postman_collection.json", mime="application/json")
+
+        generation = st.session_state.get("generation")
+        if generation and generation[0] == digest:
+            slot = generation_slot(*generation)
+            if slot.job is None:
+                st.info("These results were evicted from the cache; click Generate to build them again.")
             else:
-                st.info("No test cases generated.")
+                render_job(slot)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,149 @@
+# tests/test_chatgpt_engine.py
+
+"""
+ChatGPTEngine against a local stub of the chat completions API (api_base
+pointed at it): successful calls, retries with backoff on 429/5xx, and
+reuse of the on-disk response cache.
+
+    python -m unittest tests.test_chatgpt_engine
+"""
+
+import json
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.chatgpt_engine import ChatGPTEngine
+from app.instrumentation import Instrumentation
+
+
+class StubServer:
+    """
+    Answers POST /v1/chat/completions from a script of (status, headers,
+    content) replies, then with 200s echoing the request's path; records
+    every request it receives.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.script = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub._lock:
+                    stub.requests.append({"path": self.path, "headers": dict(self.headers), "body": body})
+                    status, headers, content = stub.script.pop(0) if stub.script else (200, {}, None)
+                if content is None:
+                    prompt = body["messages"][0]["content"]
+                    content = " Summary of " + prompt.split("Path: ")[1].split("\n")[0] + " "
+                out = json.dumps({"choices": [{"message": {"content": content}}]}).encode("utf-8") if status == 200 else b"{}"
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def api_base(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class ChatGPTEngineStubTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.stub = StubServer().__enter__()
+
+    def tearDown(self):
+        self.stub.__exit__(None, None, None)
+        self.cache_dir.cleanup()
+
+    def engine(self, **options) -> ChatGPTEngine:
+        options.setdefault("cache_dir", self.cache_dir.name)
+        return ChatGPTEngine(api_key="test-key", api_base=self.stub.api_base, backoff=0.01, **options)
+
+    def test_successful_call(self):
+        summaries = self.engine().summarize_many([("List users", "/users", "get"), ("Add pet", "/pets", "post")])
+
+        self.assertEqual(summaries, ["Summary of /users", "Summary of /pets"])
+        self.assertEqual(len(self.stub.requests), 2)
+        request = self.stub.requests[0]
+        self.assertEqual(request["path"], "/v1/chat/completions")
+        self.assertEqual(request["headers"]["Authorization"], "Bearer test-key")
+        self.assertEqual(request["body"]["model"], "gpt-3.5-turbo")
+
+    def test_retries_rate_limit_and_server_errors(self):
+        self.stub.script = [(429, {"Retry-After": "0"}, None), (503, {}, None), (500, {}, None)]
+        start = time.monotonic()
+        summary = self.engine(max_retries=5).summarize("List users", "/users", "get")
+
+        self.assertEqual(summary, "Summary of /users")
+        self.assertEqual(len(self.stub.requests), 4)
+        # Backoff without Retry-After: 0.01 * 2 and 0.01 * 4 seconds for the 503 and 500
+        self.assertGreaterEqual(time.monotonic() - start, 0.06)
+
+    def test_falls_back_when_retries_run_out(self):
+        self.stub.script = [(503, {}, None)] * 3
+        summary = self.engine(max_retries=2).summarize("List users", "/users", "get")
+
+        self.assertEqual(summary, "[ChatGPT fallback] List users")
+        self.assertEqual(len(self.stub.requests), 3)
+
+    def test_does_not_retry_client_errors(self):
+        self.stub.script = [(400, {}, None)]
+        summary = self.engine().summarize("List users", "/users", "get")
+
+        self.assertEqual(summary, "[ChatGPT fallback] List users")
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_reuses_cached_responses(self):
+        self.assertEqual(self.engine().summarize("List users", "/users", "get"), "Summary of /users")
+        # A new engine on the same cache directory answers from disk
+        self.assertEqual(self.engine().summarize("List users", "/users", "get"), "Summary of /users")
+        self.assertEqual(len(self.stub.requests), 1)
+
+        # Fallbacks are not cached, and a changed prompt is a new request
+        self.stub.script = [(400, {}, None)]
+        self.engine().summarize("Add pet", "/pets", "post")
+        self.assertEqual(self.engine().summarize("Add pet", "/pets", "post"), "Summary of /pets")
+        self.assertEqual(len(self.stub.requests), 3)
+
+    def test_counts_into_given_instrumentation(self):
+        instrumentation = Instrumentation()
+        self.stub.script = [(503, {}, None)]
+        self.engine().summarize_many([("List users", "/users", "get")], instrumentation)
+        self.engine().summarize_many([("List users", "/users", "get")], instrumentation)
+
+        self.assertEqual(instrumentation.report()["counters"], {"chatgpt_requests": 2, "chatgpt_cache_hits": 1})
+
+    def test_cache_can_be_disabled(self):
+        engine = self.engine(use_cache=False)
+        engine.summarize("List users", "/users", "get")
+        engine.summarize("List users", "/users", "get")
+        self.assertEqual(len(self.stub.requests), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
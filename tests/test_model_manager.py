@@ -0,0 +1,119 @@
+# tests/test_model_manager.py
+
+"""
+ModelManager with a tiny randomly initialised GPT-2 (GPT2Config with one
+layer) and a byte-level tokenizer saved to a temporary directory: loading
+on first use, unloading after the idle timeout, reloading afterwards, and
+get_model_manager applying a new idle timeout. Skipped when torch or
+transformers are not installed.
+
+    python -m unittest tests.test_model_manager
+"""
+
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from app import model_manager
+from app.model_manager import ModelManager, generate_summaries_gpt2, get_model_manager
+
+try:
+    import torch
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers
+    from transformers import GPT2Config, GPT2LMHeadModel, GPT2TokenizerFast
+except ImportError:
+    torch = None
+
+EOS = "<|endoftext|>"
+
+
+def save_tiny_gpt2(model_dir: str) -> None:
+    # A byte-level BPE without merges (one token per byte) and a one-layer model over it
+    alphabet = pre_tokenizers.ByteLevel.alphabet()
+    vocab = {token: i for i, token in enumerate(sorted(alphabet) + [EOS])}
+    tokenizer = Tokenizer(models.BPE(vocab=vocab, merges=[]))
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    GPT2TokenizerFast(tokenizer_object=tokenizer, eos_token=EOS, bos_token=EOS,
+                      unk_token=EOS).save_pretrained(model_dir)
+
+    torch.manual_seed(0)
+    config = GPT2Config(vocab_size=len(vocab), n_positions=128, n_embd=16, n_layer=1, n_head=2,
+                        bos_token_id=vocab[EOS], eos_token_id=vocab[EOS])
+    GPT2LMHeadModel(config).save_pretrained(model_dir)
+
+
+@unittest.skipIf(torch is None, "torch and transformers are not installed")
+class ModelManagerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model_dir = tempfile.TemporaryDirectory()
+        save_tiny_gpt2(cls.model_dir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.model_dir.cleanup()
+
+    def tearDown(self):
+        manager = model_manager._managers.pop(self.model_dir.name, None)
+        if manager is not None:
+            manager.unload()
+
+    def test_loads_on_first_use(self):
+        manager = ModelManager(self.model_dir.name, idle_timeout=None)
+        self.assertFalse(manager.loaded)
+
+        outputs = manager.generate(["GET /pets", "POST /pets with a body"], max_length=30)
+        self.assertTrue(manager.loaded)
+        self.assertEqual(len(outputs), 2)
+        self.assertTrue(outputs[0].startswith("GET /pets"))
+        self.assertEqual(manager.generate([]), [])
+        manager.unload()
+
+    def test_unloads_when_idle_and_reloads(self):
+        manager = ModelManager(self.model_dir.name, idle_timeout=0.2)
+        manager.generate(["GET /pets"], max_length=12)
+        model = manager._model
+        self.assertTrue(manager.loaded)
+
+        self.assertTrue(wait_until(lambda: not manager.loaded, 5.0))
+        self.assertIsNone(manager._timer)
+
+        manager.generate(["GET /pets"], max_length=12)
+        self.assertTrue(manager.loaded)
+        self.assertIsNot(manager._model, model)
+        manager.unload()
+
+    def test_get_model_manager_applies_a_new_idle_timeout(self):
+        manager = get_model_manager(self.model_dir.name, idle_timeout=None)
+        manager.generate(["GET /pets"], max_length=12)
+
+        # Without idle_timeout the existing manager and its timeout are kept
+        self.assertIs(get_model_manager(self.model_dir.name), manager)
+        self.assertIsNone(manager.idle_timeout)
+        time.sleep(0.3)
+        self.assertTrue(manager.loaded)
+
+        self.assertIs(get_model_manager(self.model_dir.name, idle_timeout=0.2), manager)
+        self.assertEqual(manager.idle_timeout, 0.2)
+        self.assertTrue(wait_until(lambda: not manager.loaded, 5.0))
+
+    def test_summaries_plugin(self):
+        with mock.patch.dict("os.environ", {"GPT2_MODEL_DIR": self.model_dir.name}):
+            summaries = generate_summaries_gpt2([("List pets", "/pets", "get")], batch_size=1)
+        self.assertEqual(len(summaries), 1)
+        self.assertFalse(summaries[0].startswith("[GPT-2 fallback]"))
+
+
+def wait_until(condition, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+if __name__ == "__main__":
+    unittest.main()
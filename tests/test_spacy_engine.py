@@ -0,0 +1,97 @@
+# tests/test_spacy_engine.py
+
+"""
+The spaCy summary engine on a blank English pipeline plus a stub tagger
+(no trained model needed), its fallback when a model cannot be loaded, and
+the engine registry of app.nlp_summary dispatching to it. Tests that need
+spaCy are skipped when it is not installed.
+
+    python -m unittest tests.test_spacy_engine
+"""
+
+import unittest
+
+from app import spacy_engine
+from app.nlp_summary import generate_summary_spacy, generate_test_summaries, generate_test_summary
+from app.spacy_engine import SPACY_SUMMARY_EXCLUDE, generate_summaries_spacy, register_spacy_model
+
+try:
+    import spacy
+    from spacy.language import Language
+except ImportError:
+    spacy = None
+
+# Lemmas the stub tagger knows, by lower-case verb form
+VERBS = {"lists": "list", "creates": "create", "deletes": "delete", "returns": "return"}
+
+if spacy is not None:
+    @Language.component("stub_tagger")
+    def stub_tagger(doc):
+        # Tags the known verb forms; every other token is a noun
+        for token in doc:
+            lemma = VERBS.get(token.lower_)
+            token.pos_ = "VERB" if lemma else "NOUN"
+            token.lemma_ = lemma or token.lower_
+        return doc
+
+ITEMS = [
+    ("Lists every pet in the store", "/pets", "get"),
+    ("Creates a pet", "/pets", "post"),
+    ("The pet inventory", "/store/inventory", "get"),
+    (None, "/pets/{petId}", "delete")
+]
+
+
+@unittest.skipIf(spacy is None, "spaCy is not installed")
+class SpacyEngineTest(unittest.TestCase):
+    def setUp(self):
+        nlp = spacy.blank("en")
+        nlp.add_pipe("stub_tagger")
+        self.names = ["test-stub", "en_core_web_sm"]
+        for name in self.names:
+            register_spacy_model(nlp, name)
+
+    def tearDown(self):
+        # The registry is process-wide; later tests load their own models
+        for name in self.names:
+            spacy_engine._spacy_models.pop((name, SPACY_SUMMARY_EXCLUDE), None)
+
+    def test_summaries_use_the_first_verb(self):
+        summaries = generate_summaries_spacy(ITEMS, batch_size=2, model="test-stub")
+
+        self.assertEqual(summaries, [
+            "Use GET on /pets to list.",
+            "Use POST on /pets to create.",
+            "Use GET on /store/inventory to access.",
+            "Use DELETE on /pets/{petId} to access."
+        ])
+
+    def test_blank_pipeline_has_no_verbs(self):
+        summaries = generate_summaries_spacy(ITEMS[:1], model="blank:en")
+        self.assertEqual(summaries, ["Use GET on /pets to access."])
+
+    def test_engine_registry_dispatches_to_spacy(self):
+        # Every entry point reaches the default model, here the stub pipeline
+        self.assertEqual(generate_test_summaries(ITEMS[:2], engine="spacy"),
+                         ["Use GET on /pets to list.", "Use POST on /pets to create."])
+        self.assertEqual(generate_test_summary("Deletes a pet", "/pets/{petId}", "delete", engine="spacy"),
+                         "Use DELETE on /pets/{petId} to delete.")
+        self.assertEqual(generate_summary_spacy("Returns a pet", "/pets/{petId}", "get"),
+                         "Use GET on /pets/{petId} to return.")
+
+
+class SpacyFallbackTest(unittest.TestCase):
+    def tearDown(self):
+        spacy_engine._spacy_models.pop(("no_such_spacy_model", SPACY_SUMMARY_EXCLUDE), None)
+
+    def test_unloadable_model_falls_back(self):
+        # Without spaCy, or without the model, descriptions are returned as they are
+        summaries = generate_summaries_spacy(ITEMS[:2], model="no_such_spacy_model")
+
+        self.assertEqual(summaries, ["GET /pets - Lists every pet in the store", "POST /pets - Creates a pet"])
+        # The failed load is remembered rather than retried
+        self.assertIsInstance(spacy_engine._spacy_models[("no_such_spacy_model", SPACY_SUMMARY_EXCLUDE)], Exception)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+# tests/test_test_runner.py
+
+"""
+Generated test cases run against the MockServer of their own spec:
+prepare_request fills in typed parameters, evaluate_assertions checks the
+responses, and TestRunner passes every executable case and skips the
+negative cases that have nothing to violate.
+
+    python -m unittest tests.test_test_runner
+"""
+
+import unittest
+
+from app import test_runner
+from app.http_client import HttpResponse
+from app.mock_server import MockServer
+from app.negative_test_generator import NegativeTestGenerator
+from app.swagger_loader import SwaggerLoader
+from app.test_case import NegativeTestCase
+from app.test_generator import TestGenerator as Generator
+
+PET = {
+    "type": "object",
+    "required": ["name", "age"],
+    "properties": {
+        "id": {"type": "integer"},
+        "name": {"type": "string", "minLength": 2, "maxLength": 20},
+        "age": {"type": "integer", "minimum": 0, "maximum": 30},
+        "kind": {"type": "string", "enum": ["cat", "dog"]}
+    }
+}
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Pets", "version": "1.0"},
+    "components": {"schemas": {"Pet": PET}},
+    "paths": {
+        "/pets": {
+            "post": {
+                "operationId": "createPet",
+                "requestBody": {"required": True, "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+                "responses": {
+                    "201": {"description": "Created", "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+                    "400": {"description": "Bad request"}
+                }
+            }
+        },
+        "/pets/{petId}": {
+            "parameters": [{"name": "petId", "in": "path", "required": True, "schema": {"type": "integer", "minimum": 1}}],
+            "get": {
+                "operationId": "getPet",
+                "parameters": [
+                    {"name": "verbose", "in": "query", "required": True, "schema": {"type": "boolean"}},
+                    {"name": "X-Trace", "in": "header", "required": True, "schema": {"type": "string", "pattern": "^t-[0-9]{4}$"}}
+                ],
+                "responses": {
+                    "200": {"description": "A pet", "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+                    "400": {"description": "Bad request"}
+                }
+            }
+        }
+    }
+}
+
+
+class RunAgainstMockServerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.loader = SwaggerLoader(SPEC)
+        cls.index = cls.loader.operation_index()
+        cls.positive = Generator(cls.loader).generate_test_cases()
+        cls.negative = NegativeTestGenerator(cls.loader).generate_negative_tests()
+        cls.server = MockServer(cls.loader).start_in_thread()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def run_cases(self, cases):
+        results = []
+        runner = test_runner.TestRunner(self.server.url, concurrency=4, spec=self.loader.spec, index=self.index)
+        summary = runner.run(cases, results.append)
+        return summary, sorted(results, key=lambda r: r.index)
+
+    def test_prepare_request_fills_typed_parameters(self):
+        get_pet = next(c for c in self.positive if c.method == "get")
+        request = test_runner.prepare_request(get_pet, self.server.url, {"Authorization": "Bearer x"},
+                                              self.index, self.loader.spec)
+
+        self.assertEqual(request.method, "GET")
+        self.assertRegex(request.url, r"/pets/\d+\?verbose=(true|false)$")
+        self.assertRegex(request.headers["X-Trace"], r"^t-[0-9]{4}$")
+        self.assertEqual(request.headers["Authorization"], "Bearer x")
+        self.assertIsNone(request.json_body)
+
+        create_pet = next(c for c in self.positive if c.method == "post")
+        request = test_runner.prepare_request(create_pet, self.server.url, index=self.index, spec=self.loader.spec)
+        self.assertTrue({"name", "age"} <= set(request.json_body))
+        self.assertIn({"type": "status_code", "expected": 201}, request.assertions)
+
+    def test_evaluate_assertions(self):
+        assertions = [{"type": "status_code", "expected": 201}, {"type": "schema", "expected": PET}]
+        valid = HttpResponse(201, {}, b'{"name": "Rex", "age": 3}')
+        self.assertEqual(test_runner.evaluate_assertions(assertions, valid, "positive"), [])
+
+        invalid = HttpResponse(200, {}, b'{"name": "R"}')
+        failures = test_runner.evaluate_assertions(assertions, invalid, "positive")
+        self.assertEqual(failures[0], "status_code: expected 201, got 200")
+        self.assertTrue(failures[1].startswith("schema: "))
+
+        # Status classes, and the defaults of cases without assertions
+        self.assertEqual(test_runner.evaluate_assertions([{"type": "status_code", "expected": "2xx"}], valid, "positive"), [])
+        self.assertEqual(test_runner.evaluate_assertions([], HttpResponse(422, {}, b""), "negative"), [])
+        self.assertEqual(test_runner.evaluate_assertions([], HttpResponse(200, {}, b""), "negative"),
+                         ["status_code: expected 4xx, got 200"])
+
+    def test_generated_cases_pass(self):
+        summary, results = self.run_cases(self.positive + self.negative)
+
+        self.assertEqual([r.failures for r in results if not r.passed and not r.skipped], [])
+        self.assertEqual(summary["errors"], 0)
+        self.assertEqual(summary["passed"] + summary["skipped"], summary["total"])
+        self.assertEqual({r.status for r in results if r.kind == "positive"}, {200, 201})
+        self.assertEqual({r.status for r in results if r.kind == "negative" and not r.skipped}, {400})
+
+        # GET /pets/{petId} has no request body to violate: its placeholder case is not sent
+        skipped = [r for r in results if r.skipped]
+        self.assertEqual([(r.method, r.status) for r in skipped], [("GET", None)])
+        self.assertEqual(summary["skipped"], 1)
+
+    def test_unpreparable_case_is_an_error_result(self):
+        broken = NegativeTestCase("/pets/{petId}", "get", "Broken", [{"name": "petId", "in": "path", "schema": None}],
+                                  assertions=[{"type": "status_code", "expected": 400}], payload=None,
+                                  violations=["body: wrong type"])
+        broken.parameters = None  # Not iterable: prepare_request fails
+        summary, results = self.run_cases([broken])
+
+        self.assertEqual(summary["errors"], 1)
+        self.assertIsNotNone(results[0].error)
+        self.assertEqual(results[0].name, "Broken")
+
+
+if __name__ == "__main__":
+    unittest.main()